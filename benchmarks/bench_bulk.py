@@ -0,0 +1,115 @@
+"""Bulk export/import benchmark: time and peak memory of moving every session out and back in.
+
+Fills a throwaway SQLite database with N synthetic interviews, exports them as gzipped NDJSON
+(and Parquet, if pyarrow is installed), then imports the NDJSON into a second empty database.
+With --memory, each step also reports its Python heap high-water mark (tracemalloc, which
+slows every step down several times): it stays flat as N grows, because only one batch is
+held at a time.
+
+    python benchmarks/bench_bulk.py [--sessions 20000] [--memory]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server.core import bulk, storage  # noqa: E402
+from server.core.storage import SessionDelta  # noqa: E402
+from server.db import database  # noqa: E402
+
+WORDS = "latency replication kafka rollout schema incident caching migration pipeline ownership".split()
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _fill(sessions: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    batch = {}
+    for i in range(sessions):
+        questions = [{"question_id": f"q{n}", "text": _text(rng, 20) + "?"} for n in range(6)]
+        batch[f"s{i:06d}"] = SessionDelta(fields={
+            "created_at": float(i),
+            "status": "completed",
+            "job_spec": _text(rng, 150),
+            "cv_text": _text(rng, 250),
+            "provider": "mock",
+            "start_round": 1,
+            "rubric": {"competencies": [{"name": w, "weight": 0.2} for w in WORDS[:5]]},
+            "questions": questions,
+            "answers": [{"question_id": q["question_id"], "answer_text": _text(rng, 90)} for q in questions],
+            "scores": [{"question_id": q["question_id"], "persona": "neutral", "overall_score": rng.uniform(40, 95)}
+                       for q in questions],
+            "logs": [],
+        }, created=True)
+        if len(batch) == 500:
+            storage.save_session_deltas(batch)
+            batch = {}
+    storage.save_session_deltas(batch)
+
+
+def _use(path: Path) -> None:
+    engine = database.make_engine(f"sqlite:///{path}")
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal.configure(bind=engine)
+
+
+def _measure(label: str, fn, memory: bool) -> None:
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    peak = ""
+    if memory:
+        peak = f"{tracemalloc.get_traced_memory()[1] / 2**20:>12.1f} MB"
+        tracemalloc.stop()
+    print(f"{label:<28}{elapsed:>9.1f}s{peak}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--memory", action="store_true", help="also report peak heap per step")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        try:
+            _use(tmp / "source.db")
+            _fill(args.sessions)
+            header = f"{'step':<28}{'time':>10}" + (f"{'peak heap':>15}" if args.memory else "")
+            print(f"{args.sessions} sessions\n\n{header}")
+
+            def export(path: Path, fmt: str) -> None:
+                with path.open("wb") as f:
+                    for chunk in bulk.export_chunks(fmt, compress=path.suffix == ".gz"):
+                        f.write(chunk)
+
+            ndjson = tmp / "sessions.ndjson.gz"
+            _measure("export ndjson.gz", lambda: export(ndjson, "ndjson"), args.memory)
+            try:
+                bulk._pyarrow()
+                parquet = tmp / "sessions.parquet"
+                _measure("export parquet", lambda: export(parquet, "parquet"), args.memory)
+                print(f"{'':<4}sizes: ndjson.gz {ndjson.stat().st_size / 2**20:.1f} MB, "
+                      f"parquet {parquet.stat().st_size / 2**20:.1f} MB")
+            except RuntimeError:
+                print("(pyarrow not installed; skipping Parquet)")
+
+            _use(tmp / "target.db")
+            _measure("import ndjson.gz", lambda: bulk.import_sessions(bulk.read_ndjson(ndjson)), args.memory)
+        finally:
+            database.SessionLocal.configure(bind=database.engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Report-serving benchmark: repeat GET /sessions/{id}/report with and without the cache.
+
+Builds one mock report of realistic size (long answers, coaching, a 7-day plan), then fetches
+it repeatedly through an ASGI app. "before" is the old route (read, parse and re-serialize
+report.json on every call); "no cache" is the new route with REPORT_CACHE_SIZE=0, which also
+hashes and compresses every time; "cached" sends the stored bytes; "304" revalidates with
+If-None-Match and gets no body. "bytes" is what goes over the wire per response (gzipped when
+the client accepts it).
+
+    python benchmarks/bench_report_serving.py [--requests 500] [--questions 10]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from server import main as server_main  # noqa: E402
+from server.core import report_cache, reports, storage  # noqa: E402
+from server.db import database  # noqa: E402
+
+ANSWER = (
+    "I owned the migration of our payments ledger from a single Postgres primary to a sharded "
+    "setup. I profiled the hot queries, added covering indexes, and rolled the change out "
+    "behind a flag, cutting p95 latency from 800ms to 480ms without downtime. "
+) * 4
+
+
+def _session(questions: int) -> Dict[str, Any]:
+    qids = [f"q{q + 1:02d}" for q in range(questions)]
+    return {
+        "session_id": "bench-report",
+        "provider": "mock",
+        "job_spec": "Senior backend engineer",
+        "cv_text": "Backend engineer, 8 years",
+        "questions": [{"question_id": qid, "text": f"Tell me about a time you scaled a system ({qid})."} for qid in qids],
+        "answers": [{"question_id": qid, "answer_text": ANSWER} for qid in qids],
+        "scores": [
+            {
+                "question_id": qid,
+                "persona": persona,
+                "overall_score": 55.0 + i % 40,
+                "scorecard": {"competency_scores": {"System Design": 3, "Ownership": 2, "Communication": 3}},
+            }
+            for i, qid in enumerate(qids)
+            for persona in ("positive", "neutral", "hostile")
+        ],
+        "logs": [
+            {"type": "coaching", "question_id": qid, "parsed": {"coaching": {"rewrite": ANSWER, "strengths": ["Clear metrics"]}}}
+            for qid in qids
+        ],
+    }
+
+
+def _before_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sessions/{session_id}/report")
+    async def get_report(session_id: str) -> Dict[str, Any]:
+        return json.loads((reports.REPORTS_DIR / session_id / "report.json").read_text(encoding="utf-8"))
+
+    return app
+
+
+async def _fetch(app: FastAPI, count: int, headers: Dict[str, str]) -> Dict[str, Any]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        first = await client.get("/sessions/bench-report/report", headers={"Accept-Encoding": "gzip"})
+        if headers.get("If-None-Match") == "<etag>":
+            headers = {**headers, "If-None-Match": first.headers["etag"]}
+        started = time.perf_counter()
+        for _ in range(count):
+            response = await client.get("/sessions/bench-report/report", headers=headers)
+        elapsed = time.perf_counter() - started
+    return {"us_per_request": elapsed / count * 1e6, "bytes": int(response.headers.get("content-length", 0)), "status": response.status_code}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # the app's data/ directory
+        engine = database.make_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        storage.init_db(engine)
+        database.SessionLocal.configure(bind=engine)
+        try:
+            reports.build_report(_session(args.questions))
+            size = (reports.REPORTS_DIR / "bench-report" / "report.json").stat().st_size
+            print(f"report.json: {size / 1024:.1f} KB\n")
+            print(f"{'mode':<22}{'us/request':>12}{'bytes':>9}{'status':>8}")
+            modes = [
+                ("before", None, {"Accept-Encoding": "identity"}),
+                ("no cache", 0, {"Accept-Encoding": "identity"}),
+                ("cached", 256, {"Accept-Encoding": "identity"}),
+                ("cached, gzip", 256, {"Accept-Encoding": "gzip"}),
+                ("cached, 304", 256, {"Accept-Encoding": "gzip", "If-None-Match": "<etag>"}),
+            ]
+            for name, size, headers in modes:
+                app = _before_app() if size is None else server_main.app
+                report_cache.cache = report_cache.ReportCache(max_entries=size or 0)
+                r = asyncio.run(_fetch(app, args.requests, headers))
+                print(f"{name:<22}{r['us_per_request']:>12.0f}{r['bytes']:>9}{r['status']:>8}")
+        finally:
+            database.SessionLocal.configure(bind=database.engine)
+            engine.dispose()
+            os.chdir(Path(__file__).resolve().parents[1])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Report benchmark: concurrent /end report builds, per chart format, inline vs in the pool.
+
+Builds N mock-provider reports, C at a time, the way /end does (``build_report`` on a worker
+thread), while a ticker on the event loop measures how late it wakes up — the stall every
+other request on the worker would see. "png" draws the charts with matplotlib, "svg" with the
+built-in SVG engine; "inline" renders them inside ``build_report`` (CHART_WORKERS=0), "pool"
+hands them to the chart processes. "charts done" is when the last chart file is on disk.
+
+    python benchmarks/bench_reports.py [--reports 24] [--concurrency 8] [--workers 2]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server.core import chart_jobs, charts, reports, storage  # noqa: E402
+from server.db import database  # noqa: E402
+
+COMPETENCIES = ["System Design", "Ownership", "Communication", "Technical Depth", "Delivery", "Collaboration"]
+TICK_SECONDS = 0.005
+
+
+def _session(n: int, questions: int) -> Dict[str, Any]:
+    session_id = f"bench-{n}"
+    scores = []
+    for q in range(questions):
+        for persona in ("positive", "neutral", "hostile"):
+            scores.append({
+                "question_id": f"q{q + 1:02d}",
+                "persona": persona,
+                "overall_score": 40.0 + (n * 7 + q * 11) % 55,
+                "scorecard": {"competency_scores": {c: 30.0 + (n + q * 3 + i * 13) % 65 for i, c in enumerate(COMPETENCIES)}},
+            })
+    return {
+        "session_id": session_id,
+        "provider": "mock",
+        "job_spec": "Senior backend engineer",
+        "cv_text": "Backend engineer, 8 years",
+        "questions": [{"question_id": f"q{q + 1:02d}", "question_text": f"Question {q + 1}?"} for q in range(questions)],
+        "answers": [{"question_id": f"q{q + 1:02d}", "answer_text": "I owned the migration."} for q in range(questions)],
+        "scores": scores,
+        "logs": [],
+    }
+
+
+async def _ticker(stop: asyncio.Event, lags: List[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        before = loop.time()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(loop.time() - before - TICK_SECONDS)
+
+
+async def _run(sessions: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    limit = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def end(session: Dict[str, Any]) -> None:
+        async with limit:
+            started = time.perf_counter()
+            await asyncio.to_thread(reports.build_report, session)
+            latencies.append(time.perf_counter() - started)
+
+    stop, lags = asyncio.Event(), []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    started = time.perf_counter()
+    await asyncio.gather(*(end(s) for s in sessions))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    for session in sessions:
+        chart_jobs.renderer.wait(session["session_id"])
+    charts_done = time.perf_counter() - started
+    return {
+        "seconds": elapsed,
+        "reports_per_s": len(sessions) / elapsed,
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] * 1000,
+        "max_stall_ms": max(lags) * 1000,
+        "charts_done": charts_done,
+    }
+
+
+def _measure(fmt: str, mode: str, count: int, concurrency: int, workers: int, questions: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.make_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        database.Base.metadata.create_all(bind=engine)
+        database.SessionLocal.configure(bind=engine)
+        saved = (storage.REPORTS_DIR, reports.REPORTS_DIR, chart_jobs.renderer, charts.CHART_FORMAT)
+        storage.REPORTS_DIR = reports.REPORTS_DIR = Path(tmp) / "reports"
+        charts.CHART_FORMAT = fmt
+        renderer = chart_jobs.renderer = chart_jobs.ChartRenderer(workers=workers if mode == "pool" else 0)
+        try:
+            if mode == "pool":
+                renderer.start()
+                # Let the workers finish importing before the clock starts, as the server's
+                # startup hook does.
+                renderer.submit("warmup", {"Warmup": 50.0}, [50.0])
+                renderer.wait("warmup")
+            sessions = [_session(n, questions) for n in range(count)]
+            result = asyncio.run(_run(sessions, concurrency))
+            files = list((Path(tmp) / "reports").glob(f"bench-*/*.{fmt}"))
+            chart_kb = sum(f.stat().st_size for f in files) / max(1, len(files)) / 1024
+        finally:
+            renderer.shutdown()
+            storage.REPORTS_DIR, reports.REPORTS_DIR, chart_jobs.renderer, charts.CHART_FORMAT = saved
+            database.SessionLocal.configure(bind=database.engine)
+            engine.dispose()
+    return {"mode": f"{fmt} {mode}", "charts": len(files), "chart_kb": chart_kb, **result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--questions", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'seconds':>9}{'reports/s':>11}{'p95 ms':>9}{'max stall ms':>14}{'charts done s':>15}{'charts':>8}{'KB/chart':>10}")
+    for fmt in ("png", "svg"):
+        for mode in ("inline", "pool"):
+            r = _measure(fmt, mode, args.reports, args.concurrency, args.workers, args.questions)
+            print(
+                f"{r['mode']:<12}{r['seconds']:>9.2f}{r['reports_per_s']:>11.1f}{r['p95_ms']:>9.0f}"
+                f"{r['max_stall_ms']:>14.0f}{r['charts_done']:>15.2f}{r['charts']:>8}{r['chart_kb']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
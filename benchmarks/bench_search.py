@@ -0,0 +1,126 @@
+"""Search benchmark: full-text query latency over a large session table.
+
+Fills a throwaway SQLite database with N synthetic interviews (job spec, CV, questions and
+answers drawn from a fixed vocabulary), then times ``storage.search_sessions`` for a few
+queries, against the naive alternative of scanning every row's text with LIKE.
+Expect a few minutes to build the default 20k-session database.
+
+    python benchmarks/bench_search.py [--sessions 20000] [--repeat 20]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from server.core import storage  # noqa: E402
+from server.core.storage import SessionDelta  # noqa: E402
+from server.db import database  # noqa: E402
+
+ROLES = ["Backend", "Frontend", "Data", "Platform", "Mobile", "Security", "ML", "Site Reliability"]
+# Technical terms are sprinkled into otherwise generic text, so each matches a realistic
+# minority of documents rather than nearly all of them.
+TERMS = (
+    "python postgres kafka react typescript kubernetes terraform spark airflow redis latency "
+    "throughput migration incident rollout caching sharding replication monitoring alerting "
+    "postmortem roadmap onboarding pipeline schema"
+).split()
+QUERIES = ["kafka", "postgres replication", "incident postmortem", "Security Engineer", "typesc"]
+
+
+def _vocabulary(rng: random.Random, size: int = 3000) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def _text(rng: random.Random, vocab: list, words: int) -> str:
+    out = []
+    for _ in range(words):
+        if rng.random() < 0.01:
+            out.append(rng.choice(TERMS))
+        else:
+            # Zipf-like: a few common words, a long tail of rare ones.
+            out.append(vocab[min(int(rng.paretovariate(1.1)) - 1, len(vocab) - 1)])
+    return " ".join(out)
+
+
+def _fill(sessions: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng)
+    batch = {}
+    for i in range(sessions):
+        qa = [({"question_id": f"q{n}", "text": _text(rng, vocab, 20) + "?"},
+               {"question_id": f"q{n}", "answer_text": _text(rng, vocab, 80)}) for n in range(4)]
+        batch[f"s{i:06d}"] = SessionDelta(fields={
+            "created_at": float(i),
+            "status": "completed",
+            "job_spec": f"{rng.choice(ROLES)} Engineer\n{_text(rng, vocab, 120)}",
+            "cv_text": _text(rng, vocab, 200),
+            "provider": "mock",
+            "start_round": 1,
+            "questions": [q for q, _ in qa],
+            "answers": [a for _, a in qa],
+            "scores": [],
+            "logs": [],
+        }, created=True)
+        if len(batch) == 500:
+            storage.save_session_deltas(batch)
+            batch = {}
+    storage.save_session_deltas(batch)
+
+
+def _time_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.make_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        database.Base.metadata.create_all(bind=engine)
+        database.SessionLocal.configure(bind=engine)
+        try:
+            started = time.perf_counter()
+            _fill(args.sessions)
+            print(f"Indexed {args.sessions} sessions in {time.perf_counter() - started:.1f}s\n")
+
+            print(f"{'query':<24}{'hits':>6}{'fts ms':>10}{'LIKE scan ms':>15}")
+            for query in QUERIES:
+                hits = len(storage.search_sessions(query)["results"])
+                fts = _time_ms(lambda: storage.search_sessions(query), args.repeat)
+
+                def scan() -> None:
+                    # Ranking needs every match, so the scan can't stop at the first page.
+                    with engine.connect() as conn:
+                        conn.execute(text(
+                            "SELECT COUNT(DISTINCT s.session_id) FROM sessions s "
+                            "JOIN session_answers a ON a.session_id = s.session_id "
+                            "WHERE s.job_spec LIKE :q OR s.cv_text LIKE :q OR a.payload LIKE :q"
+                        ), {"q": f"%{query.split()[0]}%"}).all()
+
+                like = _time_ms(scan, max(1, args.repeat // 4))
+                print(f"{query:<24}{hits:>6}{fts:>10.1f}{like:>15.1f}")
+        finally:
+            database.SessionLocal.configure(bind=database.engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
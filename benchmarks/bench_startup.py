@@ -0,0 +1,96 @@
+"""Startup benchmark: how long ``import server.main`` takes in a fresh interpreter.
+
+Runs ``python -X importtime -c "import server.main"`` several times in a scratch directory
+and reports the median import time, the packages that cost the most, and whether any module
+that should load on first use (PDF/DOCX parsing, matplotlib, pyarrow, the chart process pool)
+was imported anyway. "eager" also imports those modules, which is roughly what importing the
+server used to cost; "lazy" is the server as it is.
+
+Exits non-zero when the lazy median exceeds ``--budget-ms`` or a deferred module is imported
+at startup, so it can guard against regressions in CI.
+
+    python benchmarks/bench_startup.py [--runs 7] [--budget-ms 1200]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded on first use, never by importing the server.
+DEFERRED = ("pypdf", "docx", "matplotlib", "pyarrow", "multiprocessing")
+
+EAGER = "import pypdf, docx, multiprocessing, matplotlib.pyplot"
+
+
+def _import_once(code: str, workdir: Path) -> Tuple[float, Dict[str, float], List[str]]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), DATABASE_URL=f"sqlite:///{workdir / 'bench.db'}")
+    script = f"import server.main, sys; {code}; print(' '.join(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    by_package: Dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        total += int(self_us) / 1000
+        by_package[name.strip().split(".")[0]] += int(self_us) / 1000
+    modules = proc.stdout.split()
+    loaded = [m for m in DEFERRED if m in modules]
+    return total, by_package, loaded
+
+
+def _measure(mode: str, runs: int) -> Dict[str, Any]:
+    code = EAGER if mode == "eager" else "pass"
+    totals, packages, loaded = [], defaultdict(list), set()
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            total, by_package, deferred = _import_once(code, Path(tmp))
+        totals.append(total)
+        for name, ms in by_package.items():
+            packages[name].append(ms)
+        loaded.update(deferred)
+    heaviest = sorted(((statistics.median(v), k) for k, v in packages.items()), reverse=True)[:6]
+    return {"mode": mode, "median_ms": statistics.median(totals), "min_ms": min(totals), "heaviest": heaviest, "deferred": sorted(loaded)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=1200.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'median ms':>11}{'min ms':>9}  heaviest packages (ms)")
+    results = {mode: _measure(mode, args.runs) for mode in ("eager", "lazy")}
+    for r in results.values():
+        heaviest = ", ".join(f"{name} {ms:.0f}" for ms, name in r["heaviest"])
+        print(f"{r['mode']:<8}{r['median_ms']:>11.0f}{r['min_ms']:>9.0f}  {heaviest}")
+
+    lazy = results["lazy"]
+    failures = []
+    if lazy["deferred"]:
+        failures.append(f"imported at startup but should load on first use: {', '.join(lazy['deferred'])}")
+    if lazy["median_ms"] > args.budget_ms:
+        failures.append(f"median import time {lazy['median_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: within the {args.budget_ms:.0f} ms budget, no deferred modules imported")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Storage write-volume benchmark: bytes sent to the database over one simulated interview.
+
+Replays the save pattern of a full interview (start, then next_question/answer pairs) with
+realistically sized prompts and responses, and counts the SQL text plus bound parameter bytes
+every statement sends. "full" is the old path (``save_session`` rewrites every column on each
+save); "delta" is ``SessionState.save()`` persisting only what changed. "load bytes" is the
+JSON size of the session a resume (or ``GET /sessions/{id}``) loads; raw prompt/response
+logs live in the compressed audit store and are not part of it. "delta-nodedupe" turns off
+the content-addressed prompt blob store to show what deduplicating prompt segments saves.
+
+    python benchmarks/bench_storage.py [--questions 10]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event  # noqa: E402
+
+from server.core import prompt_blobs, storage  # noqa: E402
+from server.core.state import SessionState  # noqa: E402
+from server.db import database  # noqa: E402
+
+_WORDS = (
+    "payments platform latency Postgres Kafka ownership scaled migrated led mentored designed "
+    "reduced incident on-call throughput API service team stakeholders roadmap metrics cost "
+    "reliability backend queue cache index rollout experiment customers revenue quarter"
+).split()
+
+
+def _text(seed: int, words: int) -> str:
+    # Non-repetitive prose, so compression numbers resemble real job specs and CVs.
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+JOB_SPEC = _text(1, 500)
+CV_TEXT = _text(2, 900)
+RUBRIC = {
+    "competencies": [
+        {
+            "name": f"Competency {i}",
+            "weight": 0.2,
+            "what_good_looks_like": "Explains trade-offs with concrete, measured outcomes. " * 4,
+            "red_flags": ["hand-wavy", "no metrics"],
+        }
+        for i in range(5)
+    ]
+}
+
+
+def _prompt(history: int) -> str:
+    qa = "".join(f"Q (q{k}): {_text(100 + k, 25)}\n  A: {_text(200 + k, 120)}\n" for k in range(history))
+    return f"{JOB_SPEC}\n\n{CV_TEXT}\n\n{json.dumps(RUBRIC, indent=2)}\n\nConversation so far:\n{qa}"
+
+
+def _simulate(save: Callable[[SessionState], None], questions: int, audit_inline: bool) -> str:
+    session = SessionState(JOB_SPEC, CV_TEXT, "mock")
+    # The old path kept raw prompt/response entries inline in session.logs.
+    audit = session.logs if audit_inline else session.audit_logs
+    session.rubric = RUBRIC
+    audit.append({"type": "rubric", "prompt": _prompt(0), "raw_response": json.dumps(RUBRIC), "parsed": RUBRIC})
+    save(session)
+    for i in range(questions):
+        qid = f"q{i + 1}"
+        question = {"question_id": qid, "text": "Tell me about a hard trade-off you made. " * 3, "kind": "main"}
+        session.questions.append(question)
+        audit.append({"type": "question", "prompt": _prompt(i), "raw_response": json.dumps(question), "parsed": question})
+        save(session)
+
+        session.answers.append({"question_id": qid, "answer_text": "I profiled the hot path and added an index. " * 20})
+        for persona in ("positive", "neutral", "hostile"):
+            scorecard = {"competency_scores": {c["name"]: 3 for c in RUBRIC["competencies"]}, "follow_up_suggestion": "Ask for a metric."}
+            session.scores.append({"question_id": qid, "persona": persona, "scorecard": scorecard, "overall_score": 75.0})
+            audit.append({"type": "scoring", "persona": persona, "prompt": _prompt(i), "raw_response": json.dumps(scorecard), "parsed": scorecard})
+        session.logs.append({"type": "coaching", "question_id": qid, "parsed": {"coaching": {"rewrite": "Situation... " * 30}}})
+        save(session)
+    session.status = "completed"
+    save(session)
+    return session.session_id
+
+
+def _param_bytes(value: Any) -> int:
+    """Bytes of bound parameters; handles flat tuples and executemany sequences alike."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, memoryview):  # how SQLite binds LargeBinary
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_param_bytes(v) for v in value)
+    return 0 if value is None else 8
+
+
+def _measure(name: str, save: Callable[[SessionState], None], questions: int, audit_inline: bool = False) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = database.make_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        database.Base.metadata.create_all(bind=engine)
+        database.SessionLocal.configure(bind=engine)
+        counters = {"bytes": 0, "statements": 0}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+            counters["statements"] += 1
+            counters["bytes"] += len(statement.encode("utf-8"))
+            counters["bytes"] += _param_bytes(parameters)
+
+        started = time.perf_counter()
+        try:
+            session_id = _simulate(save, questions, audit_inline)
+            elapsed = time.perf_counter() - started
+            # What resuming the session (or GET /sessions/{id}) has to load and encode.
+            load_bytes = len(json.dumps(storage.load_session(session_id)))
+            engine.dispose()
+            db_bytes = (Path(tmp) / "bench.db").stat().st_size
+        finally:
+            database.SessionLocal.configure(bind=database.engine)
+            engine.dispose()
+        return {"mode": name, "seconds": elapsed, "load_bytes": load_bytes, "db_bytes": db_bytes, **counters}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+
+    results = [_measure("full", lambda s: storage.save_session(s.session_id, s.to_dict()), args.questions, audit_inline=True)]
+    # Same delta path with prompt dedupe disabled (every segment too short to become a blob).
+    default_min = prompt_blobs.MIN_BLOB_CHARS
+    prompt_blobs.MIN_BLOB_CHARS = sys.maxsize
+    try:
+        results.append(_measure("delta-nodedupe", lambda s: s.save(), args.questions))
+    finally:
+        prompt_blobs.MIN_BLOB_CHARS = default_min
+    results.append(_measure("delta", lambda s: s.save(), args.questions))
+
+    print(f"{'mode':<16}{'statements':>12}{'bytes written':>16}{'load bytes':>14}{'db bytes':>12}{'seconds':>10}")
+    for r in results:
+        print(
+            f"{r['mode']:<16}{r['statements']:>12}{r['bytes']:>16,}{r['load_bytes']:>14,}"
+            f"{r['db_bytes']:>12,}{r['seconds']:>10.3f}"
+        )
+    print(f"reduction: {results[0]['bytes'] / max(results[-1]['bytes'], 1):.1f}x fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
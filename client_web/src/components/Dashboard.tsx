@@ -8,28 +8,47 @@ import { apiUrl } from "../lib/api";
 interface Session {
     session_id: string;
     created_at: number;
+    job_title: string;
     job_spec: string;
     status: string;
     overall_score?: number;
 }
 
+interface SessionPage {
+    sessions: Session[];
+    next_cursor: string | null;
+}
+
 export default function Dashboard() {
     const [sessions, setSessions] = useState<Session[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
 
-    useEffect(() => {
-        fetch(apiUrl("/sessions"))
+    // The list is paged server-side; each page carries the cursor for the next one.
+    const fetchPage = (cursor: string | null) => {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+        return fetch(apiUrl(`/sessions${query}`))
             .then((res) => res.json())
-            .then((data) => {
-                setSessions(data);
-                setLoading(false);
+            .then((data: SessionPage) => {
+                setSessions((prev) => (cursor ? [...prev, ...data.sessions] : data.sessions));
+                setNextCursor(data.next_cursor);
             })
             .catch((err) => {
                 console.error("Failed to fetch sessions", err);
-                setLoading(false);
             });
+    };
+
+    useEffect(() => {
+        fetchPage(null).finally(() => setLoading(false));
     }, []);
 
+    const loadMore = () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        fetchPage(nextCursor).finally(() => setLoadingMore(false));
+    };
+
     if (loading) {
         return (
             <div className="flex justify-center py-20">
@@ -79,7 +98,7 @@ export default function Dashboard() {
                                     </div>
                                     <div>
                                         <h3 className="font-semibold text-white text-lg group-hover:text-indigo-400 transition-colors line-clamp-1">
-                                            {session.job_spec?.split("\n").map((l) => l.trim()).find(Boolean) || "Untitled Position"}
+                                            {session.job_title || "Untitled Position"}
                                         </h3>
                                         <div className="flex items-center gap-4 mt-1 text-sm text-slate-500">
                                             <span className="flex items-center gap-1.5">
@@ -101,6 +120,15 @@ export default function Dashboard() {
                             </div>
                         </Link>
                     ))}
+                    {nextCursor && (
+                        <button
+                            onClick={loadMore}
+                            disabled={loadingMore}
+                            className="mx-auto mt-2 text-indigo-400 hover:text-indigo-300 font-medium disabled:opacity-50"
+                        >
+                            {loadingMore ? "Loading..." : "Load more"}
+                        </button>
+                    )}
                 </div>
             )}
         </div>
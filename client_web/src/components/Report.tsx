@@ -112,6 +112,26 @@ function recommendationBody(nextStep: string): string {
     return (nextStep || "").replace(/^\s*(strong hire|no[\s-]?hire|follow[\s-]?up|hire)\s*[—\-:]\s*/i, "").trim();
 }
 
+// Charts are drawn in the background after the interview ends, so right after /end the image
+// may not exist yet. Retry a failed load a few times before giving up.
+const CHART_RETRIES = 10;
+const CHART_RETRY_MS = 500;
+
+function ChartImage({ src, alt }: { src: string; alt: string }) {
+    const [attempt, setAttempt] = useState(0);
+    const url = attempt ? `${src}?retry=${attempt}` : src;
+    return (
+        <img
+            src={url}
+            alt={alt}
+            className="max-h-64 object-contain"
+            onError={() => {
+                if (attempt < CHART_RETRIES) setTimeout(() => setAttempt((a) => a + 1), CHART_RETRY_MS);
+            }}
+        />
+    );
+}
+
 export default function InterviewReport() {
     const { id } = useParams<{ id: string }>();
     const [report, setReport] = useState<ReportData | null>(null);
@@ -205,7 +225,7 @@ export default function InterviewReport() {
                         className="bg-white/5 rounded-xl p-4 flex items-center justify-center cursor-pointer hover:bg-white/10 transition-colors"
                         onClick={() => setSelectedImage(getChartUrl(report.report_paths.competency_radar))}
                     >
-                        <img src={getChartUrl(report.report_paths.competency_radar)} alt="Competency Radar" className="max-h-64 object-contain" />
+                        <ChartImage src={getChartUrl(report.report_paths.competency_radar)} alt="Competency Radar" />
                     </div>
                     <p className="print:hidden text-xs text-center text-slate-500 mt-2">Click to expand</p>
                 </div>
@@ -218,7 +238,7 @@ export default function InterviewReport() {
                         className="bg-white/5 rounded-xl p-4 flex items-center justify-center cursor-pointer hover:bg-white/10 transition-colors"
                         onClick={() => setSelectedImage(getChartUrl(report.report_paths.score_over_time))}
                     >
-                        <img src={getChartUrl(report.report_paths.score_over_time)} alt="Score Trend" className="max-h-64 object-contain" />
+                        <ChartImage src={getChartUrl(report.report_paths.score_over_time)} alt="Score Trend" />
                     </div>
                     <p className="print:hidden text-xs text-center text-slate-500 mt-2">Click to expand</p>
                 </div>
@@ -0,0 +1,135 @@
+"""Admission control for the LLM-heavy routes (start, next question, answer, end).
+
+When the model backend is saturated, requests used to pile up inside the server until clients
+timed out and retried, adding more load. Now at most ADMISSION_MAX_ACTIVE of them run at once
+per worker; the rest wait in a bounded FIFO queue, and a request that would wait too long is
+turned away at once with 503 and a Retry-After hint instead:
+
+    ADMISSION_MAX_ACTIVE   requests doing LLM work at the same time (default 8).
+    ADMISSION_MAX_QUEUE    requests allowed to wait for a slot (default 32).
+    ADMISSION_MAX_WAIT     seconds of estimated wait beyond which a request is refused
+                           (default 30). The estimate is the request's place in the queue
+                           times the recent average time a request holds its slot.
+
+``metrics()`` reports the queue depth, slot use, waits and refusals for GET /metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import math
+import os
+import time
+from typing import Any, AsyncIterator, Deque, Dict
+
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "30"))
+# Service-time guess until requests have been timed; about one scored answer.
+INITIAL_SERVICE_SECONDS = 10.0
+# Weight of the newest request in the moving average of service time.
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """The request was refused; ``retry_after`` is a whole number of seconds."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_active: int = ADMISSION_MAX_ACTIVE, max_queue: int = ADMISSION_MAX_QUEUE, max_wait: float = ADMISSION_MAX_WAIT) -> None:
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiting: Deque[asyncio.Future] = collections.deque()
+        self.service_seconds = INITIAL_SERVICE_SECONDS
+        self.counts = {"admitted_total": 0, "rejected_queue_full_total": 0, "rejected_wait_total": 0}
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def estimated_wait(self, position: int) -> float:
+        """Expected seconds until the request at ``position`` in the queue (0: next) starts."""
+        return (position + 1) / self.max_active * self.service_seconds
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the body of the ``async with``; raises Overloaded instead of
+        queueing when the queue is full or the wait would be too long."""
+        queued_at = time.monotonic()
+        if self.active < self.max_active and not self._waiting:
+            self.active += 1
+        else:
+            await self._wait_for_slot()
+        waited = time.monotonic() - queued_at
+        self.counts["admitted_total"] += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.service_seconds += SERVICE_TIME_ALPHA * (elapsed - self.service_seconds)
+            self._release()
+
+    async def _wait_for_slot(self) -> None:
+        position = len(self._waiting)
+        wait = self.estimated_wait(position)
+        if position >= self.max_queue:
+            self.counts["rejected_queue_full_total"] += 1
+            raise Overloaded("Server is busy: too many requests waiting", math.ceil(wait))
+        if wait > self.max_wait:
+            self.counts["rejected_wait_total"] += 1
+            raise Overloaded("Server is busy: the wait would be too long", math.ceil(wait))
+        slot = asyncio.get_running_loop().create_future()
+        self._waiting.append(slot)
+        try:
+            await slot
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                self._release()  # the slot was handed over just as the request gave up
+            else:
+                self._waiting.remove(slot)
+            raise
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, so it can't be taken by a newcomer.
+        while self._waiting:
+            slot = self._waiting.popleft()
+            if not slot.done():
+                slot.set_result(None)
+                return
+        self.active -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "queued": len(self._waiting),
+            "max_queue": self.max_queue,
+            "estimated_wait_seconds": round(self.estimated_wait(len(self._waiting)), 3),
+            "service_seconds_avg": round(self.service_seconds, 3),
+            "wait_seconds_total": round(self.wait_seconds_total, 3),
+            "wait_seconds_max": round(self.wait_seconds_max, 3),
+            **self.counts,
+        }
+
+
+controller = AdmissionController()
+
+
+def prometheus_text(metrics: Dict[str, Any]) -> str:
+    """The metrics in the Prometheus text format."""
+    lines = []
+    for name, value in metrics.items():
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines.append(f"# TYPE intervue_admission_{name} {kind}")
+        lines.append(f"intervue_admission_{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, Tuple
 
-from server.llm import dispatch, prompts
+from server.llm import cancel, dispatch, prompts
 from server.llm.schemas import Persona, CVAnalysis
 from server.core.json_utils import parse_json_response
 from server.core.personas import PANEL_STANCES, PANEL_VOICE_GENDER
@@ -17,6 +17,8 @@ def _call_llm_with_retries(prompt: str, cfg: dispatch.LLMConfig, fix_prompt: str
             response = dispatch.call_llm(cfg, prompt)
             responses.append(response)
             return response
+        except cancel.Cancelled:
+            raise  # out of time or abandoned: retrying can't help
         except Exception as exc:  # noqa: BLE001
             last_error = str(exc)
             prompt = f"{fix_prompt}\n\nOriginal Error: {last_error}\n\nInvalid Output:\n{responses[-1] if responses else ''}"
@@ -0,0 +1,309 @@
+"""Retention: completed sessions older than ARCHIVE_AFTER_DAYS leave the hot tables.
+
+Archiving a session:
+
+    - appends its full record (the session as load_session returns it, its raw LLM audit
+      entries with prompts expanded, and every file of its report directory) as one gzip
+      member to data/archive/sessions-YYYY-MM.ndjson.gz, by the month it was created in.
+      Members are self-contained, so each session is read back on its own, and the file as a
+      whole is still plain gzipped NDJSON (``zcat`` works).
+    - keeps only the summary columns on its sessions row (listing fields, score, persona),
+      records where the member is in ``archive_ref``, and deletes its list rows, audit
+      entries, search documents and report directory.
+
+The archive member is fsynced before the database commit, so a crash leaves at worst an
+unreferenced member, never a session without its data. Archived sessions are no longer
+searchable; loading one (storage.load_session, so GET /sessions/{id} and resuming) restores it
+into the hot tables first.
+
+Prompt blobs the archived audit entries referenced are kept: they are shared between sessions,
+and finding the unreferenced ones means decompressing every audit entry.
+
+A SQLite database created before incremental vacuum is switched over as a maintenance step,
+with the server stopped (it rewrites the whole file):
+
+    python -m server.core.archive enable-incremental-vacuum
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import text, update
+
+from server.core import locks, prompt_blobs, search, storage
+from server.db.models import InterviewSession, SessionAuditLog
+
+# 0 turns retention off.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "0"))
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+ARCHIVE_DIR = storage.DATA_DIR / "archive"
+# Pages handed back to the filesystem per incremental vacuum step (SQLite).
+VACUUM_PAGES = 2000
+
+# Heavy columns cleared on an archived row; the record in the archive holds them.
+ARCHIVED_COLUMNS = ("job_spec", "cv_text", "rubric", "cv_analysis")
+
+# Archive and restore run one session at a time in this process: a restore racing the archive
+# run (or another restore) of the same session would otherwise write its rows twice.
+_lock = threading.Lock()
+
+
+def _archive_path(created_at: Optional[float]) -> Path:
+    month = datetime.fromtimestamp(created_at or 0, tz=timezone.utc).strftime("%Y-%m")
+    return ARCHIVE_DIR / f"sessions-{month}.ndjson.gz"
+
+
+def _append_member(path: Path, record: Dict[str, Any]) -> str:
+    data = gzip.compress((json.dumps(record) + "\n").encode("utf-8"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab") as f, locks.locked_file(f):
+        # The end of the file as of taking the lock, not as of opening it: another process
+        # may have appended in between, and the ref must point at this member.
+        offset = f.seek(0, os.SEEK_END)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return f"{path.name}:{offset}:{len(data)}"
+
+
+def _read_member(ref: str) -> Dict[str, Any]:
+    name, offset, length = ref.rsplit(":", 2)
+    with (ARCHIVE_DIR / name).open("rb") as f:
+        f.seek(int(offset))
+        data = f.read(int(length))
+    return json.loads(gzip.decompress(data))
+
+
+def _report_files(session_id: str) -> Dict[str, str]:
+    report_dir = storage.REPORTS_DIR / session_id
+    if not report_dir.is_dir():
+        return {}
+    return {
+        path.name: base64.b64encode(path.read_bytes()).decode("ascii")
+        for path in sorted(report_dir.iterdir())
+        if path.is_file()
+    }
+
+
+def _archive_record(db: Any, session_id: str) -> Dict[str, Any]:
+    payload = storage._load_payload(db, storage._session_row(db, session_id))
+    rows = (
+        db.query(SessionAuditLog.data)
+        .filter(SessionAuditLog.session_id == session_id)
+        .order_by(SessionAuditLog.id)
+        .all()
+    )
+    audit = prompt_blobs.expand_prompts(db, [storage._decode_audit(row.data) for row in rows])
+    return {"session": payload, "audit": audit, "report_files": _report_files(session_id)}
+
+
+def archive_session(session_id: str) -> bool:
+    """Move one session to its month's archive file. Returns False if it was already archived."""
+    with _lock:
+        db = storage.get_db_session()
+        try:
+            row = (
+                db.query(InterviewSession.created_at)
+                .filter(InterviewSession.session_id == session_id, InterviewSession.archived_at.is_(None))
+                .with_for_update()
+                .first()
+            )
+            if row is None:
+                return False
+            ref = _append_member(_archive_path(row.created_at), _archive_record(db, session_id))
+            for model in storage.CHILD_TABLES.values():
+                db.query(model).filter(model.session_id == session_id).delete(synchronize_session=False)
+            db.query(SessionAuditLog).filter(SessionAuditLog.session_id == session_id).delete(
+                synchronize_session=False
+            )
+            search.drop_session(db, session_id)
+            db.execute(
+                update(InterviewSession)
+                .where(InterviewSession.session_id == session_id)
+                .values(archived_at=time.time(), archive_ref=ref, **{column: None for column in ARCHIVED_COLUMNS})
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        shutil.rmtree(storage.REPORTS_DIR / session_id, ignore_errors=True)
+        return True
+
+
+def restore_session(session_id: str) -> bool:
+    """Bring an archived session back into the hot tables. Returns False if it wasn't archived."""
+    with _lock:
+        db = storage.get_db_session()
+        try:
+            row = (
+                db.query(InterviewSession.archive_ref)
+                .filter(InterviewSession.session_id == session_id, InterviewSession.archived_at.isnot(None))
+                .with_for_update()
+                .first()
+            )
+            if row is None:
+                return False
+            record = _read_member(row.archive_ref)
+            payload = dict(record["session"])
+            payload["logs"] = list(payload.get("logs") or []) + list(record.get("audit") or [])
+            storage._write_session(db, session_id, payload)
+            db.execute(
+                update(InterviewSession)
+                .where(InterviewSession.session_id == session_id)
+                .values(archived_at=None, archive_ref=None)
+            )
+            # Files before the commit: if writing them fails, the session stays archived.
+            files = record.get("report_files") or {}
+            if files:
+                report_dir = storage.REPORTS_DIR / session_id
+                report_dir.mkdir(parents=True, exist_ok=True)
+                for name, data in files.items():
+                    (report_dir / Path(name).name).write_bytes(base64.b64decode(data))
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def archive_sessions(older_than_days: float = ARCHIVE_AFTER_DAYS, batch_size: int = 100) -> int:
+    """Archive every completed session created more than ``older_than_days`` ago. Returns the
+    number archived. Each session is committed on its own, so an interrupted run keeps what it
+    did."""
+    cutoff = time.time() - older_than_days * 86400
+    count = 0
+    last_id = ""
+    while True:
+        db = storage.get_db_session()
+        try:
+            session_ids = [
+                row.session_id
+                for row in db.query(InterviewSession.session_id)
+                .filter(
+                    InterviewSession.status == "completed",
+                    InterviewSession.created_at < cutoff,
+                    InterviewSession.archived_at.is_(None),
+                    InterviewSession.session_id > last_id,
+                )
+                .order_by(InterviewSession.session_id)
+                .limit(batch_size)
+            ]
+        finally:
+            db.close()
+        if not session_ids:
+            break
+        for session_id in session_ids:
+            try:
+                if archive_session(session_id):
+                    count += 1
+            except Exception as e:
+                print(f"Failed to archive session {session_id}: {e}")
+        last_id = session_ids[-1]
+    if count:
+        print(f"Archived {count} sessions completed more than {older_than_days:g} days ago.")
+    return count
+
+
+def _bind() -> Any:
+    db = storage.get_db_session()
+    try:
+        return db.get_bind()
+    finally:
+        db.close()
+
+
+def compact() -> None:
+    """Give the space freed by archiving back to the filesystem.
+
+    SQLite: an incremental vacuum of up to VACUUM_PAGES free pages. Databases created by the
+    production/durable profiles are in auto_vacuum=INCREMENTAL mode; an older one is left as
+    it is (its free pages are reused by later writes) until it's switched over with
+    ``python -m server.core.archive enable-incremental-vacuum``, which takes a full VACUUM.
+    PostgreSQL: VACUUM ANALYZE of the tables archiving shrinks (autovacuum would get there
+    eventually; this makes the space reusable right away).
+    """
+    bind = _bind()
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if bind.dialect.name == "sqlite":
+            if conn.execute(text("PRAGMA auto_vacuum")).scalar() != 2:
+                print("Database is not in incremental auto-vacuum mode, so freed space stays in the file; "
+                      "run `python -m server.core.archive enable-incremental-vacuum` during maintenance.")
+                return
+            result = conn.execute(text(f"PRAGMA incremental_vacuum({VACUUM_PAGES})"))
+            # The pragma frees pages as its result is stepped through, so drain it.
+            if result.returns_rows:
+                result.all()
+        elif bind.dialect.name == "postgresql":
+            tables = ["sessions", "session_audit_logs", "session_search"]
+            tables += [model.__tablename__ for model in storage.CHILD_TABLES.values()]
+            conn.execute(text(f"VACUUM ANALYZE {', '.join(tables)}"))
+
+
+def enable_incremental_vacuum() -> bool:
+    """Switch a SQLite database to auto_vacuum=INCREMENTAL. Returns False if it already was.
+
+    Takes a full VACUUM: the whole file is rewritten under an exclusive lock, blocking every
+    other connection until it's done (minutes for a multi-GB database). Run it with the
+    server stopped, as a maintenance step; the retention thread never does.
+    """
+    bind = _bind()
+    if bind.dialect.name != "sqlite":
+        raise RuntimeError("Incremental vacuum is a SQLite setting; PostgreSQL needs no switch")
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return False
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        conn.execute(text("VACUUM"))
+    return True
+
+
+def run_retention(interval_hours: float = ARCHIVE_INTERVAL_HOURS) -> None:
+    """Archive and compact every ``interval_hours``, forever (the server's retention thread).
+
+    Every worker starts this thread; each pass runs in whichever one takes the retention lock,
+    and the others skip it.
+    """
+    while True:
+        try:
+            with locks.exclusive("retention") as acquired:
+                if acquired and archive_sessions():
+                    compact()
+        except Exception as e:
+            print(f"Session retention run failed: {e}")
+        time.sleep(interval_hours * 3600)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Session retention maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser(
+        "enable-incremental-vacuum",
+        help="switch an existing SQLite database to incremental vacuum (full VACUUM; stop the server first)",
+    )
+    args = parser.parse_args(argv)
+
+    storage.init_db()
+    if args.command == "enable-incremental-vacuum":
+        started = time.perf_counter()
+        if enable_incremental_vacuum():
+            print(f"Switched to incremental vacuum in {time.perf_counter() - started:.1f}s")
+        else:
+            print("Already in incremental vacuum mode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Async front end to server.core.storage for the FastAPI routes.
+
+The storage functions are plain synchronous SQLAlchemy calls; awaiting them directly inside a
+route would stall the event loop on disk I/O. Each coroutine here runs the matching sync
+function on a dedicated thread instead:
+
+    writes  -> a single storage-writer thread. SQLite takes one writer at a time anyway, so
+               queueing writes in-process avoids lock contention and busy-waiting.
+    reads   -> a small reader pool. Under WAL, readers don't block the writer or each other.
+
+The sync functions in storage.py remain the API for scripts (verify_persistence.py, the
+migrations, benchmarks).
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from server.core import archive, storage
+
+T = TypeVar("T")
+
+STORAGE_READ_THREADS = int(os.getenv("STORAGE_READ_THREADS", "4"))
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+_readers = ThreadPoolExecutor(max_workers=STORAGE_READ_THREADS, thread_name_prefix="storage-reader")
+
+
+async def _run(executor: ThreadPoolExecutor, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def save_session(session_id: str, payload: Dict[str, Any]) -> None:
+    await _run(_writer, storage.save_session, session_id, payload)
+
+
+async def save_session_delta(session_id: str, delta: storage.SessionDelta) -> None:
+    await _run(_writer, storage.save_session_delta, session_id, delta)
+
+
+async def save_session_deltas(deltas: Dict[str, storage.SessionDelta]) -> None:
+    await _run(_writer, storage.save_session_deltas, deltas)
+
+
+async def save_report(session_id: str, payload: Dict[str, Any]) -> Path:
+    return await _run(_writer, storage.save_report, session_id, payload)
+
+
+async def load_session(session_id: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    return await _run(_readers, storage.load_session, session_id, fields)
+
+
+async def restore_session(session_id: str) -> bool:
+    return await _run(_writer, archive.restore_session, session_id)
+
+
+async def load_audit_logs(session_id: str, expand_prompts: bool = True) -> List[Dict[str, Any]]:
+    return await _run(_readers, storage.load_audit_logs, session_id, expand_prompts)
+
+
+async def search_sessions(query: str, limit: int) -> Dict[str, Any]:
+    return await _run(_readers, storage.search_sessions, query, limit)
+
+
+async def list_sessions(**filters: Any) -> Dict[str, Any]:
+    return await _run(_readers, storage.list_sessions, **filters)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Stop the storage threads; with ``wait`` set, queued writes finish first."""
+    _writer.shutdown(wait=wait)
+    _readers.shutdown(wait=wait)
@@ -0,0 +1,297 @@
+"""Bulk export and import of sessions, streamed in batches so memory stays flat at any size.
+
+    export  walks the sessions table with a server-side cursor (``stream_results``), fetching
+            each batch's questions/answers/scores/logs with one query per list, and emits
+                ndjson    one session per line (the shape GET /sessions/{id} returns, plus
+                          overall_score), optionally gzip-compressed as it streams;
+                parquet   one row group per batch (needs `pip install pyarrow`). Scalars are
+                          typed columns; rubric, persona, cv_analysis and the lists are JSON text.
+            ``audit`` carries the session's raw LLM audit entries, decompressed and with their
+            prompts rebuilt from the blob store, so a move between databases keeps them.
+            ``fields`` projects the export: columns and lists not asked for are never read.
+            Archived sessions are exported in full, from their archive record.
+    import  reads either format back and writes each batch with one multi-row INSERT per
+            table and one commit. Sessions that already exist are skipped, not overwritten.
+
+    python -m server.core.bulk export sessions.ndjson.gz [--fields session_id,status,scores]
+    python -m server.core.bulk export sessions.parquet
+    python -m server.core.bulk import sessions.ndjson.gz
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import insert, select
+
+from server.core import archive, prompt_blobs, search, storage
+from server.db.models import InterviewSession, SessionAuditLog
+
+EXPORT_FIELDS = ("session_id",) + storage.PAYLOAD_COLUMNS + ("overall_score",) + storage.LIST_COLUMNS + ("audit",)
+# Fields kept as JSON text in Parquet: free-form documents whose shape varies between sessions.
+JSON_FIELDS = ("rubric", "persona", "cv_analysis") + storage.LIST_COLUMNS + ("audit",)
+EXPORT_BATCH = 500
+# Full prompts make up most of an exported session, so batches carrying them are kept smaller.
+AUDIT_BATCH = 50
+FORMATS = ("ndjson", "parquet")
+
+
+def export_fields(fields: Optional[Iterable[str]] = None) -> List[str]:
+    """The export's fields in canonical order; session_id is always included."""
+    if fields is None:
+        return list(EXPORT_FIELDS)
+    wanted = set(fields) | {"session_id"}
+    unknown = wanted - set(EXPORT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown export fields: {', '.join(sorted(unknown))}")
+    return [field for field in EXPORT_FIELDS if field in wanted]
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet export/import needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def iter_sessions(fields: Optional[Iterable[str]] = None, batch_size: int = EXPORT_BATCH) -> Iterator[List[Dict[str, Any]]]:
+    """Batches of exported sessions, oldest first."""
+    wanted = export_fields(fields)
+    columns = [f for f in wanted if f not in storage.LIST_COLUMNS and f != "audit"]
+    lists = [f for f in wanted if f in storage.LIST_COLUMNS]
+    audit = "audit" in wanted
+    if audit:
+        batch_size = min(batch_size, AUDIT_BATCH)
+    db = storage.get_db_session()
+    try:
+        stmt = (
+            select(InterviewSession.archive_ref, *(getattr(InterviewSession, c) for c in columns))
+            .order_by(InterviewSession.created_at, InterviewSession.session_id)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for rows in db.execute(stmt).partitions():
+            batch = [{column: getattr(row, column) for column in columns} for row in rows]
+            ids = [session["session_id"] for session in batch]
+            for field in lists:
+                model = storage.CHILD_TABLES[field]
+                items: Dict[str, List[Any]] = {session_id: [] for session_id in ids}
+                for item in (
+                    db.query(model.session_id, model.payload)
+                    .filter(model.session_id.in_(ids))
+                    .order_by(model.session_id, model.ordinal)
+                ):
+                    items[item.session_id].append(item.payload)
+                for session in batch:
+                    session[field] = items[session["session_id"]]
+            if audit:
+                entries: Dict[str, List[Any]] = {session_id: [] for session_id in ids}
+                for entry in (
+                    db.query(SessionAuditLog.session_id, SessionAuditLog.data)
+                    .filter(SessionAuditLog.session_id.in_(ids))
+                    .order_by(SessionAuditLog.session_id, SessionAuditLog.id)
+                ):
+                    entries[entry.session_id].append(storage._decode_audit(entry.data))
+                prompt_blobs.expand_prompts(db, [e for session_entries in entries.values() for e in session_entries])
+                for session in batch:
+                    session["audit"] = entries[session["session_id"]]
+            for session, row in zip(batch, rows):
+                if row.archive_ref is not None:
+                    member = archive._read_member(row.archive_ref)
+                    record = member["session"]
+                    session.update({f: record.get(f) for f in wanted if f in record and f != "session_id"})
+                    if audit:
+                        session["audit"] = member.get("audit") or []
+            yield batch
+    finally:
+        db.close()
+
+
+def ndjson_chunks(batches: Iterable[List[Dict[str, Any]]], compress: bool = False) -> Iterator[bytes]:
+    # wbits=31: a gzip container, so the stream is a valid .gz file as a whole.
+    gz = zlib.compressobj(wbits=31) if compress else None
+    for batch in batches:
+        data = "".join(json.dumps(session) + "\n" for session in batch).encode("utf-8")
+        data = gz.compress(data) if gz else data
+        if data:
+            yield data
+    if gz:
+        yield gz.flush()
+
+
+class _ChunkSink:
+    """A write-only file for ParquetWriter whose bytes are handed on as they're written."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _parquet_schema(fields: Sequence[str]) -> Any:
+    pa = _pyarrow()
+    types = {"created_at": pa.float64(), "start_round": pa.int64(), "overall_score": pa.float64()}
+    return pa.schema([(field, types.get(field, pa.string())) for field in fields])
+
+
+def parquet_chunks(batches: Iterable[List[Dict[str, Any]]], fields: Sequence[str]) -> Iterator[bytes]:
+    pa = _pyarrow()
+    schema = _parquet_schema(fields)
+    sink = _ChunkSink()
+    writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            rows = [
+                {f: json.dumps(s.get(f)) if f in JSON_FIELDS else s.get(f) for f in fields}
+                for s in batch
+            ]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_chunks(fmt: str = "ndjson", fields: Optional[Iterable[str]] = None, compress: bool = False) -> Iterator[bytes]:
+    """The whole export as a stream of bytes. Raises ValueError/RuntimeError up front (unknown
+    format or field, pyarrow missing), before any database work."""
+    wanted = export_fields(fields)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if fmt == "parquet":
+        _pyarrow()
+        return parquet_chunks(iter_sessions(wanted), wanted)
+    return ndjson_chunks(iter_sessions(wanted), compress=compress)
+
+
+def read_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("rb") as raw:
+        gzipped = raw.read(2) == b"\x1f\x8b"
+    opener = gzip.open if gzipped else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_parquet(path: Path, batch_size: int = EXPORT_BATCH) -> Iterator[Dict[str, Any]]:
+    pa = _pyarrow()
+    for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+        for row in batch.to_pylist():
+            yield {k: json.loads(v) if k in JSON_FIELDS and v is not None else v for k, v in row.items()}
+
+
+def _import_batch(db: Any, batch: List[Dict[str, Any]]) -> int:
+    ids = [record["session_id"] for record in batch]
+    existing = {
+        row.session_id
+        for row in db.query(InterviewSession.session_id).filter(InterviewSession.session_id.in_(ids))
+    }
+    fresh: Dict[str, Dict[str, Any]] = {}
+    for record in batch:
+        if record["session_id"] not in existing:
+            fresh.setdefault(record["session_id"], record)
+    if not fresh:
+        return 0
+
+    db.execute(insert(InterviewSession), [
+        {
+            "session_id": session_id,
+            "overall_score": record.get("overall_score"),
+            **storage._session_values({c: record.get(c) for c in storage.SESSION_COLUMNS}),
+        }
+        for session_id, record in fresh.items()
+    ])
+    for field, model in storage.CHILD_TABLES.items():
+        rows = []
+        for session_id, record in fresh.items():
+            items = list(record.get(field) or [])
+            if field == "logs":
+                # Audit entries come in their own field, or mixed into logs (older exports).
+                items, audit = storage.split_audit_logs(items)
+                storage._insert_audit(db, session_id, list(record.get("audit") or []) + audit)
+            rows += [storage._child_values(field, session_id, i, item) for i, item in enumerate(items)]
+        if rows:
+            db.execute(insert(model), rows)
+    search.index_new_sessions(db, fresh)
+    return len(fresh)
+
+
+def import_sessions(records: Iterable[Dict[str, Any]], batch_size: int = EXPORT_BATCH) -> Dict[str, int]:
+    """Insert exported sessions, one transaction per batch. Returns imported/skipped counts."""
+    counts = {"imported": 0, "skipped": 0}
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        db = storage.get_db_session()
+        try:
+            imported = _import_batch(db, batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        counts["imported"] += imported
+        counts["skipped"] += len(batch) - imported
+        batch.clear()
+
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_cmd = sub.add_parser("export", help="write every session to a file")
+    export_cmd.add_argument("path", type=Path, help="*.ndjson, *.ndjson.gz or *.parquet")
+    export_cmd.add_argument("--fields", help="comma-separated fields to export (default: all)")
+    import_cmd = sub.add_parser("import", help="load sessions from an export")
+    import_cmd.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    storage.init_db()
+    started = time.perf_counter()
+    fmt = "parquet" if args.path.suffix == ".parquet" else "ndjson"
+    if args.command == "export":
+        fields = args.fields.split(",") if args.fields else None
+        with args.path.open("wb") as f:
+            for chunk in export_chunks(fmt, fields, compress=args.path.suffix == ".gz"):
+                f.write(chunk)
+        print(f"Exported sessions to {args.path} in {time.perf_counter() - started:.1f}s")
+    else:
+        records = read_parquet(args.path) if fmt == "parquet" else read_ndjson(args.path)
+        counts = import_sessions(records)
+        print(
+            f"Imported {counts['imported']} sessions ({counts['skipped']} already present) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
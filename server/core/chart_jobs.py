@@ -0,0 +1,124 @@
+"""Report charts rendered off the request path, in a pool of worker processes.
+
+Drawing the radar and score-over-time charts as PNGs with matplotlib is CPU-bound and holds
+the GIL, so doing it inside /end stalled every other request on the worker for hundreds of
+milliseconds. With the pool, ``build_report`` only submits the job: the report (with the
+charts' final paths) is saved and returned at once, and each chart file appears as soon as
+its process has drawn it. Files are written under a temporary name and moved into place, so
+a chart is never served half-written; the web client retries a chart image that isn't there
+yet.
+
+    CHART_WORKERS   processes rendering charts. 0 renders inline, in the calling thread,
+                    before build_report returns. The default is 0 for SVG charts, which take
+                    well under a millisecond, and up to 2 (by CPU count) for PNG.
+
+Jobs are keyed by session: ``wait(session_id)`` blocks until that session's latest charts
+are on disk.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from server.core import charts
+
+_DEFAULT_WORKERS = 0 if charts.CHART_FORMAT == "svg" else min(2, os.cpu_count() or 1)
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", str(_DEFAULT_WORKERS)))
+
+
+def _render(session_id: str, reports_dir: str, competency_avgs: Dict[str, float], overall_scores: List[float], fmt: str) -> None:
+    # Runs in a worker process; the chart code (and matplotlib for PNGs) is imported there,
+    # once per process.
+    from server.core import reports
+
+    reports.generate_charts(session_id, competency_avgs, overall_scores, reports_dir=Path(reports_dir), fmt=fmt)
+
+
+def _warm() -> None:
+    from server.core import reports  # noqa: F401
+
+
+class ChartRenderer:
+    def __init__(self, workers: int = CHART_WORKERS) -> None:
+        self.workers = workers
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is None:
+            # Imported here: the process-pool machinery isn't needed when rendering inline.
+            import multiprocessing
+
+            # spawn, not fork: the server has threads (storage, write-behind), and a forked
+            # child would inherit their locks in whatever state they happened to be in.
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def start(self) -> None:
+        """Start the worker processes ahead of the first report (spawning them and importing
+        the report code takes a moment)."""
+        if self.workers > 0:
+            with self._lock:
+                pool = self._executor()
+            for _ in range(self.workers):
+                pool.submit(_warm)
+
+    def submit(self, session_id: str, competency_avgs: Dict[str, float], overall_scores: List[float]) -> Dict[str, str]:
+        """Queue a session's charts and return the paths they will be written to."""
+        from server.core import reports
+
+        paths = reports.chart_paths(session_id)
+        if self.workers <= 0:
+            reports.generate_charts(session_id, competency_avgs, overall_scores)
+            return paths
+        from concurrent.futures.process import BrokenProcessPool
+
+        args = (session_id, str(reports.REPORTS_DIR), dict(competency_avgs), list(overall_scores), charts.CHART_FORMAT)
+        with self._lock:
+            try:
+                future = self._executor().submit(_render, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool.
+                self._pool = None
+                future = self._executor().submit(_render, *args)
+            self._pending[session_id] = future
+        future.add_done_callback(lambda f: self._done(session_id, f))
+        return paths
+
+    def _done(self, session_id: str, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._pending.get(session_id) is future:
+                del self._pending[session_id]
+        if not future.cancelled() and future.exception() is not None:
+            print(f"WARNING: chart rendering failed for session {session_id}: {future.exception()}")
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def wait(self, session_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until the session's queued charts are written; False on timeout."""
+        future = self._pending.get(session_id)
+        if future is None:
+            return True
+        try:
+            future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            return False
+        except Exception:  # noqa: BLE001 — reported by _done
+            pass
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+renderer = ChartRenderer()
@@ -0,0 +1,237 @@
+"""The report's charts: the competency radar and the score-over-time line.
+
+matplotlib took seconds to import and wrote two 120-dpi PNGs per report. By default the charts
+are now built as a few KB of SVG text in plain Python: no plotting library, crisp at any size,
+small enough for the web client to inline and for the printed/PDF report to scale.
+
+    CHART_FORMAT   svg (default) or png. png draws them with matplotlib as before, which is
+                   then needed (pip install matplotlib); it is imported only if used.
+
+Backgrounds are transparent and text/grid use the slate tones of the dark UI in both formats.
+"""
+from __future__ import annotations
+
+import io
+import math
+import os
+import textwrap
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+CHART_FORMAT = os.getenv("CHART_FORMAT", "svg").lower()
+if CHART_FORMAT not in ("svg", "png"):
+    raise ValueError(f"Unknown CHART_FORMAT {CHART_FORMAT!r}; expected svg or png")
+
+# Chart theming so the charts blend into the dark slate UI instead of rendering as bright
+# white boxes. Backgrounds are left transparent; text/grid use light slate tones.
+_CHART_ACCENT = "#6366f1"
+_CHART_TEXT = "#cbd5e1"
+_CHART_MUTED = "#94a3b8"
+_CHART_GRID = "#334155"
+# pyplot keeps its current figure in global state, and reports are built on worker threads.
+_PYPLOT_LOCK = threading.Lock()
+_FONT = "system-ui, -apple-system, Segoe UI, Helvetica, Arial, sans-serif"
+
+# Wider than tall: the competency names sit beside the ring on the left and right.
+RADAR_WIDTH, RADAR_HEIGHT = 680, 540
+RADAR_RADIUS = 170
+LINE_WIDTH, LINE_HEIGHT = 700, 400
+# Plot area of the line chart: left, top, right, bottom.
+_LINE_PLOT = (70, 50, 680, 340)
+
+
+def _num(value: float) -> str:
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _svg(width: int, height: int, body: List[str]) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" height="{height}" '
+        f'font-family="{_FONT}">\n' + "\n".join(body) + "\n</svg>\n"
+    )
+
+
+def _text(x: float, y: float, text: str, size: int, color: str, anchor: str = "middle", extra: str = "") -> str:
+    return f'<text x="{_num(x)}" y="{_num(y)}" font-size="{size}" fill="{color}" text-anchor="{anchor}"{extra}>{escape(text)}</text>'
+
+
+def _points(points: List[Tuple[float, float]]) -> str:
+    return " ".join(f"{_num(x)},{_num(y)}" for x, y in points)
+
+
+def radar_svg(competency_avgs: Dict[str, float]) -> str:
+    """Competency averages (0-100) on a radar, starting at the top and going clockwise."""
+    cx, cy = RADAR_WIDTH / 2, RADAR_HEIGHT / 2
+    labels = list(competency_avgs)
+    if not labels:
+        return _svg(RADAR_WIDTH, RADAR_HEIGHT, [_text(cx, cy, "No competency scores yet", 16, _CHART_MUTED)])
+
+    angles = [n / len(labels) * 2 * math.pi for n in range(len(labels))]
+
+    def at(angle: float, value: float) -> Tuple[float, float]:
+        r = RADAR_RADIUS * max(0.0, min(100.0, value)) / 100
+        return cx + r * math.sin(angle), cy - r * math.cos(angle)
+
+    body = []
+    for ring in (20, 40, 60, 80, 100):
+        body.append(f'<circle cx="{_num(cx)}" cy="{_num(cy)}" r="{_num(RADAR_RADIUS * ring / 100)}" fill="none" stroke="{_CHART_GRID}" stroke-opacity="0.5"/>')
+        body.append(_text(cx + 4, cy - RADAR_RADIUS * ring / 100 - 3, str(ring), 11, _CHART_MUTED, "start"))
+    for angle in angles:
+        x, y = at(angle, 100)
+        body.append(f'<line x1="{_num(cx)}" y1="{_num(cy)}" x2="{_num(x)}" y2="{_num(y)}" stroke="{_CHART_GRID}" stroke-opacity="0.5"/>')
+
+    points = [at(angle, value) for angle, value in zip(angles, competency_avgs.values())]
+    body.append(f'<polygon points="{_points(points)}" fill="{_CHART_ACCENT}" fill-opacity="0.25" stroke="{_CHART_ACCENT}" stroke-width="2" stroke-linejoin="round"/>')
+    body.extend(f'<circle cx="{_num(x)}" cy="{_num(y)}" r="4" fill="{_CHART_ACCENT}"/>' for x, y in points)
+
+    # Wrap long competency names onto several lines, set them off the outer ring and lean
+    # each one away from the chart on the side it sits.
+    for label, angle in zip(labels, angles):
+        lines = textwrap.wrap(label, 16) or [label]
+        lx = cx + (RADAR_RADIUS + 22) * math.sin(angle)
+        ly = cy - (RADAR_RADIUS + 22) * math.cos(angle)
+        side = math.sin(angle)
+        anchor = "middle" if abs(side) < 1e-6 else ("start" if side > 0 else "end")
+        # Centre the block vertically on its point; top and bottom labels sit clear of it.
+        top = ly - (len(lines) - 1) * 6.5 + 4
+        if math.cos(angle) > 0.5:
+            top = ly - (len(lines) - 1) * 13
+        elif math.cos(angle) < -0.5:
+            top = ly + 10
+        spans = "".join(
+            f'<tspan x="{_num(lx)}" y="{_num(top + i * 13)}">{escape(line)}</tspan>' for i, line in enumerate(lines)
+        )
+        body.append(f'<text font-size="12" fill="{_CHART_TEXT}" text-anchor="{anchor}">{spans}</text>')
+    return _svg(RADAR_WIDTH, RADAR_HEIGHT, body)
+
+
+def score_line_svg(overall_scores: List[float]) -> str:
+    """Each question's overall score (0-100) in order, as a line over a shaded area."""
+    left, top, right, bottom = _LINE_PLOT
+    body = [_text(LINE_WIDTH / 2, 28, "Score Over Time", 16, _CHART_TEXT)]
+    for tick in range(0, 101, 20):
+        y = bottom - (bottom - top) * tick / 100
+        body.append(f'<line x1="{left}" y1="{_num(y)}" x2="{right}" y2="{_num(y)}" stroke="{_CHART_GRID}" stroke-opacity="0.2"/>')
+        body.append(_text(left - 8, y + 4, str(tick), 11, _CHART_MUTED, "end"))
+    body.append(f'<polyline points="{left},{top} {left},{bottom} {right},{bottom}" fill="none" stroke="{_CHART_GRID}"/>')
+    body.append(_text((left + right) / 2, bottom + 42, "Question #", 13, _CHART_TEXT))
+    body.append(_text(20, (top + bottom) / 2, "Overall Score", 13, _CHART_TEXT, extra=f' transform="rotate(-90 20 {_num((top + bottom) / 2)})"'))
+
+    count = len(overall_scores)
+    pad = 20
+    step = (right - left - 2 * pad) / (count - 1) if count > 1 else 0
+    xs = [left + pad + i * step for i in range(count)] if count > 1 else [(left + right) / 2] * count
+    ys = [bottom - (bottom - top) * max(0.0, min(100.0, s)) / 100 for s in overall_scores]
+    for i, x in enumerate(xs):
+        body.append(f'<line x1="{_num(x)}" y1="{bottom}" x2="{_num(x)}" y2="{bottom + 5}" stroke="{_CHART_GRID}"/>')
+        body.append(_text(x, bottom + 20, str(i + 1), 11, _CHART_MUTED))
+    if count:
+        line = list(zip(xs, ys))
+        area = [(xs[0], bottom), *line, (xs[-1], bottom)]
+        body.append(f'<polygon points="{_points(area)}" fill="{_CHART_ACCENT}" fill-opacity="0.12"/>')
+        body.append(f'<polyline points="{_points(line)}" fill="none" stroke="{_CHART_ACCENT}" stroke-width="2" stroke-linejoin="round"/>')
+        body.extend(f'<circle cx="{_num(x)}" cy="{_num(y)}" r="4" fill="{_CHART_ACCENT}"/>' for x, y in line)
+    return _svg(LINE_WIDTH, LINE_HEIGHT, body)
+
+
+def _pyplot() -> Any:
+    try:
+        import matplotlib
+    except ImportError as exc:
+        raise RuntimeError("CHART_FORMAT=png needs matplotlib (pip install matplotlib)") from exc
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _png(plt: Any, fig: Any, **kwargs: Any) -> bytes:
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format="png", dpi=120, transparent=True, **kwargs)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def radar_png(competency_avgs: Dict[str, float]) -> Optional[bytes]:
+    """The radar drawn with matplotlib; None without any competency scores."""
+    labels = list(competency_avgs.keys())
+    if not labels:
+        return None
+    values = list(competency_avgs.values())
+    angles = [n / float(len(labels)) * 2 * math.pi for n in range(len(labels))]
+    loop_values = values + values[:1]
+    loop_angles = angles + angles[:1]
+
+    plt = _pyplot()
+    with _PYPLOT_LOCK:
+        # Larger canvas + start at top, going clockwise, so labels have room.
+        fig = plt.figure(figsize=(9, 9))
+        fig.patch.set_alpha(0)
+        ax = plt.subplot(111, polar=True)
+        ax.set_facecolor("none")
+        ax.set_theta_offset(math.pi / 2)
+        ax.set_theta_direction(-1)
+        ax.plot(loop_angles, loop_values, "o-", linewidth=2, color=_CHART_ACCENT)
+        ax.fill(loop_angles, loop_values, alpha=0.25, color=_CHART_ACCENT)
+
+        # Wrap long competency names onto multiple lines and push them off the plot.
+        wrapped = ["\n".join(textwrap.wrap(lbl, 16)) for lbl in labels]
+        ax.set_thetagrids([math.degrees(a) for a in angles], wrapped, fontsize=9)
+        ax.tick_params(axis="x", pad=22)
+
+        # Align each label to the side it sits on so it leans away from the chart.
+        for label, angle in zip(ax.get_xticklabels(), angles):
+            label.set_color(_CHART_TEXT)
+            deg = math.degrees(angle)
+            if deg in (0, 180):
+                label.set_horizontalalignment("center")
+            elif deg < 180:
+                label.set_horizontalalignment("left")
+            else:
+                label.set_horizontalalignment("right")
+
+        ax.set_ylim(0, 100)
+        ax.tick_params(axis="y", colors=_CHART_MUTED)
+        ax.grid(color=_CHART_GRID, alpha=0.5)
+        ax.spines["polar"].set_color(_CHART_GRID)
+        fig.subplots_adjust(left=0.22, right=0.78, top=0.82, bottom=0.18)
+        return _png(plt, fig, bbox_inches="tight")
+
+
+def score_line_png(overall_scores: List[float]) -> bytes:
+    """The score-over-time line drawn with matplotlib."""
+    plt = _pyplot()
+    with _PYPLOT_LOCK:
+        fig = plt.figure(figsize=(7, 4))
+        fig.patch.set_alpha(0)
+        ax = plt.gca()
+        ax.set_facecolor("none")
+        xs = list(range(1, len(overall_scores) + 1))
+        ax.plot(xs, overall_scores, marker="o", color=_CHART_ACCENT, linewidth=2)
+        ax.fill_between(xs, overall_scores, color=_CHART_ACCENT, alpha=0.12)
+        ax.set_xlabel("Question #", color=_CHART_TEXT)
+        ax.set_ylabel("Overall Score", color=_CHART_TEXT)
+        ax.set_ylim(0, 100)
+        if xs:
+            ax.set_xticks(xs)
+        ax.set_title("Score Over Time", color=_CHART_TEXT)
+        ax.tick_params(colors=_CHART_MUTED)
+        ax.grid(axis="y", alpha=0.2, color=_CHART_GRID)
+        for side in ("top", "right"):
+            ax.spines[side].set_visible(False)
+        for side in ("left", "bottom"):
+            ax.spines[side].set_color(_CHART_GRID)
+        plt.tight_layout()
+        return _png(plt, fig)
+
+
+def render(competency_avgs: Dict[str, float], overall_scores: List[float], fmt: Optional[str] = None) -> Dict[str, Optional[bytes]]:
+    """Both charts' file contents in ``fmt`` (default CHART_FORMAT), keyed like the report's
+    ``report_paths``."""
+    if (fmt or CHART_FORMAT) == "png":
+        return {"competency_radar": radar_png(competency_avgs), "score_over_time": score_line_png(overall_scores)}
+    return {
+        "competency_radar": radar_svg(competency_avgs).encode("utf-8"),
+        "score_over_time": score_line_svg(overall_scores).encode("utf-8"),
+    }
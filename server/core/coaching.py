@@ -5,6 +5,7 @@ from typing import Any, Dict, List, Optional
 from server.llm import dispatch, prompts
 from server.llm.schemas import CoachingFeedback
 from server.core.json_utils import parse_json_response
+from server.core.state import SessionLike
 
 
 def _round2(value: float) -> float:
@@ -122,7 +123,7 @@ def _heuristic_coaching(
 def _build_coaching_prompt(
     question_text: str,
     answer_text: str,
-    session: Dict[str, Any],
+    session: SessionLike,
     star_feedback: Dict[str, Any],
     score_payloads: Optional[List[Dict[str, Any]]],
 ) -> str:
@@ -155,7 +156,7 @@ def build_coaching(
     answer_text: str,
     competency_scores: Dict[str, float],
     star_feedback: Dict[str, Any],
-    session: Optional[Dict[str, Any]] = None,
+    session: Optional[SessionLike] = None,
     api_key: Optional[str] = None,
     score_payloads: Optional[List[Dict[str, Any]]] = None,
 ) -> Dict[str, Any]:
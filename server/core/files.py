@@ -3,10 +3,11 @@ import io
 from pathlib import Path
 from typing import Optional
 
-import pypdf
-import docx
+# pypdf and python-docx are imported on the first upload of their kind, not with the server.
 
 def parse_pdf(file_bytes: bytes) -> str:
+    import pypdf
+
     reader = pypdf.PdfReader(io.BytesIO(file_bytes))
     text = []
     for page in reader.pages:
@@ -14,6 +15,8 @@ def parse_pdf(file_bytes: bytes) -> str:
     return "\n".join(text)
 
 def parse_docx(file_bytes: bytes) -> str:
+    import docx
+
     doc = docx.Document(io.BytesIO(file_bytes))
     return "\n".join([para.text for para in doc.paragraphs])
 
@@ -5,7 +5,7 @@ from typing import Any, Dict, List
 
 from server.core import state
 from server.core.json_utils import parse_json_response
-from server.llm import dispatch, prompts
+from server.llm import cancel, dispatch, prompts
 from server.llm.schemas import ReportSummary
 
 
@@ -22,6 +22,8 @@ def _generate_report_with_retries(prompt: str, cfg: dispatch.LLMConfig, attempts
             last_raw = dispatch.call_llm(cfg, current)
             parsed = parse_json_response(last_raw)
             return ReportSummary.model_validate(parsed).model_dump()
+        except cancel.Cancelled:
+            raise  # out of time or abandoned: retrying can't help
         except Exception as exc:  # noqa: BLE001
             last_error = str(exc)
             print(f"Report generation attempt failed: {exc}")
@@ -0,0 +1,85 @@
+"""Locks that hold across worker processes, for background jobs that must run in one place.
+
+Every uvicorn worker runs the same startup, so each one starts the data backfills and the
+retention thread; these locks let one of them do the work while the others skip it.
+
+    PostgreSQL  a session-level advisory lock, held on its own connection, so it also spans
+                hosts sharing the database.
+    SQLite      an flock() on a file next to the database; a SQLite database is only shared by
+                processes on one host.
+
+Without fcntl (Windows) the file locks are no-ops; run a single worker there.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+from sqlalchemy import text
+
+from server.db.database import SessionLocal
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextlib.contextmanager
+def locked_file(f: IO[Any]) -> Iterator[None]:
+    """Hold an exclusive flock() on an open file, waiting for other processes to let go."""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _lock_path(bind: Any, name: str) -> Optional[Path]:
+    database = bind.url.database
+    if bind.dialect.name != "sqlite" or not database or database == ":memory:":
+        return None
+    path = Path(database)
+    return path.with_name(f"{path.name}.{name}.lock")
+
+
+@contextlib.contextmanager
+def _try_file_lock(path: Optional[Path]) -> Iterator[bool]:
+    if fcntl is None or path is None:
+        yield True
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def exclusive(name: str) -> Iterator[bool]:
+    """Take the named lock if no other process holds it. Yields whether this process got it;
+    the caller skips the work when it didn't (another process is doing it)."""
+    bind = SessionLocal.kw["bind"]
+    if bind.dialect.name != "postgresql":
+        with _try_file_lock(_lock_path(bind, name)) as acquired:
+            yield acquired
+        return
+    key = int.from_bytes(hashlib.sha256(name.encode("utf-8")).digest()[:8], "big", signed=True)
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
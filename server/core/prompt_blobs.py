@@ -0,0 +1,128 @@
+"""Content-addressed storage for logged LLM prompts.
+
+Every prompt we log repeats the same large blocks — job spec, CV, rubric JSON, instructions —
+with only a short, call-specific tail (the question, the answer, the conversation so far).
+Prompts are split into segments (see split_prompt); segments of at least MIN_BLOB_CHARS are stored
+once in the prompt_blobs table under their SHA-256 and referenced by hash, shorter ones stay
+inline. An audit entry then carries a ``prompt_ref`` instead of the full ``prompt``:
+
+    ["Round: screening - ...\n\n", {"blob": "3f9a..."}, {"blob": "c41e..."}, "Question ID: q3"]
+
+``expand_prompts`` reverses it for debugging.
+"""
+from __future__ import annotations
+
+import hashlib
+import zlib
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from server.db.database import dialect_insert
+from server.db.models import PromptBlob
+
+# Below this a segment costs more as a hash reference than inline.
+MIN_BLOB_CHARS = 256
+
+# Within a paragraph, also cut after any line whose CRC is divisible by this — on average every
+# N lines. The cut points depend only on line content, so a block that grows between calls
+# (the conversation-so-far history) keeps the same leading segments and only its tail is new.
+CHUNK_EVERY_LINES = 8
+
+
+def split_prompt(prompt: str) -> List[str]:
+    """Split into segments at paragraph breaks and content-defined line boundaries.
+
+    Lossless: ``"".join(split_prompt(p)) == p``.
+    """
+    segments: List[str] = []
+    current: List[str] = []
+    prev_blank = False
+    for line in prompt.splitlines(keepends=True):
+        blank = not line.strip()
+        if current and prev_blank and not blank:
+            segments.append("".join(current))
+            current = []
+        current.append(line)
+        if not blank and zlib.crc32(line.encode("utf-8")) % CHUNK_EVERY_LINES == 0:
+            segments.append("".join(current))
+            current = []
+        prev_blank = blank
+    if current:
+        segments.append("".join(current))
+    return segments
+
+
+def blob_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def dedupe_prompt(prompt: str, pending: Dict[str, str]) -> List[Any]:
+    """Turn a prompt into a reference list, collecting new blob segments into ``pending``."""
+    ref: List[Any] = []
+    for segment in split_prompt(prompt):
+        if len(segment) < MIN_BLOB_CHARS:
+            # Merge neighbouring short literals so the ref list stays compact.
+            if ref and isinstance(ref[-1], str):
+                ref[-1] += segment
+            else:
+                ref.append(segment)
+            continue
+        digest = blob_hash(segment)
+        pending[digest] = segment
+        ref.append({"blob": digest})
+    return ref
+
+
+def store_blobs(db: Session, blobs: Dict[str, str]) -> None:
+    """Insert the segments whose hashes aren't stored yet. Safe to call with known hashes."""
+    if not blobs:
+        return
+    existing = {
+        row.hash for row in db.query(PromptBlob.hash).filter(PromptBlob.hash.in_(list(blobs))).all()
+    }
+    rows = [
+        {"hash": digest, "size": len(text), "data": zlib.compress(text.encode("utf-8"))}
+        for digest, text in blobs.items()
+        if digest not in existing
+    ]
+    if not rows:
+        return
+    # A concurrent writer may store the same segment between our check and insert; identical
+    # content under the same hash, so a conflict is simply ignored.
+    insert = dialect_insert(db.get_bind())
+    if insert is None:
+        db.add_all([PromptBlob(**row) for row in rows])
+        return
+    db.execute(insert(PromptBlob).values(rows).on_conflict_do_nothing(index_elements=["hash"]))
+
+
+def load_blobs(db: Session, hashes: Iterable[str]) -> Dict[str, str]:
+    wanted = list(set(hashes))
+    if not wanted:
+        return {}
+    rows = db.query(PromptBlob.hash, PromptBlob.data).filter(PromptBlob.hash.in_(wanted)).all()
+    return {row.hash: zlib.decompress(row.data).decode("utf-8") for row in rows}
+
+
+def _ref_hashes(entries: Iterable[Dict[str, Any]]) -> List[str]:
+    return [
+        part["blob"]
+        for entry in entries
+        for part in entry.get("prompt_ref") or []
+        if isinstance(part, dict)
+    ]
+
+
+def expand_prompts(db: Session, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rebuild ``prompt`` on entries that carry a ``prompt_ref`` (in place; also returned)."""
+    blobs = load_blobs(db, _ref_hashes(entries))
+    for entry in entries:
+        ref = entry.pop("prompt_ref", None)
+        if ref is None:
+            continue
+        entry["prompt"] = "".join(
+            part if isinstance(part, str) else blobs.get(part["blob"], f"<missing blob {part['blob']}>")
+            for part in ref
+        )
+    return entries
@@ -4,6 +4,7 @@ import json
 from typing import Any, Dict, List, Tuple
 
 from server.core.personas import persona_style, PANEL_STANCES
+from server.core.state import SessionLike, session_index
 from server.core.json_utils import parse_json_response
 from server.llm.schemas import Question
 
@@ -71,7 +72,7 @@ def round_for_index(index: int, start_round: int = 1) -> Tuple[Dict[str, Any], i
     return rounds[-1], start_round + len(rounds) - 1
 
 
-def _select_target_competency(session: Dict[str, Any], index: int) -> Dict[str, Any] | None:
+def _select_target_competency(session: SessionLike, index: int) -> Dict[str, Any] | None:
     """Pick one rubric competency to probe, rotating so coverage spreads across questions.
 
     Competencies are ordered by weight (most important first) so that with a small question
@@ -85,30 +86,28 @@ def _select_target_competency(session: Dict[str, Any], index: int) -> Dict[str,
     return ordered[index % len(ordered)]
 
 
-def _previous_qa_block(session: Dict[str, Any]) -> str:
+def _previous_qa_block(session: SessionLike) -> str:
     """Render prior questions paired with the candidate's answers and any follow-up signal."""
     questions = session.get("questions", [])
     if not questions:
         return "None"
 
-    answers_by_id = {a.get("question_id"): a for a in session.get("answers", [])}
-    # Prefer the neutral persona scorecard for follow-up signal; fall back to any.
-    scores_by_id: Dict[str, Dict[str, Any]] = {}
-    for score in session.get("scores", []):
-        qid = score.get("question_id")
-        if qid not in scores_by_id or score.get("persona") == "neutral":
-            scores_by_id[qid] = score
-
+    index = session_index(session)
     lines: List[str] = []
     for item in questions:
         qid = item.get("question_id")
         if not item.get("text"):
             continue
         lines.append(f"Q ({qid}): {item['text']}")
-        answer = answers_by_id.get(qid)
+        answers = index.answers(qid)
+        answer = answers[-1] if answers else None
         if answer and answer.get("answer_text"):
             lines.append(f"  A: {answer['answer_text']}")
-            scorecard = (scores_by_id.get(qid) or {}).get("scorecard") or {}
+            # Prefer the neutral persona scorecard for follow-up signal; fall back to any.
+            scores = index.scores(qid)
+            neutral = [score for score in scores if score.get("persona") == "neutral"]
+            signal = neutral[-1] if neutral else (scores[0] if scores else {})
+            scorecard = signal.get("scorecard") or {}
             issues = scorecard.get("issues") or {}
             signals = []
             if issues.get("vagueness", 0) >= 2:
@@ -127,7 +126,7 @@ def _previous_qa_block(session: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
-def build_question_prompt(session: Dict[str, Any], round_info: Dict[str, Any], persona: str, question_id: str, index: int = 0) -> str:
+def build_question_prompt(session: SessionLike, round_info: Dict[str, Any], persona: str, question_id: str, index: int = 0) -> str:
     rubric_json = json.dumps(session["rubric"], indent=2)
 
     # The asking interviewer rotates per question across the three-person panel (supportive,
@@ -220,7 +219,7 @@ def _call_and_validate(prompt: str, cfg: dispatch.LLMConfig, temperature: float
     raise RuntimeError(error_message or "LLM JSON validation failed")
 
 
-def generate_question(session: Dict[str, Any], index: int, api_key: str | None = None) -> Dict[str, Any]:
+def generate_question(session: SessionLike, index: int, api_key: str | None = None) -> Dict[str, Any]:
     start_round = session.get("start_round", 1)
     round_info, _round_num = round_for_index(index, start_round)
     persona = persona_for_index(index)
@@ -251,12 +250,12 @@ def _question_kind(question: Dict[str, Any]) -> str:
     return question.get("kind", "main")
 
 
-def main_question_count(session: Dict[str, Any]) -> int:
+def main_question_count(session: SessionLike) -> int:
     """Number of real (non-follow-up) questions asked so far."""
-    return sum(1 for q in session.get("questions", []) if _question_kind(q) == "main")
+    return session_index(session).question_counts()[0]
 
 
-def needs_follow_up(session: Dict[str, Any]) -> Dict[str, Any] | None:
+def needs_follow_up(session: SessionLike) -> Dict[str, Any] | None:
     """Decide whether the interviewer should probe the last answer.
 
     Returns the parent question to follow up on, or None. A follow-up is warranted when the
@@ -267,8 +266,8 @@ def needs_follow_up(session: Dict[str, Any]) -> Dict[str, Any] | None:
     if not questions:
         return None
 
-    followups = [q for q in questions if _question_kind(q) == "follow_up"]
-    if len(followups) >= MAX_FOLLOWUPS:
+    index = session_index(session)
+    if index.question_counts()[1] >= MAX_FOLLOWUPS:
         return None
 
     last = questions[-1]
@@ -276,12 +275,12 @@ def needs_follow_up(session: Dict[str, Any]) -> Dict[str, Any] | None:
         return None  # never follow up a follow-up
 
     qid = last.get("question_id")
-    if not any(a.get("question_id") == qid for a in session.get("answers", [])):
+    if not index.answers(qid):
         return None  # not answered yet
-    if any(q.get("parent_id") == qid for q in questions):
+    if index.is_followed_up(qid):
         return None  # already followed up
 
-    qscores = [s for s in session.get("scores", []) if s.get("question_id") == qid]
+    qscores = index.scores(qid)
     if not qscores:
         return None
     avg = sum(s.get("overall_score", 0) for s in qscores) / len(qscores)
@@ -292,24 +291,22 @@ def needs_follow_up(session: Dict[str, Any]) -> Dict[str, Any] | None:
     return last if weak else None
 
 
-def generate_followup(session: Dict[str, Any], parent: Dict[str, Any], api_key: str | None = None) -> Dict[str, Any]:
+def generate_followup(session: SessionLike, parent: Dict[str, Any], api_key: str | None = None) -> Dict[str, Any]:
     """Generate one probing follow-up question tied to the parent question's weak answer."""
     parent_id = parent.get("question_id", "q")
     followup_id = f"{parent_id}-f"
     persona = parent.get("persona") or DEFAULT_PERSONA
 
-    answer = next(
-        (a.get("answer_text", "") for a in session.get("answers", []) if a.get("question_id") == parent_id),
-        "",
-    )
+    index = session_index(session)
+    answers = index.answers(parent_id)
+    answer = answers[0].get("answer_text", "") if answers else ""
     suggestion = ""
-    for s in session.get("scores", []):
-        if s.get("question_id") == parent_id:
-            note = (s.get("scorecard") or {}).get("follow_up_suggestion")
-            if note:
-                suggestion = note
-            if s.get("persona") == "neutral":
-                break
+    for s in index.scores(parent_id):
+        note = (s.get("scorecard") or {}).get("follow_up_suggestion")
+        if note:
+            suggestion = note
+        if s.get("persona") == "neutral":
+            break
 
     if dispatch.normalize_provider(session.get("provider", "")) == "mock":
         question = {
@@ -0,0 +1,119 @@
+"""Reports kept in memory ready to send, for GET /sessions/{id}/report.
+
+The dashboard and report pages ask for a report again and again, and every call used to read
+report.json, parse it and serialize it back. Now the first call stores the response body (as
+compact JSON, plus a gzipped copy) and a strong ETag derived from it; later calls check the
+file's modification time and size, and send the stored bytes — or 304 Not Modified when the
+client already has them — without parsing anything:
+
+    REPORT_CACHE_SIZE   reports kept per worker, least recently used dropped first (default
+                        256). 0 turns the cache off.
+
+A report rewritten on disk (a new /end, a restore from the archive) has a new mtime and is
+reloaded on its next request, so every worker sees it without being told.
+"""
+from __future__ import annotations
+
+import collections
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "256"))
+# Small JSON compresses well and quickly at this level; higher levels gain little.
+GZIP_LEVEL = 6
+
+
+class CachedReport:
+    """One report's response bodies. The gzipped body is a different byte sequence, so it has
+    its own strong ETag."""
+
+    __slots__ = ("stamp", "body", "gzipped", "etag", "gzip_etag")
+
+    def __init__(self, stamp: Tuple[int, int], body: bytes) -> None:
+        self.stamp = stamp
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header names either body (weak comparison, as RFC 9110
+        asks for If-None-Match)."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags or self.gzip_etag in tags
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ReportCache:
+    def __init__(self, max_entries: int = REPORT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: "collections.OrderedDict[str, CachedReport]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str, path: Path) -> Optional[CachedReport]:
+        """The cached report if it is still what's on disk, else None (missing or changed)."""
+        try:
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            self.invalidate(session_id)
+            return None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry.stamp != stamp:
+                return None
+            self._entries.move_to_end(session_id)
+            self.hits += 1
+            return entry
+
+    def load(self, session_id: str, path: Path) -> CachedReport:
+        """Read, re-serialize and cache the report; FileNotFoundError if there is none.
+
+        Blocking (file I/O, parsing, compression): call it off the event loop."""
+        stamp = _stamp(path)
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        entry = CachedReport(stamp, json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self.misses += 1
+            if self.max_entries > 0:
+                self._entries[session_id] = entry
+                self._entries.move_to_end(session_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+cache = ReportCache()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (listed, or ``*``, without ``q=0``)."""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip().lower().replace(" ", "")
+            try:
+                return not q.startswith("q=") or float(q[2:]) > 0
+            except ValueError:
+                return True
+    return False
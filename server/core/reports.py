@@ -1,25 +1,15 @@
 from __future__ import annotations
 
-import math
-import textwrap
-from typing import Any, Dict, List, Tuple
-
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
+from server.core import chart_jobs, charts
+from server.core.state import SessionLike, session_index
 from server.core.storage import REPORTS_DIR, save_report
 from server.llm import mock
 from server.llm.schemas import PersonaFeedback
 
-# Chart theming so the matplotlib PNGs blend into the dark slate UI instead of rendering as
-# bright white boxes. Backgrounds are saved transparent; text/grid use light slate tones.
-_CHART_ACCENT = "#6366f1"
-_CHART_TEXT = "#cbd5e1"
-_CHART_MUTED = "#94a3b8"
-_CHART_GRID = "#334155"
-
 
 def _avg(values: List[float]) -> float:
     return sum(values) / len(values) if values else 0.0
@@ -66,87 +56,34 @@ def compute_question_overall_scores(scores: List[Dict[str, Any]]) -> List[float]
     return [round(_avg(values), 2) for _qid, values in sorted(buckets.items())]
 
 
-def generate_charts(session_id: str, competency_avgs: Dict[str, float], overall_scores: List[float]) -> Dict[str, str]:
-    report_dir = REPORTS_DIR / session_id
-    report_dir.mkdir(parents=True, exist_ok=True)
-
-    labels = list(competency_avgs.keys())
-    values = list(competency_avgs.values())
-    radar_path = report_dir / "competency_radar.png"
-    if labels:
-        angles = [n / float(len(labels)) * 2 * math.pi for n in range(len(labels))]
-        loop_values = values + values[:1]
-        loop_angles = angles + angles[:1]
-
-        # Larger canvas + start at top, going clockwise, so labels have room.
-        fig = plt.figure(figsize=(9, 9))
-        fig.patch.set_alpha(0)
-        ax = plt.subplot(111, polar=True)
-        ax.set_facecolor("none")
-        ax.set_theta_offset(math.pi / 2)
-        ax.set_theta_direction(-1)
-        ax.plot(loop_angles, loop_values, "o-", linewidth=2, color=_CHART_ACCENT)
-        ax.fill(loop_angles, loop_values, alpha=0.25, color=_CHART_ACCENT)
-
-        # Wrap long competency names onto multiple lines and push them off the plot.
-        wrapped = ["\n".join(textwrap.wrap(lbl, 16)) for lbl in labels]
-        ax.set_thetagrids([math.degrees(a) for a in angles], wrapped, fontsize=9)
-        ax.tick_params(axis="x", pad=22)
-
-        # Align each label to the side it sits on so it leans away from the chart.
-        for label, angle in zip(ax.get_xticklabels(), angles):
-            label.set_color(_CHART_TEXT)
-            deg = math.degrees(angle)
-            if deg in (0, 180):
-                label.set_horizontalalignment("center")
-            elif deg < 180:
-                label.set_horizontalalignment("left")
-            else:
-                label.set_horizontalalignment("right")
-
-        ax.set_ylim(0, 100)
-        ax.tick_params(axis="y", colors=_CHART_MUTED)
-        ax.grid(color=_CHART_GRID, alpha=0.5)
-        ax.spines["polar"].set_color(_CHART_GRID)
-        fig.subplots_adjust(left=0.22, right=0.78, top=0.82, bottom=0.18)
-        plt.savefig(radar_path, dpi=120, bbox_inches="tight", transparent=True)
-        plt.close(fig)
-
-    fig = plt.figure(figsize=(7, 4))
-    fig.patch.set_alpha(0)
-    ax = plt.gca()
-    ax.set_facecolor("none")
-    xs = list(range(1, len(overall_scores) + 1))
-    ax.plot(xs, overall_scores, marker="o", color=_CHART_ACCENT, linewidth=2)
-    ax.fill_between(xs, overall_scores, color=_CHART_ACCENT, alpha=0.12)
-    ax.set_xlabel("Question #", color=_CHART_TEXT)
-    ax.set_ylabel("Overall Score", color=_CHART_TEXT)
-    ax.set_ylim(0, 100)
-    if xs:
-        ax.set_xticks(xs)
-    ax.set_title("Score Over Time", color=_CHART_TEXT)
-    ax.tick_params(colors=_CHART_MUTED)
-    ax.grid(axis="y", alpha=0.2, color=_CHART_GRID)
-    for side in ("top", "right"):
-        ax.spines[side].set_visible(False)
-    for side in ("left", "bottom"):
-        ax.spines[side].set_color(_CHART_GRID)
-    line_path = report_dir / "score_over_time.png"
-    plt.tight_layout()
-    plt.savefig(line_path, dpi=120, transparent=True)
-    plt.close(fig)
-
+def chart_paths(session_id: str, reports_dir: Optional[Path] = None, fmt: Optional[str] = None) -> Dict[str, str]:
+    report_dir = (reports_dir or REPORTS_DIR) / session_id
+    fmt = fmt or charts.CHART_FORMAT
     return {
-        "competency_radar": str(radar_path),
-        "score_over_time": str(line_path),
+        "competency_radar": str(report_dir / f"competency_radar.{fmt}"),
+        "score_over_time": str(report_dir / f"score_over_time.{fmt}"),
     }
 
 
+def generate_charts(session_id: str, competency_avgs: Dict[str, float], overall_scores: List[float], reports_dir: Optional[Path] = None, fmt: Optional[str] = None) -> Dict[str, str]:
+    paths = chart_paths(session_id, reports_dir, fmt)
+    Path(paths["competency_radar"]).parent.mkdir(parents=True, exist_ok=True)
+    for name, data in charts.render(competency_avgs, overall_scores, fmt).items():
+        if data is None:
+            continue
+        # Written aside and moved into place, so the chart is never served half-written.
+        path = Path(paths[name])
+        partial = path.with_name(f".{path.name}")
+        partial.write_bytes(data)
+        os.replace(partial, path)
+    return paths
+
+
 def _safe_label(items: List[str], index: int, fallback: str) -> str:
     return items[index] if len(items) > index else fallback
 
 
-def generate_persona_feedback(session: Dict[str, Any], strengths: List[str], weaknesses: List[str]) -> List[Dict[str, Any]]:
+def generate_persona_feedback(session: SessionLike, strengths: List[str], weaknesses: List[str]) -> List[Dict[str, Any]]:
     if session["provider"] == "mock":
         return [
             mock.persona_feedback(persona, strengths or ["Execution", "Communication"], weaknesses or ["Clarity", "Depth"])
@@ -175,10 +112,10 @@ def generate_persona_feedback(session: Dict[str, Any], strengths: List[str], wea
 from server.core import grading
 
 
-def build_transcript(session: Dict[str, Any]) -> List[Dict[str, Any]]:
+def build_transcript(session: SessionLike) -> List[Dict[str, Any]]:
     """Assemble the per-question record (question, the answer, score and coaching) from data
     already stored on the session — no extra LLM calls."""
-    answers_by_id = {a.get("question_id"): a for a in session.get("answers", [])}
+    index = session_index(session)
     coaching_by_id: Dict[str, Dict[str, Any]] = {}
     for log in session.get("logs", []):
         if log.get("type") == "coaching":
@@ -187,7 +124,8 @@ def build_transcript(session: Dict[str, Any]) -> List[Dict[str, Any]]:
     transcript: List[Dict[str, Any]] = []
     for question in session.get("questions", []):
         qid = question.get("question_id")
-        answer = answers_by_id.get(qid)
+        answers = index.answers(qid)
+        answer = answers[-1] if answers else None
         if not answer:
             continue  # only include questions the candidate actually answered
         parsed = coaching_by_id.get(qid, {})
@@ -213,7 +151,7 @@ def build_transcript(session: Dict[str, Any]) -> List[Dict[str, Any]]:
     return transcript
 
 
-def persona_panel_names(session: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+def persona_panel_names(session: SessionLike) -> Dict[str, Dict[str, str]]:
     """The named interviewer per stance, so the report can credit real names rather than just
     the archetype labels. Empty if the session predates the named-panel feature."""
     persona = session.get("persona") or {}
@@ -226,14 +164,15 @@ def persona_panel_names(session: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
     return out
 
 
-def build_report(session: Dict[str, Any], api_key: str | None = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+def build_report(session: SessionLike, api_key: str | None = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
     scores = session.get("scores", [])
     overall_scores = compute_question_overall_scores(scores)
     heuristic_score = round(_avg(overall_scores), 2)
 
     competency_avgs = compute_competency_averages(scores)
     persona_avgs = compute_persona_averages(scores)
-    report_paths = generate_charts(session["session_id"], competency_avgs, overall_scores)
+    # Charts render in the background (see chart_jobs); the paths are known up front.
+    report_paths = chart_jobs.renderer.submit(session["session_id"], competency_avgs, overall_scores)
 
     # The headline overall score is the numeric average from the scoring pipeline, so it stays
     # consistent with the per-question / persona / competency figures shown elsewhere. The LLM
@@ -5,11 +5,12 @@ from typing import Any, Dict
 
 from server.core.json_utils import parse_json_response
 from server.core.personas import persona_style
+from server.core.state import SessionLike
 from server.llm import dispatch, mock, prompts
 from server.llm.schemas import Rubric, Scorecard
 
 
-def build_scoring_prompt(session: Dict[str, Any], question: Dict[str, Any], answer_text: str, persona: str) -> str:
+def build_scoring_prompt(session: SessionLike, question: Dict[str, Any], answer_text: str, persona: str) -> str:
     rubric_json = json.dumps(session["rubric"], indent=2)
     style = persona_style(persona)
     return (
@@ -40,7 +41,7 @@ def _call_and_validate(prompt: str, cfg: dispatch.LLMConfig) -> tuple[Scorecard,
     raise RuntimeError(error_message or "LLM JSON validation failed")
 
 
-def score_answer(session: Dict[str, Any], question: Dict[str, Any], answer_text: str, persona: str, api_key: str | None = None) -> Dict[str, Any]:
+def score_answer(session: SessionLike, question: Dict[str, Any], answer_text: str, persona: str, api_key: str | None = None) -> Dict[str, Any]:
     rubric = Rubric.model_validate(session["rubric"])
     provider = dispatch.normalize_provider(session.get("provider", ""))
     prompt_text = ""
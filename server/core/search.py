@@ -0,0 +1,238 @@
+"""Full-text search over sessions: job specs, CVs, question text and answer text.
+
+Each searchable text is one document row tagged with its session and kind, written in the same
+transaction as the save that produced it (see storage._apply_delta), so the index never lags
+the sessions it describes.
+
+    SQLite      an FTS5 table (porter stemming) ranked by bm25. FTS5 can't index a lookup
+                column, so session_search_docs maps each FTS rowid to its session/kind; that's
+                what lets a session's documents be replaced without scanning the index.
+    PostgreSQL  one table with a generated tsvector column and a GIN index, ranked by ts_rank.
+
+Neither table is an ORM model: both need DDL that create_all() can't express, so it's issued
+from MetaData create/drop hooks.
+"""
+from __future__ import annotations
+
+import html
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from server.db.database import Base
+
+# Session fields indexed as one document each, and list items indexed one document per item:
+# field -> (kind, key of the item's text).
+SEARCH_FIELDS = {"job_spec": "job_spec", "cv_text": "cv"}
+SEARCH_ITEMS = {"questions": ("question", "text"), "answers": ("answer", "answer_text")}
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+# The database marks matches with these private-use characters; the rest of the snippet is
+# CV/answer text, so it's HTML-escaped before they become the tags above.
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+_SQLITE_DDL = (
+    "CREATE TABLE IF NOT EXISTS session_search_docs ("
+    "id INTEGER PRIMARY KEY, session_id VARCHAR NOT NULL, kind VARCHAR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_session_search_docs_session ON session_search_docs (session_id, kind)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS session_search USING fts5(body, tokenize='porter unicode61')",
+)
+_POSTGRES_DDL = (
+    "CREATE TABLE IF NOT EXISTS session_search ("
+    "id BIGSERIAL PRIMARY KEY, session_id VARCHAR NOT NULL, kind VARCHAR NOT NULL, body TEXT NOT NULL, "
+    "tsv tsvector GENERATED ALWAYS AS (to_tsvector('english', body)) STORED)",
+    "CREATE INDEX IF NOT EXISTS ix_session_search_tsv ON session_search USING GIN (tsv)",
+    "CREATE INDEX IF NOT EXISTS ix_session_search_session ON session_search (session_id, kind)",
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_tables(target: Any, connection: Any, **kw: Any) -> None:
+    ddl = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRES_DDL}.get(connection.dialect.name, ())
+    for statement in ddl:
+        connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_tables(target: Any, connection: Any, **kw: Any) -> None:
+    if connection.dialect.name in ("sqlite", "postgresql"):
+        connection.execute(text("DROP TABLE IF EXISTS session_search"))
+        connection.execute(text("DROP TABLE IF EXISTS session_search_docs"))
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _insert_documents(db: Session, docs: List[Tuple[str, str, str]]) -> None:
+    """Add (session_id, kind, body) documents."""
+    if not docs:
+        return
+    dialect = _dialect(db)
+    rows = [{"session_id": session_id, "kind": kind, "body": body} for session_id, kind, body in docs]
+    if dialect == "sqlite":
+        first = db.execute(text(
+            "INSERT INTO session_search_docs (session_id, kind) VALUES (:session_id, :kind) RETURNING id"
+        ), rows[0]).scalar_one()
+        # That insert holds SQLite's write lock until commit, and ids are max(id) + 1, so the
+        # ids after it are free: the rest go in as two multi-row inserts, not two per document.
+        for doc_id, row in enumerate(rows, start=first):
+            row["id"] = doc_id
+        if len(rows) > 1:
+            db.execute(
+                text("INSERT INTO session_search_docs (id, session_id, kind) VALUES (:id, :session_id, :kind)"),
+                rows[1:],
+            )
+        db.execute(text("INSERT INTO session_search (rowid, body) VALUES (:id, :body)"), rows)
+    elif dialect == "postgresql":
+        db.execute(
+            text("INSERT INTO session_search (session_id, kind, body) VALUES (:session_id, :kind, :body)"), rows
+        )
+
+
+def index_documents(db: Session, session_id: str, kind: str, bodies: Iterable[str], replace: bool = False) -> None:
+    """Add documents of one kind for a session; with ``replace``, drop its existing ones first."""
+    dialect = _dialect(db)
+    params = {"session_id": session_id, "kind": kind}
+    if replace:
+        if dialect == "sqlite":
+            db.execute(text(
+                "DELETE FROM session_search WHERE rowid IN "
+                "(SELECT id FROM session_search_docs WHERE session_id = :session_id AND kind = :kind)"
+            ), params)
+            db.execute(text("DELETE FROM session_search_docs WHERE session_id = :session_id AND kind = :kind"), params)
+        elif dialect == "postgresql":
+            db.execute(text("DELETE FROM session_search WHERE session_id = :session_id AND kind = :kind"), params)
+    _insert_documents(db, [(session_id, kind, body) for body in bodies if body])
+
+
+def _item_bodies(field: str, items: Iterable[Dict[str, Any]]) -> List[str]:
+    _, key = SEARCH_ITEMS[field]
+    return [str(item.get(key) or "") for item in items if isinstance(item, dict)]
+
+
+def _session_documents(session_id: str, fields: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    docs = []
+    for field, kind in SEARCH_FIELDS.items():
+        if fields.get(field):
+            docs.append((session_id, kind, fields[field]))
+    for field, (kind, _) in SEARCH_ITEMS.items():
+        docs += [(session_id, kind, body) for body in _item_bodies(field, fields.get(field) or []) if body]
+    return docs
+
+
+def index_session(db: Session, session_id: str, fields: Dict[str, Any], replace: bool) -> None:
+    """Index whatever searchable fields/lists ``fields`` carries (a payload or a delta's fields)."""
+    for field, kind in SEARCH_FIELDS.items():
+        if field in fields:
+            index_documents(db, session_id, kind, [fields[field] or ""], replace=replace)
+    for field, (kind, _) in SEARCH_ITEMS.items():
+        if field in fields:
+            index_documents(db, session_id, kind, _item_bodies(field, fields[field] or []), replace=replace)
+
+
+def index_new_sessions(db: Session, sessions: Dict[str, Dict[str, Any]]) -> None:
+    """Index many sessions that have no documents yet (bulk import) in one go."""
+    _insert_documents(db, [doc for sid, fields in sessions.items() for doc in _session_documents(sid, fields)])
+
+
+def index_appends(db: Session, session_id: str, appends: Dict[str, List[Any]]) -> None:
+    for field, (kind, _) in SEARCH_ITEMS.items():
+        if appends.get(field):
+            index_documents(db, session_id, kind, _item_bodies(field, appends[field]))
+
+
+def drop_session(db: Session, session_id: str) -> None:
+    """Remove every document of a session."""
+    dialect = _dialect(db)
+    params = {"session_id": session_id}
+    if dialect == "sqlite":
+        db.execute(text(
+            "DELETE FROM session_search WHERE rowid IN "
+            "(SELECT id FROM session_search_docs WHERE session_id = :session_id)"
+        ), params)
+        db.execute(text("DELETE FROM session_search_docs WHERE session_id = :session_id"), params)
+    elif dialect == "postgresql":
+        db.execute(text("DELETE FROM session_search WHERE session_id = :session_id"), params)
+
+
+def unindexed_sessions(db: Session, after: str, limit: int) -> List[str]:
+    """Ids of sessions (past ``after``, in id order) with no documents at all — saved before
+    search existed. An indexed session always has its job_spec document (specs are required);
+    archived sessions have none on purpose."""
+    table = {"sqlite": "session_search_docs", "postgresql": "session_search"}.get(_dialect(db))
+    if table is None:
+        return []
+    rows = db.execute(text(
+        f"SELECT s.session_id FROM sessions s WHERE s.session_id > :after AND s.archived_at IS NULL "
+        f"AND NOT EXISTS "
+        f"(SELECT 1 FROM {table} d WHERE d.session_id = s.session_id) "
+        f"ORDER BY s.session_id LIMIT :limit"
+    ), {"after": after, "limit": limit})
+    return [row[0] for row in rows]
+
+
+# Both backends read the input as plain words: every word must match, the last as a prefix (so
+# results follow as-you-type input). Search operators in the input are not honoured.
+
+def _fts_query(query: str) -> Optional[str]:
+    """Free text as a safe FTS5 query."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _tsquery(query: str) -> Optional[str]:
+    """Free text as a safe PostgreSQL to_tsquery() argument (word characters only)."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " & ".join(terms) + ":*"
+
+
+def _snippet_html(snippet: str) -> str:
+    """The snippet as HTML: its text escaped, its matches wrapped in <mark>."""
+    return html.escape(snippet, quote=False).replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+
+def search_documents(db: Session, query: str, limit: int) -> List[Dict[str, Any]]:
+    """Best-matching documents first, at most ``limit``: session_id, kind, snippet and score
+    (higher is better). Snippets are HTML: escaped text with matches in <mark>."""
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        match = _fts_query(query)
+        if match is None:
+            return []
+        rows = db.execute(text(
+            "SELECT d.session_id, d.kind, "
+            "snippet(session_search, 0, :start, :end, '…', 16) AS snippet, -rank AS score "
+            "FROM session_search JOIN session_search_docs d ON d.id = session_search.rowid "
+            "WHERE session_search MATCH :match ORDER BY rank LIMIT :limit"
+        ), {"match": match, "start": _MATCH_START, "end": _MATCH_END, "limit": limit})
+    elif dialect == "postgresql":
+        tsquery = _tsquery(query)
+        if tsquery is None:
+            return []
+        # Headlines are costly, so they're built only for the page of hits, not every match.
+        rows = db.execute(text(
+            "SELECT hits.session_id, hits.kind, "
+            "ts_headline('english', hits.body, hits.q, :options) AS snippet, hits.score "
+            "FROM (SELECT s.session_id, s.kind, s.body, q, ts_rank(s.tsv, q) AS score "
+            "      FROM session_search s, to_tsquery('english', :query) q "
+            "      WHERE s.tsv @@ q ORDER BY score DESC LIMIT :limit) hits "
+            "ORDER BY hits.score DESC"
+        ), {
+            "query": tsquery,
+            "limit": limit,
+            "options": f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, MaxWords=24, MinWords=8",
+        })
+    else:
+        return []
+    return [{**row._mapping, "snippet": _snippet_html(row.snippet)} for row in rows]
@@ -0,0 +1,331 @@
+"""Per-session state shared between API workers.
+
+Two things used to live in module-level dicts in server/main.py, which breaks as soon as
+uvicorn runs more than one worker process:
+
+    API keys   — the user's LLM key, given at /start and needed by every later call. Kept only
+                 for a limited time (SESSION_KEY_TTL) and never written to the sessions table.
+    the cache  — live SessionState objects, so a request doesn't reload the session from the
+                 database. With several workers, a cached copy goes stale as soon as another
+                 worker saves the session, so each save bumps a per-session version in the
+                 shared store and a cached copy is only reused while its version is current.
+
+It also keeps completed /answer and /end responses for IDEMPOTENCY_TTL, so a retried request
+is answered from the store instead of being scored again (see server.main._idempotent).
+
+SESSION_STORE picks where that shared state lives:
+
+    memory    per-process dicts (the default; one worker only).
+    database  a table in the app database: SQLite for several workers on one host, PostgreSQL
+              (DATABASE_URL) across hosts.
+    redis     a Redis-compatible server at SESSION_STORE_URL (needs the `redis` package).
+
+API keys leaving the process are encrypted with a key derived from SESSION_STORE_SECRET, which
+every worker must share.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from server.core.state import SessionState
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "redis://localhost:6379/0")
+SESSION_STORE_SECRET = os.getenv("SESSION_STORE_SECRET")
+# How long a session's API key is kept after /start, in seconds.
+SESSION_KEY_TTL = int(os.getenv("SESSION_KEY_TTL", str(4 * 60 * 60)))
+# How long a completed /answer or /end response is replayed to retries, in seconds.
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))
+
+
+class KeyCipher:
+    """Fernet (AES + HMAC) encryption for API keys at rest, keyed by SESSION_STORE_SECRET."""
+
+    def __init__(self, secret: str) -> None:
+        from cryptography.fernet import Fernet
+
+        self._fernet = Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest()))
+
+    def encrypt(self, value: str) -> bytes:
+        return self._fernet.encrypt(value.encode("utf-8"))
+
+    def decrypt(self, token: bytes) -> Optional[str]:
+        from cryptography.fernet import InvalidToken
+
+        try:
+            return self._fernet.decrypt(token).decode("utf-8")
+        except InvalidToken:
+            # Written under a different secret (e.g. before a restart that generated a new one).
+            return None
+
+
+class MemoryStore:
+    """Process-local store; correct only with a single worker."""
+
+    shared = False
+
+    def __init__(self) -> None:
+        self._keys: Dict[str, Tuple[str, float]] = {}
+        self._versions: Dict[str, int] = {}
+        # Insertion-ordered with one TTL, so the expired entries are always the oldest.
+        self._responses: Dict[str, Tuple[bytes, float]] = {}
+
+    def put_api_key(self, session_id: str, api_key: str, ttl: int) -> None:
+        self._keys[session_id] = (api_key, time.time() + ttl)
+
+    def get_api_key(self, session_id: str) -> Optional[str]:
+        entry = self._keys.get(session_id)
+        if entry is None:
+            return None
+        if entry[1] < time.time():
+            self._keys.pop(session_id, None)
+            return None
+        return entry[0]
+
+    def drop_api_key(self, session_id: str) -> None:
+        self._keys.pop(session_id, None)
+
+    def get_version(self, session_id: str) -> int:
+        return self._versions.get(session_id, 0)
+
+    def bump_version(self, session_id: str) -> int:
+        self._versions[session_id] = self._versions.get(session_id, 0) + 1
+        return self._versions[session_id]
+
+    def put_response(self, key: str, value: bytes, ttl: int) -> None:
+        now = time.time()
+        while self._responses:
+            oldest = next(iter(self._responses))
+            if self._responses[oldest][1] >= now:
+                break
+            del self._responses[oldest]
+        self._responses.pop(key, None)
+        self._responses[key] = (value, now + ttl)
+
+    def get_response(self, key: str) -> Optional[bytes]:
+        entry = self._responses.get(key)
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+
+class DatabaseStore:
+    """Shared state in the app database's session_store table."""
+
+    shared = True
+
+    def __init__(self, cipher: KeyCipher) -> None:
+        self.cipher = cipher
+
+    def put_api_key(self, session_id: str, api_key: str, ttl: int) -> None:
+        self._put(f"key:{session_id}", self.cipher.encrypt(api_key), ttl)
+
+    def _put(self, key: str, value: bytes, ttl: int) -> None:
+        from server.db.database import SessionLocal, dialect_insert
+        from server.db.models import SessionStoreEntry
+
+        now = time.time()
+        values = {"value": value, "expires_at": now + ttl}
+        with SessionLocal() as db:
+            # Expired entries are cleared as new ones come in; nothing else needs to sweep.
+            db.query(SessionStoreEntry).filter(SessionStoreEntry.expires_at < now).delete(
+                synchronize_session=False
+            )
+            insert = dialect_insert(db.get_bind())
+            if insert is None:
+                db.merge(SessionStoreEntry(key=key, **values))
+            else:
+                db.execute(
+                    insert(SessionStoreEntry)
+                    .values(key=key, **values)
+                    .on_conflict_do_update(index_elements=["key"], set_=values)
+                )
+            db.commit()
+
+    def get_api_key(self, session_id: str) -> Optional[str]:
+        token = self._get(f"key:{session_id}")
+        return self.cipher.decrypt(token) if token is not None else None
+
+    def _get(self, key: str) -> Optional[bytes]:
+        from server.db.database import SessionLocal
+        from server.db.models import SessionStoreEntry
+
+        with SessionLocal() as db:
+            row = db.get(SessionStoreEntry, key)
+            if row is None or row.value is None or (row.expires_at or 0) < time.time():
+                return None
+            return bytes(row.value)
+
+    def put_response(self, key: str, value: bytes, ttl: int) -> None:
+        self._put(f"response:{key}", value, ttl)
+
+    def get_response(self, key: str) -> Optional[bytes]:
+        return self._get(f"response:{key}")
+
+    def drop_api_key(self, session_id: str) -> None:
+        from server.db.database import SessionLocal
+        from server.db.models import SessionStoreEntry
+
+        with SessionLocal() as db:
+            db.query(SessionStoreEntry).filter(SessionStoreEntry.key == f"key:{session_id}").delete(
+                synchronize_session=False
+            )
+            db.commit()
+
+    def get_version(self, session_id: str) -> int:
+        from server.db.database import SessionLocal
+        from server.db.models import SessionStoreEntry
+
+        with SessionLocal() as db:
+            row = db.get(SessionStoreEntry, f"version:{session_id}")
+            return row.counter if row is not None else 0
+
+    def bump_version(self, session_id: str) -> int:
+        from server.db.database import SessionLocal, dialect_insert
+        from server.db.models import SessionStoreEntry
+
+        key = f"version:{session_id}"
+        with SessionLocal() as db:
+            insert = dialect_insert(db.get_bind())
+            if insert is None:
+                row = db.get(SessionStoreEntry, key, with_for_update=True)
+                if row is None:
+                    db.add(SessionStoreEntry(key=key, counter=1))
+                else:
+                    row.counter += 1
+                db.flush()
+            else:
+                db.execute(
+                    insert(SessionStoreEntry)
+                    .values(key=key, counter=1)
+                    .on_conflict_do_update(
+                        index_elements=["key"], set_={"counter": SessionStoreEntry.counter + 1}
+                    )
+                )
+            version = db.get(SessionStoreEntry, key).counter
+            db.commit()
+            return version
+
+
+class RedisStore:
+    """Shared state in Redis (or anything speaking its protocol)."""
+
+    shared = True
+    # Versions only matter while some worker may hold the session in memory.
+    VERSION_TTL = 24 * 60 * 60
+
+    def __init__(self, client: Any, cipher: KeyCipher, prefix: str = "intervue:") -> None:
+        self.client = client
+        self.cipher = cipher
+        self.prefix = prefix
+
+    def put_api_key(self, session_id: str, api_key: str, ttl: int) -> None:
+        self.client.set(f"{self.prefix}key:{session_id}", self.cipher.encrypt(api_key), ex=ttl)
+
+    def get_api_key(self, session_id: str) -> Optional[str]:
+        token = self.client.get(f"{self.prefix}key:{session_id}")
+        return self.cipher.decrypt(token) if token is not None else None
+
+    def drop_api_key(self, session_id: str) -> None:
+        self.client.delete(f"{self.prefix}key:{session_id}")
+
+    def get_version(self, session_id: str) -> int:
+        return int(self.client.get(f"{self.prefix}version:{session_id}") or 0)
+
+    def bump_version(self, session_id: str) -> int:
+        key = f"{self.prefix}version:{session_id}"
+        pipe = self.client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, self.VERSION_TTL)
+        return int(pipe.execute()[0])
+
+    def put_response(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(f"{self.prefix}response:{key}", value, ex=ttl)
+
+    def get_response(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}response:{key}")
+
+
+def make_store(kind: str = SESSION_STORE, secret: Optional[str] = SESSION_STORE_SECRET, url: str = SESSION_STORE_URL) -> Any:
+    if kind == "memory":
+        return MemoryStore()
+    if kind not in ("database", "redis"):
+        raise ValueError(f"Unknown SESSION_STORE {kind!r}; expected memory, database or redis")
+    if not secret:
+        raise ValueError(f"SESSION_STORE={kind} keeps API keys outside the process; set SESSION_STORE_SECRET")
+    cipher = KeyCipher(secret)
+    if kind == "database":
+        return DatabaseStore(cipher)
+    import redis
+
+    return RedisStore(redis.Redis.from_url(url), cipher)
+
+
+async def _call(store: Any, fn: Any, *args: Any) -> Any:
+    # Shared backends do network/disk I/O; keep it off the event loop.
+    if store.shared:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+class SessionCache:
+    """Live SessionState objects for this worker, validated against the shared version."""
+
+    def __init__(self, store: Any) -> None:
+        self.store = store
+        self._local: Dict[str, Tuple[int, SessionState]] = {}
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        entry = self._local.get(session_id)
+        if entry is None:
+            return None
+        if self.store.shared and await _call(self.store, self.store.get_version, session_id) != entry[0]:
+            # Another worker saved the session since this copy was loaded.
+            self._local.pop(session_id, None)
+            return None
+        return entry[1]
+
+    async def version(self, session_id: str) -> int:
+        """The current version; read it *before* loading, so a save racing the load only ever
+        makes the cached copy look older than it is."""
+        return await _call(self.store, self.store.get_version, session_id)
+
+    def put(self, state: SessionState, version: int) -> None:
+        self._local[state.session_id] = (version, state)
+
+    async def saved(self, state: SessionState) -> None:
+        """Record a committed save: other workers' copies of the session are now stale."""
+        version = await _call(self.store, self.store.bump_version, state.session_id)
+        self._local[state.session_id] = (version, state)
+
+    def evict(self, session_id: str) -> None:
+        self._local.pop(session_id, None)
+
+
+store = make_store()
+cache = SessionCache(store)
+
+
+async def put_api_key(session_id: str, api_key: str) -> None:
+    await _call(store, store.put_api_key, session_id, api_key, SESSION_KEY_TTL)
+
+
+async def get_api_key(session_id: str) -> Optional[str]:
+    return await _call(store, store.get_api_key, session_id)
+
+
+async def drop_api_key(session_id: str) -> None:
+    await _call(store, store.drop_api_key, session_id)
+
+
+async def put_response(key: str, value: bytes) -> None:
+    await _call(store, store.put_response, key, value, IDEMPOTENCY_TTL)
+
+
+async def get_response(key: str) -> Optional[bytes]:
+    return await _call(store, store.get_response, key)
@@ -0,0 +1,135 @@
+"""Per-session serialization and single-flight coalescing for the interview routes.
+
+A double-clicked button or a client retry used to run the same route twice for one session,
+side by side: /next_question generated two questions, /answer scored the same answer twice,
+and both copies raced to save. Routes that change a session now go through ``gate.run``:
+
+    lock          requests for one session run one at a time, in arrival order, so each sees
+                  what the previous one saved (a second /next_question finds the question the
+                  first one asked still unanswered and returns it).
+    single-flight a request identical to one already running for the session (same route, and
+                  for /answer the same question and answer text) doesn't run at all: it waits
+                  for the running one and gets its result, or its error. The call is only
+                  cancelled for a disconnect once every request waiting on it has gone (see
+                  ``Flight.abandoned``); a waiter still connected when a call ends that way
+                  runs it again itself instead of passing on the "client closed" error.
+
+Both are per process. uvicorn's ``--workers`` share one socket, so a session can't be pinned to
+one of them: run one worker per process or container, and route each session to one of those
+(sticky sessions) for the same guarantees. The shared session store keeps their caches honest.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Returns whether a waiting request's client has gone away (Request.is_disconnected).
+Disconnected = Callable[[], Awaitable[bool]]
+
+
+def _never() -> Disconnected:
+    async def connected() -> bool:
+        return False
+    return connected
+
+
+class Flight:
+    """One running call and the requests waiting on its outcome."""
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self._waiters: List[Disconnected] = []
+        # Set once the call was cut short because nobody was left to answer.
+        self.given_up = False
+
+    async def abandoned(self) -> bool:
+        """Whether every request waiting on this call has disconnected. The first time it is,
+        the call is marked given up, so waiters arriving after that run it again."""
+        for disconnected in list(self._waiters):
+            if not await disconnected():
+                return False
+        self.given_up = True
+        return True
+
+
+# The flight the running task is the leader of; _run_llm asks it before cancelling.
+current: contextvars.ContextVar[Optional[Flight]] = contextvars.ContextVar("single_flight", default=None)
+
+
+class SessionGate:
+    def __init__(self) -> None:
+        # session_id -> [lock, number of requests holding or waiting on it]
+        self._locks: Dict[str, List[Any]] = {}
+        self._inflight: Dict[Tuple[str, Hashable], Flight] = {}
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    @contextlib.asynccontextmanager
+    async def lock(self, session_id: str) -> AsyncIterator[None]:
+        """Hold the session's lock. It's dropped once nobody holds or waits on it, so idle
+        sessions cost nothing."""
+        entry = self._locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._locks.pop(session_id, None)
+
+    async def run(
+        self,
+        session_id: str,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        disconnected: Optional[Disconnected] = None,
+    ) -> Any:
+        """``await fn()`` under the session's lock, unless the same ``key`` is already running
+        for the session, in which case share that call's outcome. ``disconnected`` tells
+        whether this request's client has gone; without it the request counts as connected."""
+        disconnected = disconnected or _never()
+        flight_key = (session_id, key)
+        while True:
+            running = self._inflight.get(flight_key)
+            if running is None:
+                break
+            running._waiters.append(disconnected)
+            try:
+                # shield: a follower giving up (e.g. its client went away) must not cancel the leader.
+                return await asyncio.shield(running.future)
+            except BaseException:
+                # Given up because everyone waiting had gone, but this client is (still or
+                # again) here: run the call afresh rather than answer "client closed".
+                if not (running.future.done() and running.given_up) or await disconnected():
+                    raise
+            finally:
+                running._waiters.remove(disconnected)
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers may all have gone; don't let an unread error be logged as "never retrieved".
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        flight = Flight(future)
+        flight._waiters.append(disconnected)
+        self._inflight[flight_key] = flight
+        token = current.set(flight)
+        try:
+            async with self.lock(session_id):
+                result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            current.reset(token)
+            self._inflight.pop(flight_key, None)
+
+gate = SessionGate()
@@ -2,13 +2,146 @@ from __future__ import annotations
 
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
-from server.core.storage import save_session
+from server.core.storage import LIST_COLUMNS, SessionDelta, save_session_delta
+
+# Attributes that make up the persisted session (everything to_dict() returns). Assigning any
+# of them marks it dirty; the list fields are additionally tracked by how many items have
+# already been saved, so appends persist as appends.
+PERSISTED_FIELDS = (
+    "session_id",
+    "job_spec",
+    "cv_text",
+    "provider",
+    "model",
+    "base_url",
+    "start_round",
+    "created_at",
+    "rubric",
+    "persona",
+    "cv_analysis",
+    "questions",
+    "answers",
+    "scores",
+    "logs",
+    "status",
+)
+# Left out when a session is resumed (see SessionState.resume) and read from storage by
+# aload(): the big texts, the rubric and analysis, and the score/log history. Resuming for
+# next_question needs none of them.
+LAZY_FIELDS = ("job_spec", "cv_text", "rubric", "cv_analysis", "scores", "logs")
+RESUME_FIELDS = tuple(name for name in PERSISTED_FIELDS if name not in LAZY_FIELDS)
+
+
+class NotLoaded(RuntimeError):
+    """A lazy field of a resumed session was read before ``aload()`` (or ``load()``)."""
+
+
+class SessionIndex:
+    """Lookups by question_id over a session's questions, answers and scores, plus question
+    counts, so per-request work doesn't grow with the length of the interview.
+
+    Each list is indexed incrementally: a lookup visits only the items appended since the
+    last one, and a list that was reassigned or shrank is re-indexed from scratch. Lists are
+    synced independently, so a question lookup never loads a lazy score history.
+    """
+
+    __slots__ = (
+        "_source",
+        "_seen",
+        "questions_by_qid",
+        "answers_by_qid",
+        "scores_by_qid",
+        "main_count",
+        "followup_count",
+        "followed_up",
+    )
+
+    def __init__(self, source: Any) -> None:
+        self._source = source
+        # list name -> (the list object, how many of its items are indexed)
+        self._seen: Dict[str, Tuple[List[Any], int]] = {}
+
+    def _sync(self, name: str) -> None:
+        items = self._source.get(name) or []
+        seen = self._seen.get(name)
+        start = 0
+        if seen is not None and seen[0] is items and len(items) >= seen[1]:
+            start = seen[1]
+        if start == 0:
+            self._reset(name)
+        for item in items[start:]:
+            self._add(name, item)
+        self._seen[name] = (items, len(items))
+
+    def _reset(self, name: str) -> None:
+        if name == "questions":
+            self.questions_by_qid: Dict[str, Dict[str, Any]] = {}
+            self.main_count = 0
+            self.followup_count = 0
+            self.followed_up: Set[str] = set()
+        elif name == "answers":
+            self.answers_by_qid: Dict[str, List[Dict[str, Any]]] = {}
+        else:
+            self.scores_by_qid: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _add(self, name: str, item: Dict[str, Any]) -> None:
+        qid = item.get("question_id")
+        if name == "questions":
+            self.questions_by_qid.setdefault(qid, item)
+            kind = item.get("kind", "main")
+            self.main_count += kind == "main"
+            self.followup_count += kind == "follow_up"
+            if item.get("parent_id"):
+                self.followed_up.add(item["parent_id"])
+        elif name == "answers":
+            self.answers_by_qid.setdefault(qid, []).append(item)
+        else:
+            self.scores_by_qid.setdefault(qid, []).append(item)
+
+    def question(self, qid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The first question with this id."""
+        self._sync("questions")
+        return self.questions_by_qid.get(qid)
+
+    def question_counts(self) -> Tuple[int, int]:
+        """(main questions, follow-ups) asked so far."""
+        self._sync("questions")
+        return self.main_count, self.followup_count
+
+    def is_followed_up(self, qid: Optional[str]) -> bool:
+        self._sync("questions")
+        return qid in self.followed_up
+
+    def answers(self, qid: Optional[str]) -> List[Dict[str, Any]]:
+        """Answers to this question, in the order given."""
+        self._sync("answers")
+        return self.answers_by_qid.get(qid, [])
+
+    def scores(self, qid: Optional[str]) -> List[Dict[str, Any]]:
+        """Scores of this question's answers (one per persona), in the order given."""
+        self._sync("scores")
+        return self.scores_by_qid.get(qid, [])
 
 
 class SessionState:
+    """A live interview session.
+
+    Reads like the stored session dict as well (``session["rubric"]``, ``session.get("scores",
+    [])``), so the core modules take the state itself rather than a ``to_dict()`` copy, and look
+    things up through ``index`` (see ``session_index``) instead of scanning the lists.
+    """
+
+    __slots__ = PERSISTED_FIELDS + ("audit_logs", "index", "_dirty", "_saved_lengths", "_persisted", "_unloaded")
+
     def __init__(self, job_spec: str, cv_text: str, provider: str, start_round: int = 1, model: Optional[str] = None, base_url: Optional[str] = None) -> None:
+        # Change tracking must exist before the first tracked assignment below.
+        object.__setattr__(self, "_dirty", set())
+        object.__setattr__(self, "_saved_lengths", {name: 0 for name in LIST_COLUMNS})
+        object.__setattr__(self, "_persisted", False)
+        object.__setattr__(self, "_unloaded", set())
+        object.__setattr__(self, "index", SessionIndex(self))
         self.session_id = str(uuid.uuid4())
         self.job_spec = job_spec
         self.cv_text = cv_text
@@ -25,8 +158,108 @@ class SessionState:
         self.answers: List[Dict[str, Any]] = []
         self.scores: List[Dict[str, Any]] = []
         self.logs: List[Dict[str, Any]] = []
+        # Raw LLM prompt/response entries awaiting save. They're written to the compressed audit
+        # store and dropped from memory on save — never loaded back with the session.
+        self.audit_logs: List[Dict[str, Any]] = []
         self.status = "active"
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in PERSISTED_FIELDS:
+            self._dirty.add(name)
+            # Assigning a field that was never loaded replaces it; nothing left to fetch.
+            self._unloaded.discard(name)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached when normal lookup fails, i.e. for a lazy field not loaded yet. Loading
+        # it here would block whatever thread reads it (the event loop, in a route) on a query
+        # per field, so a missing ``await session.aload()`` fails loudly instead.
+        try:
+            unloaded = object.__getattribute__(self, "_unloaded")
+        except AttributeError:
+            raise AttributeError(name) from None
+        if name not in unloaded:
+            raise AttributeError(name)
+        raise NotLoaded(f"{name!r} of session {self.session_id} is not loaded; await session.aload() first")
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in PERSISTED_FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return getattr(self, name) if name in PERSISTED_FIELDS else default
+
+    def _fill(self, payload: Dict[str, Any]) -> None:
+        """Set lazily loaded fields from a partial payload without marking them dirty."""
+        for name in list(self._unloaded):
+            if name not in payload:
+                continue
+            value = payload[name]
+            if name in LIST_COLUMNS:
+                value = value or []
+                self._saved_lengths[name] = len(value)
+            object.__setattr__(self, name, value)
+            self._unloaded.discard(name)
+
+    @classmethod
+    def resume(cls, payload: Dict[str, Any]) -> "SessionState":
+        """Rebuild from a partial payload, as loaded with ``fields=RESUME_FIELDS``. The
+        LAZY_FIELDS it lacks can't be read until ``aload()`` fetches them."""
+        full = {name: None for name in LAZY_FIELDS}
+        full.update(payload)
+        state = cls.from_payload(full)
+        for name in LAZY_FIELDS:
+            if name not in payload:
+                object.__delattr__(state, name)
+                state._unloaded.add(name)
+        return state
+
+    async def aload(self) -> None:
+        """Load every lazy field still missing, off the event loop, in one read. Call before
+        anything that needs the whole session (to_dict, question generation, scoring)."""
+        if not self._unloaded:
+            return
+        from server.core import async_storage
+
+        self._fill(await async_storage.load_session(self.session_id, list(self._unloaded)))
+
+    def load(self) -> None:
+        """``aload()`` for synchronous callers (scripts, tests); blocks on the read."""
+        if not self._unloaded:
+            return
+        from server.core.storage import load_session
+
+        self._fill(load_session(self.session_id, list(self._unloaded)))
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "SessionState":
+        """Rebuild a state from a stored session dict; the result starts clean (nothing to save)."""
+        # Older DB rows stored start_round as FLOAT (the column predates the Integer model and
+        # create_all() won't alter it), which later breaks list slicing ("slice indices must be
+        # integers"). Coerce on load so resume works regardless of the stored column type.
+        start_round = int(payload.get("start_round") or 1)
+        state = cls(
+            payload["job_spec"],
+            payload["cv_text"],
+            payload["provider"],
+            start_round,
+            model=payload.get("model"),
+            base_url=payload.get("base_url"),
+        )
+        state.session_id = payload["session_id"]
+        state.created_at = payload["created_at"]
+        state.rubric = payload.get("rubric")
+        state.persona = payload.get("persona")
+        state.cv_analysis = payload.get("cv_analysis")
+        state.questions = payload.get("questions") or []
+        state.answers = payload.get("answers") or []
+        state.scores = payload.get("scores") or []
+        state.logs = payload.get("logs") or []
+        state.status = payload.get("status", "active")
+        state.mark_persisted()
+        return state
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "session_id": self.session_id,
@@ -47,8 +280,113 @@ class SessionState:
             "status": self.status,
         }
 
+    def pending_delta(self) -> SessionDelta:
+        """Everything changed since the last save.
+
+        Lists are expected to be append-only: items past the saved length are sent as appends.
+        Reassigning a list (or shrinking it) sends the whole list instead. In-place edits to
+        already-saved items are not detected — reassign the list if you ever need that.
+        The delta holds copies of the lists, so it's safe to write while the session moves on.
+        """
+        if not self._persisted:
+            fields = self.to_dict()
+            for name in LIST_COLUMNS:
+                fields[name] = list(fields[name])
+            return SessionDelta(fields=fields, audit=list(self.audit_logs), created=True)
+
+        fields = {}
+        appends: Dict[str, List[Any]] = {}
+        offsets: Dict[str, int] = {}
+        for name in self._dirty:
+            if name not in LIST_COLUMNS:
+                fields[name] = getattr(self, name)
+        for name in LIST_COLUMNS:
+            if name in self._unloaded:
+                continue  # never read, so never changed
+            items = getattr(self, name)
+            saved = self._saved_lengths[name]
+            if name in self._dirty or len(items) < saved:
+                fields[name] = list(items)
+            elif len(items) > saved:
+                appends[name] = items[saved:]
+                offsets[name] = saved
+        return SessionDelta(fields=fields, appends=appends, offsets=offsets, audit=list(self.audit_logs))
+
+    def mark_persisted(self) -> None:
+        """Record the current state as saved: clear dirty flags, move the list watermarks and drop
+        the audit entries that were written."""
+        self._dirty.clear()
+        self.audit_logs.clear()
+        for name in LIST_COLUMNS:
+            if name not in self._unloaded:
+                self._saved_lengths[name] = len(getattr(self, name))
+        object.__setattr__(self, "_persisted", True)
+
+    def _take_delta(self) -> Tuple[SessionDelta, Tuple[Any, ...]]:
+        """Take the pending delta and mark it saved up front.
+
+        Marking before the write (rather than after) means changes made while an async write is
+        in flight stay pending for the next save instead of being swallowed by it. Returns the
+        delta plus what ``_restore_delta`` needs to undo the marking if the write fails.
+        """
+        delta = self.pending_delta()
+        undo = (set(self._dirty), dict(self._saved_lengths), self._persisted)
+        self._dirty.clear()
+        del self.audit_logs[: len(delta.audit)]
+        for name in LIST_COLUMNS:
+            if name in delta.fields:
+                self._saved_lengths[name] = len(delta.fields[name])
+            else:
+                self._saved_lengths[name] += len(delta.appends.get(name, []))
+        object.__setattr__(self, "_persisted", True)
+        return delta, undo
+
+    def _restore_delta(self, delta: SessionDelta, undo: Tuple[Any, ...]) -> None:
+        dirty, saved_lengths, persisted = undo
+        self._dirty.update(dirty)
+        self._saved_lengths.update(saved_lengths)
+        self.audit_logs[:0] = delta.audit
+        object.__setattr__(self, "_persisted", persisted)
+
     def save(self) -> None:
-        save_session(self.session_id, self.to_dict())
+        delta, undo = self._take_delta()
+        if delta.is_empty():
+            return
+        try:
+            save_session_delta(self.session_id, delta)
+        except Exception:
+            self._restore_delta(delta, undo)
+            raise
+
+    async def asave(self) -> None:
+        """``save()`` for async callers: the write runs on the storage thread, off the event loop.
+
+        In write-behind mode the delta is only queued; see server.core.write_behind.
+        """
+        from server.core import async_storage, write_behind
+
+        delta, undo = self._take_delta()
+        if delta.is_empty():
+            return
+        if write_behind.WRITE_BEHIND:
+            write_behind.queue.enqueue(self.session_id, delta)
+            return
+        try:
+            await async_storage.save_session_delta(self.session_id, delta)
+        except Exception:
+            self._restore_delta(delta, undo)
+            raise
+
+
+# What the core modules accept: a live state, or a plain session dict (tests, stored payloads).
+SessionLike = Union[SessionState, Dict[str, Any]]
+
+
+def session_index(session: SessionLike) -> SessionIndex:
+    """The state's maintained index, or a one-off index over a plain session dict."""
+    if isinstance(session, SessionState):
+        return session.index
+    return SessionIndex(session)
 
 
 def load_session_state(session_id: str) -> Dict[str, Any]:
@@ -1,15 +1,48 @@
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
+import time
+import zlib
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional
 
-from server.db.database import SessionLocal, engine, Base
-from server.db.models import InterviewSession
+from sqlalchemy import Text, cast, func, inspect, null, or_, text, tuple_, update
+from sqlalchemy.orm import Session, undefer, undefer_group
+
+from server.core import locks, prompt_blobs, search
+from server.db.database import SessionLocal, engine, Base, dialect_insert
+from server.db.models import (
+    DataMigration,
+    InterviewSession,
+    LegacyImport,
+    SessionAnswer,
+    SessionAuditLog,
+    SessionLog,
+    SessionQuestion,
+    SessionScore,
+)
+
+def _upgrade_schema(bind: Any) -> None:
+    """Add columns and indexes that were introduced after a table was first created.
+
+    create_all() only creates missing tables; it never alters an existing one. New columns are
+    all nullable, so a plain ADD COLUMN is enough, and each is backfilled by its own migration.
+    """
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        with bind.begin() as conn:
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
 DATA_DIR = Path("data")
 SESSIONS_DIR = DATA_DIR / "sessions"
@@ -21,48 +54,303 @@ def ensure_dirs() -> None:
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def init_db(bind: Any = None) -> None:
+    """Create the data directories and any missing tables, columns and indexes.
+
+    Run once per process before storage is used: the server does it at startup, the bulk CLI
+    before it starts. (It used to run when this module was imported, which made every import
+    of the server, a test or a script open the database.)
+    """
+    ensure_dirs()
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    _upgrade_schema(bind)
+
+
 def get_db_session() -> Session:
     return SessionLocal()
 
 
+# Scalar/dict session fields stored as columns on the sessions row. SessionState also carries
+# model/base_url, which have no column yet, so they're skipped when writing.
+SESSION_COLUMNS = (
+    "created_at",
+    "status",
+    "job_spec",
+    "cv_text",
+    "provider",
+    "start_round",
+    "rubric",
+    "persona",
+    "cv_analysis",
+)
+# Listing titles are cut to this many characters.
+JOB_TITLE_CHARS = 80
+
+
+def job_title(job_spec: Optional[str]) -> str:
+    """The first non-blank line of a job spec, as the dashboard shows it."""
+    line = next((line.strip() for line in (job_spec or "").splitlines() if line.strip()), "")
+    return line[:JOB_TITLE_CHARS]
+
+
+def _session_values(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """The sessions-row columns to write for ``fields``, including the derived job_title."""
+    values = {k: v for k, v in fields.items() if k in SESSION_COLUMNS}
+    if "job_spec" in values:
+        values["job_title"] = job_title(values["job_spec"])
+    return values
+
+
+# The append-only lists, each stored one row per item in its own child table.
+LIST_COLUMNS = ("questions", "answers", "scores", "logs")
+CHILD_TABLES = {
+    "questions": SessionQuestion,
+    "answers": SessionAnswer,
+    "scores": SessionScore,
+    "logs": SessionLog,
+}
+
+
+# Log entries carrying either of these keys are raw LLM audit records (the full prompt and
+# response). They go to the compressed session_audit_logs store; everything else (coaching,
+# persona, cv_analysis summaries) stays inline with the session.
+AUDIT_LOG_KEYS = ("prompt", "raw_response")
+
+
+def is_audit_log(entry: Dict[str, Any]) -> bool:
+    return any(key in entry for key in AUDIT_LOG_KEYS)
+
+
+def split_audit_logs(logs: List[Dict[str, Any]]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Partition log entries into (inline, audit)."""
+    inline = [entry for entry in logs if not is_audit_log(entry)]
+    audit = [entry for entry in logs if is_audit_log(entry)]
+    return inline, audit
+
+
+class SessionDelta:
+    """What changed on a session since it was last persisted.
+
+    ``fields`` holds whole-value replacements (scalars, dicts, or a list that was reassigned
+    rather than appended to); ``appends`` holds only the new tail items of each list, with
+    ``offsets`` giving the list index of the first one. ``audit`` holds new LLM audit entries
+    bound for the compressed side store. A delta with ``created`` set is the first save of a
+    brand-new session and is written as an insert.
+    """
+
+    def __init__(
+        self,
+        fields: Optional[Dict[str, Any]] = None,
+        appends: Optional[Dict[str, List[Any]]] = None,
+        offsets: Optional[Dict[str, int]] = None,
+        audit: Optional[List[Dict[str, Any]]] = None,
+        created: bool = False,
+    ) -> None:
+        self.fields = fields or {}
+        self.appends = appends or {}
+        self.offsets = offsets or {}
+        self.audit = audit or []
+        self.created = created
+
+    def is_empty(self) -> bool:
+        return not self.created and not self.fields and not self.audit and not any(self.appends.values())
+
+    def merge(self, later: "SessionDelta") -> "SessionDelta":
+        """Coalesce ``later`` (taken after this delta) into one delta with the same effect."""
+        fields = dict(self.fields)
+        appends = {k: list(v) for k, v in self.appends.items()}
+        offsets = dict(self.offsets)
+        for name, value in later.fields.items():
+            fields[name] = value
+            appends.pop(name, None)
+            offsets.pop(name, None)
+        for name, items in later.appends.items():
+            if not items:
+                continue
+            if name in fields:
+                # Still replacing the whole list, now with the new items on the end.
+                fields[name] = list(fields[name] or []) + list(items)
+            elif name in appends:
+                appends[name].extend(items)
+            else:
+                appends[name] = list(items)
+                offsets[name] = later.offsets.get(name, 0)
+        return SessionDelta(
+            fields=fields,
+            appends=appends,
+            offsets=offsets,
+            audit=self.audit + later.audit,
+            created=self.created or later.created,
+        )
+
+
+def _child_values(field: str, session_id: str, ordinal: int, item: Dict[str, Any]) -> Dict[str, Any]:
+    """The child-table column values for one list item, lifting out its queryable fields."""
+    values = {"session_id": session_id, "ordinal": ordinal, "payload": item}
+    if field in ("questions", "answers", "scores"):
+        values["question_id"] = item.get("question_id")
+    if field == "scores":
+        values["persona"] = item.get("persona")
+        values["overall_score"] = item.get("overall_score")
+    if field == "logs":
+        values["type"] = item.get("type")
+    return values
+
+
+def _child_row(field: str, session_id: str, ordinal: int, item: Dict[str, Any]) -> Any:
+    return CHILD_TABLES[field](**_child_values(field, session_id, ordinal, item))
+
+
+def _insert_items(db: Session, field: str, session_id: str, start: int, items: List[Dict[str, Any]]) -> None:
+    db.add_all([_child_row(field, session_id, start + i, item) for i, item in enumerate(items)])
+
+
+def _replace_items(db: Session, field: str, session_id: str, items: List[Dict[str, Any]]) -> None:
+    model = CHILD_TABLES[field]
+    db.query(model).filter(model.session_id == session_id).delete(synchronize_session=False)
+    _insert_items(db, field, session_id, 0, items)
+
+
+def _audit_row(session_id: str, entry: Dict[str, Any], blobs: Dict[str, str]) -> SessionAuditLog:
+    stored = dict(entry)
+    prompt = stored.pop("prompt", None)
+    if isinstance(prompt, str):
+        stored["prompt_ref"] = prompt_blobs.dedupe_prompt(prompt, blobs)
+    elif prompt is not None:
+        stored["prompt"] = prompt
+    return SessionAuditLog(
+        session_id=session_id,
+        type=entry.get("type"),
+        timestamp=entry.get("timestamp"),
+        data=zlib.compress(json.dumps(stored).encode("utf-8")),
+    )
+
+
+def _decode_audit(data: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(data))
+
+
+def _insert_audit(db: Session, session_id: str, entries: List[Dict[str, Any]]) -> None:
+    if not entries:
+        return
+    blobs: Dict[str, str] = {}
+    rows = [_audit_row(session_id, entry, blobs) for entry in entries]
+    prompt_blobs.store_blobs(db, blobs)
+    db.add_all(rows)
+
+
+def _load_items(db: Session, field: str, session_id: str) -> List[Dict[str, Any]]:
+    model = CHILD_TABLES[field]
+    rows = db.query(model.payload).filter(model.session_id == session_id).order_by(model.ordinal).all()
+    return [row.payload for row in rows]
+
+
+def _migrate_list_columns(db: Session, db_obj: InterviewSession) -> bool:
+    """Move a session's legacy JSON arrays into the child tables. Returns True if it did."""
+    migrated = False
+    for field in LIST_COLUMNS:
+        legacy = getattr(db_obj, field)
+        if legacy is None:
+            continue
+        items = list(legacy)
+        if field == "logs":
+            items, audit = split_audit_logs(items)
+            _insert_audit(db, db_obj.session_id, audit)
+        _replace_items(db, field, db_obj.session_id, items)
+        if field in search.SEARCH_ITEMS:
+            search.index_session(db, db_obj.session_id, {field: items}, replace=True)
+        setattr(db_obj, field, None)
+        migrated = True
+    return migrated
+
+
+def _apply_delta(db: Session, session_id: str, delta: SessionDelta) -> None:
+    values = _session_values(delta.fields)
+
+    if delta.created:
+        db.add(InterviewSession(session_id=session_id, **values))
+        db.flush()  # parent row first, so child rows satisfy their foreign key
+    elif values:
+        result = db.execute(
+            update(InterviewSession).where(InterviewSession.session_id == session_id).values(**values)
+        )
+        if result.rowcount == 0:
+            raise FileNotFoundError(f"Session {session_id} not found")
+
+    _insert_audit(db, session_id, delta.audit)
+    for field in LIST_COLUMNS:
+        if field in delta.fields:
+            items = list(delta.fields[field] or [])
+            if delta.created:
+                _insert_items(db, field, session_id, 0, items)
+            else:
+                _replace_items(db, field, session_id, items)
+        elif delta.appends.get(field):
+            # Append-only: plain inserts at the next ordinals; existing rows are never touched.
+            _insert_items(db, field, session_id, delta.offsets.get(field, 0), delta.appends[field])
+
+    # Search documents go in the same transaction, so the index always matches what's saved.
+    search.index_session(db, session_id, delta.fields, replace=not delta.created)
+    search.index_appends(db, session_id, delta.appends)
+
+
+def save_session_delta(session_id: str, delta: SessionDelta) -> None:
+    """Persist only what changed: touched columns are updated and list appends become row
+    inserts, instead of rewriting the whole session the way ``save_session`` does."""
+    if delta.is_empty():
+        return
+    ensure_dirs()
+
+    db = get_db_session()
+    try:
+        _apply_delta(db, session_id, delta)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+
+def save_session_deltas(deltas: Dict[str, SessionDelta]) -> None:
+    """Apply several sessions' deltas in a single transaction (the write-behind batch commit)."""
+    deltas = {sid: d for sid, d in deltas.items() if not d.is_empty()}
+    if not deltas:
+        return
+    ensure_dirs()
+
+    db = get_db_session()
+    try:
+        for session_id, delta in deltas.items():
+            _apply_delta(db, session_id, delta)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise e
+    finally:
+        db.close()
+
+
+def _upsert_session(db: Session, session_id: str, values: Dict[str, Any]) -> None:
+    """Insert the sessions row or overwrite it in place: one INSERT ... ON CONFLICT DO UPDATE
+    statement instead of a SELECT followed by an INSERT or UPDATE."""
+    insert = dialect_insert(db.get_bind())
+    if insert is None:
+        db.merge(InterviewSession(session_id=session_id, **values))
+        db.flush()
+        return
+    stmt = insert(InterviewSession).values(session_id=session_id, **values)
+    db.execute(stmt.on_conflict_do_update(index_elements=["session_id"], set_=values))
+
+
 def save_session(session_id: str, payload: Dict[str, Any]) -> None:
     # We still keep directory ensures for reports/other assets
     ensure_dirs()
-    
+
     db = get_db_session()
     try:
-        # Check if exists
-        db_obj = db.query(InterviewSession).filter(InterviewSession.session_id == session_id).first()
-        
-        if not db_obj:
-            db_obj = InterviewSession(session_id=session_id)
-            db.add(db_obj)
-        
-        # Update fields
-        db_obj.created_at = payload.get("created_at")
-        db_obj.status = payload.get("status")
-        db_obj.job_spec = payload.get("job_spec")
-        db_obj.cv_text = payload.get("cv_text")
-        db_obj.provider = payload.get("provider")
-        db_obj.start_round = payload.get("start_round")
-        
-        # Extract overall score if present in scores (usually in the summary/report, kept in payload?)
-        # payload doesn't always have overall_score at top level in SessionState.
-        # It might be calculated. For now, let's rely on payload.
-        # If the session is finished, maybe we put it there? 
-        # Actually SessionState doesn't have overall_score field, it's in the report.
-        # But list_sessions used to extract it.
-        # Let's see if we can extract it from the last score or similar?
-        # For now, let's just save what we have.
-        
-        db_obj.rubric = payload.get("rubric")
-        db_obj.persona = payload.get("persona")
-        db_obj.cv_analysis = payload.get("cv_analysis")
-        db_obj.questions = payload.get("questions")
-        db_obj.answers = payload.get("answers")
-        db_obj.scores = payload.get("scores")
-        db_obj.logs = payload.get("logs")
-        
+        _write_session(db, session_id, payload)
         db.commit()
     except Exception as e:
         db.rollback()
@@ -71,29 +359,109 @@ def save_session(session_id: str, payload: Dict[str, Any]) -> None:
         db.close()
 
 
-def load_session(session_id: str) -> Dict[str, Any]:
+def _write_session(db: Session, session_id: str, payload: Dict[str, Any]) -> None:
+    """A full save in the caller's transaction."""
+    # SessionState doesn't carry overall_score; it comes from the report (see save_report),
+    # so an existing row keeps its score. The legacy list columns are cleared: the lists
+    # are rewritten into the child tables below.
+    values = _session_values({field: payload.get(field) for field in SESSION_COLUMNS})
+    values.update({field: None for field in LIST_COLUMNS})
+    _upsert_session(db, session_id, values)
+
+    # A full save replaces the lists wholesale. Raw LLM audit entries in the payload's logs
+    # go to the side store instead, replacing what's there so re-saving the same payload
+    # (e.g. a legacy file migrated twice) doesn't duplicate them.
+    inline_logs, audit = split_audit_logs(list(payload.get("logs") or []))
+    if audit:
+        db.query(SessionAuditLog).filter(SessionAuditLog.session_id == session_id).delete(
+            synchronize_session=False
+        )
+        _insert_audit(db, session_id, audit)
+    for field in LIST_COLUMNS:
+        items = inline_logs if field == "logs" else list(payload.get(field) or [])
+        _replace_items(db, field, session_id, items)
+    search.index_session(db, session_id, payload, replace=True)
+
+
+# Columns returned by load_session, in payload order.
+PAYLOAD_COLUMNS = (
+    "created_at",
+    "status",
+    "job_spec",
+    "cv_text",
+    "provider",
+    "start_round",
+    "rubric",
+    "persona",
+    "cv_analysis",
+)
+
+
+def _session_row(db: Session, session_id: str) -> InterviewSession:
+    db_obj = (
+        db.query(InterviewSession)
+        .options(undefer_group("legacy"))
+        .filter(InterviewSession.session_id == session_id)
+        .first()
+    )
+    if not db_obj:
+        raise FileNotFoundError(f"Session {session_id} not found")
+    return db_obj
+
+
+def _load_payload(db: Session, db_obj: InterviewSession, wanted: Optional[set] = None) -> Dict[str, Any]:
+    # Rows written before the child tables existed are moved over on first touch, so
+    # later appends land next to the history they extend.
+    if _migrate_list_columns(db, db_obj):
+        db.commit()
+
+    payload: Dict[str, Any] = {"session_id": db_obj.session_id}
+    for column in PAYLOAD_COLUMNS:
+        if wanted is None or column in wanted:
+            payload[column] = getattr(db_obj, column)
+    for field in LIST_COLUMNS:
+        if wanted is None or field in wanted:
+            payload[field] = _load_items(db, field, db_obj.session_id)
+    return payload
+
+
+def load_session(session_id: str, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """The stored session as a dict. With ``fields``, only those fields (plus session_id) are
+    read: the heavy columns are deferred on the model and each list is its own query, so a
+    partial load never touches what it doesn't return. An archived session is restored first."""
+    wanted = None if fields is None else set(fields)
     db = get_db_session()
     try:
-        db_obj = db.query(InterviewSession).filter(InterviewSession.session_id == session_id).first()
-        if not db_obj:
-            raise FileNotFoundError(f"Session {session_id} not found")
-        
-        return {
-            "session_id": db_obj.session_id,
-            "created_at": db_obj.created_at,
-            "status": db_obj.status,
-            "job_spec": db_obj.job_spec,
-            "cv_text": db_obj.cv_text,
-            "provider": db_obj.provider,
-            "start_round": db_obj.start_round,
-            "rubric": db_obj.rubric,
-            "persona": db_obj.persona,
-            "cv_analysis": db_obj.cv_analysis,
-            "questions": db_obj.questions,
-            "answers": db_obj.answers,
-            "scores": db_obj.scores,
-            "logs": db_obj.logs,
-        }
+        db_obj = _session_row(db, session_id)
+        if db_obj.archived_at is not None:
+            from server.core import archive  # archive builds on this module
+
+            db.rollback()  # end this read, so the restored rows are visible below
+            archive.restore_session(session_id)
+            db_obj = _session_row(db, session_id)
+        return _load_payload(db, db_obj, wanted)
+    finally:
+        db.close()
+
+
+def load_audit_logs(session_id: str, expand_prompts: bool = True) -> List[Dict[str, Any]]:
+    """The session's raw LLM prompt/response entries, oldest first. For debugging only.
+
+    Prompts are stored as references into the shared prompt blob store; they're rebuilt into
+    the full ``prompt`` text unless ``expand_prompts`` is False (then ``prompt_ref`` is kept).
+    """
+    db = get_db_session()
+    try:
+        rows = (
+            db.query(SessionAuditLog.data)
+            .filter(SessionAuditLog.session_id == session_id)
+            .order_by(SessionAuditLog.id)
+            .all()
+        )
+        entries = [_decode_audit(row.data) for row in rows]
+        if expand_prompts:
+            prompt_blobs.expand_prompts(db, entries)
+        return entries
     finally:
         db.close()
 
@@ -109,10 +477,12 @@ def save_report(session_id: str, payload: Dict[str, Any]) -> Path:
     if "overall_score" in payload:
         db = get_db_session()
         try:
-            db_obj = db.query(InterviewSession).filter(InterviewSession.session_id == session_id).first()
-            if db_obj:
-                db_obj.overall_score = payload["overall_score"]
-                db.commit()
+            db.execute(
+                update(InterviewSession)
+                .where(InterviewSession.session_id == session_id)
+                .values(overall_score=payload["overall_score"])
+            )
+            db.commit()
         except:
             pass # Non-critical
         finally:
@@ -121,61 +491,410 @@ def save_report(session_id: str, payload: Dict[str, Any]) -> Path:
     return report_path
 
 
-def list_sessions() -> List[Dict[str, Any]]:
+# Listing page size: the default, and the most a client may ask for.
+LIST_PAGE_SIZE = 20
+LIST_PAGE_MAX = 100
+# The listing's job_spec preview, cut in SQL so the full text never leaves the database.
+JOB_SPEC_PREVIEW_CHARS = 50
+
+
+def encode_cursor(created_at: float, session_id: str) -> str:
+    raw = json.dumps([created_at, session_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(created_at), str(session_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def list_sessions(
+    limit: int = LIST_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+) -> Dict[str, Any]:
+    """One page of sessions, newest first.
+
+    Pages by keyset on (created_at, session_id) — the next page starts strictly after the last
+    row of this one, so it's an index range scan however deep the client pages, and sessions
+    created meanwhile don't shift the pages. ``next_cursor`` is None on the last page.
+    """
+    limit = max(1, min(limit, LIST_PAGE_MAX))
+    order_key = tuple_(InterviewSession.created_at, InterviewSession.session_id)
+    preview = func.substr(InterviewSession.job_spec, 1, JOB_SPEC_PREVIEW_CHARS)
     db = get_db_session()
     try:
-        sessions = db.query(
+        query = db.query(
             InterviewSession.session_id,
             InterviewSession.created_at,
-            InterviewSession.job_spec,
+            InterviewSession.job_title,
+            # Archived sessions keep no job_spec; their title stands in.
+            func.coalesce(preview, InterviewSession.job_title).label("job_spec_preview"),
+            (func.length(InterviewSession.job_spec) > JOB_SPEC_PREVIEW_CHARS).label("job_spec_truncated"),
             InterviewSession.status,
-            InterviewSession.overall_score
-        ).order_by(InterviewSession.created_at.desc()).all()
-        
-        return [{
+            InterviewSession.overall_score,
+        )
+        if cursor:
+            query = query.filter(order_key < decode_cursor(cursor))
+        if status:
+            query = query.filter(InterviewSession.status == status)
+        if min_score is not None:
+            query = query.filter(InterviewSession.overall_score >= min_score)
+        if max_score is not None:
+            query = query.filter(InterviewSession.overall_score <= max_score)
+        rows = (
+            query.order_by(InterviewSession.created_at.desc(), InterviewSession.session_id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(page[-1].created_at, page[-1].session_id)
+        sessions = [{
             "session_id": s.session_id,
             "created_at": s.created_at,
-            "job_spec": s.job_spec[:50] + "..." if s.job_spec else "",
+            "job_title": s.job_title or "",
+            "job_spec": (s.job_spec_preview or "") + ("..." if s.job_spec_truncated else ""),
             "status": s.status,
-            "overall_score": s.overall_score
-        } for s in sessions]
+            "overall_score": s.overall_score,
+        } for s in page]
+        return {"sessions": sessions, "next_cursor": next_cursor}
     finally:
         db.close()
 
 
-def migrate_json_to_db():
-    if not SESSIONS_DIR.exists():
-        return
-        
-    print("Checking for legacy JSON sessions to migrate...")
+# Search hits fetched per requested session: several documents of one session can match.
+SEARCH_HITS_PER_SESSION = 5
+SEARCH_SNIPPETS_PER_SESSION = 3
+
+
+def search_sessions(query: str, limit: int = LIST_PAGE_SIZE) -> Dict[str, Any]:
+    """Sessions whose job spec, CV, questions or answers match ``query``, best match first,
+    each with highlighted snippets of its matching documents."""
+    limit = max(1, min(limit, LIST_PAGE_MAX))
+    db = get_db_session()
+    try:
+        hits = search.search_documents(db, query, limit * SEARCH_HITS_PER_SESSION)
+        matches: Dict[str, List[Dict[str, Any]]] = {}
+        for hit in hits:
+            if hit["session_id"] not in matches and len(matches) == limit:
+                continue
+            session_matches = matches.setdefault(hit["session_id"], [])
+            if len(session_matches) < SEARCH_SNIPPETS_PER_SESSION:
+                session_matches.append({"kind": hit["kind"], "snippet": hit["snippet"], "score": hit["score"]})
+        if not matches:
+            return {"results": []}
+
+        rows = {
+            row.session_id: row
+            for row in db.query(
+                InterviewSession.session_id,
+                InterviewSession.created_at,
+                InterviewSession.job_title,
+                InterviewSession.status,
+                InterviewSession.overall_score,
+            ).filter(InterviewSession.session_id.in_(list(matches)))
+        }
+        results = [{
+            "session_id": session_id,
+            "created_at": rows[session_id].created_at,
+            "job_title": rows[session_id].job_title or "",
+            "status": rows[session_id].status,
+            "overall_score": rows[session_id].overall_score,
+            "matches": session_matches,
+        } for session_id, session_matches in matches.items() if session_id in rows]
+        return {"results": results}
+    finally:
+        db.close()
+
+
+def migrate_search_index(batch_size: int = 200) -> int:
+    """Index sessions saved before full-text search existed. Returns sessions indexed."""
+    count = 0
+    last_id = ""
+    db = get_db_session()
+    try:
+        while True:
+            session_ids = search.unindexed_sessions(db, last_id, batch_size)
+            if not session_ids:
+                break
+            for session_id in session_ids:
+                db_obj = db.get(
+                    InterviewSession,
+                    session_id,
+                    options=[undefer(InterviewSession.job_spec), undefer(InterviewSession.cv_text)],
+                )
+                fields: Dict[str, Any] = {"job_spec": db_obj.job_spec, "cv_text": db_obj.cv_text}
+                for field in search.SEARCH_ITEMS:
+                    fields[field] = _load_items(db, field, session_id)
+                search.index_session(db, session_id, fields, replace=True)
+            db.commit()
+            count += len(session_ids)
+            last_id = session_ids[-1]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if count:
+        print(f"Indexed {count} sessions for search.")
+    return count
+
+
+def migrate_job_titles(batch_size: int = 500) -> int:
+    """Backfill job_title for sessions saved before the column existed. Returns rows updated."""
+    count = 0
+    last_id = ""
+    db = get_db_session()
+    try:
+        while True:
+            batch = (
+                db.query(InterviewSession.session_id, InterviewSession.job_spec)
+                .filter(InterviewSession.job_title.is_(None), InterviewSession.session_id > last_id)
+                .order_by(InterviewSession.session_id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            for row in batch:
+                db.execute(
+                    update(InterviewSession)
+                    .where(InterviewSession.session_id == row.session_id)
+                    .values(job_title=job_title(row.job_spec))
+                )
+            db.commit()
+            count += len(batch)
+            last_id = batch[-1].session_id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if count:
+        print(f"Backfilled job titles for {count} sessions.")
+    return count
+
+
+def migrate_list_columns(batch_size: int = 100) -> int:
+    """Move every session still holding legacy JSON arrays into the child tables.
+
+    Each session moves in the same transaction that clears its legacy columns, so an
+    interrupted run leaves every session either fully migrated or untouched. Returns the
+    number of sessions migrated.
+    """
+    legacy = or_(*(getattr(InterviewSession, f).isnot(None) for f in LIST_COLUMNS))
     count = 0
-    for path in SESSIONS_DIR.glob("*.json"):
+    last_id = ""
+    db = get_db_session()
+    try:
+        while True:
+            # Keyset over session_id so every batch moves forward, even past rows that hold
+            # only JSON 'null' text (written before these columns stored SQL NULL).
+            batch = (
+                db.query(InterviewSession)
+                .options(undefer_group("legacy"))
+                .filter(legacy, InterviewSession.session_id > last_id)
+                .order_by(InterviewSession.session_id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            for db_obj in batch:
+                if _migrate_list_columns(db, db_obj):
+                    count += 1
+            ids = [db_obj.session_id for db_obj in batch]
+            db.execute(
+                update(InterviewSession)
+                .where(InterviewSession.session_id.in_(ids))
+                .values({f: null() for f in LIST_COLUMNS})
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            last_id = ids[-1]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if count:
+        print(f"Moved {count} sessions' questions/answers/scores/logs into per-item tables.")
+    return count
+
+
+def migrate_inline_audit_logs() -> int:
+    """Move raw prompt/response entries out of session_logs into the compressed audit store.
+
+    The remaining inline entries are renumbered so ordinals stay contiguous (new appends are
+    written at ordinal == number of inline logs). Returns the number of sessions touched.
+    """
+    audit_filter = or_(*(cast(SessionLog.payload, Text).like(f'%"{key}":%') for key in AUDIT_LOG_KEYS))
+    db = get_db_session()
+    try:
+        session_ids = [row[0] for row in db.query(SessionLog.session_id).filter(audit_filter).distinct().all()]
+        for session_id in session_ids:
+            inline, audit = split_audit_logs(_load_items(db, "logs", session_id))
+            _insert_audit(db, session_id, audit)
+            _replace_items(db, "logs", session_id, inline)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    if session_ids:
+        print(f"Moved raw LLM logs of {len(session_ids)} sessions into the audit store.")
+    return len(session_ids)
+
+
+# Backfills for rows written by older versions, in the order they run. Each is recorded in
+# data_migrations when it finishes and never runs on that database again.
+DATA_MIGRATIONS = (
+    ("list_columns", migrate_list_columns),
+    ("inline_audit_logs", migrate_inline_audit_logs),
+    ("job_titles", migrate_job_titles),
+    ("search_index", migrate_search_index),
+)
+
+
+def run_data_migrations() -> List[str]:
+    """Run the backfills this database hasn't finished yet. Returns the names of those run.
+
+    Every worker calls this from its background migration thread; one takes the lock and does
+    the work, the others return at once. A backfill that fails isn't recorded, so it's retried
+    (from where its batches got to) on the next start.
+    """
+    with locks.exclusive("data-migrations") as acquired:
+        if not acquired:
+            return []
+        db = get_db_session()
         try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
-            session_id = payload.get("session_id")
-            if not session_id:
+            done = {row.name for row in db.query(DataMigration.name)}
+        finally:
+            db.close()
+        ran = []
+        for name, migrate in DATA_MIGRATIONS:
+            if name in done:
                 continue
-            
-            # Check if exists in DB to avoid rewrite
-            # Actually save_session handles upsert logic somewhat, but let's be explicitly careful
-            # We just call save_session.
-            save_session(session_id, payload)
-            
-            # Check if report exists and update score
-            report_path = REPORTS_DIR / session_id / "report.json"
-            if report_path.exists():
-                try:
-                    report_payload = json.loads(report_path.read_text(encoding="utf-8"))
-                    if "overall_score" in report_payload:
-                        save_report(session_id, report_payload) # Re-saves file but also updates DB
-                except:
-                    pass
-            
-            count += 1
-            # Optional: Rename/Move migrated file? 
-            # path.rename(path.with_suffix('.json.bak'))
-        except Exception as e:
-            print(f"Failed to migrate {path}: {e}")
-    
-    if count > 0:
-        print(f"Migrated {count} sessions to SQLite.")
+            migrate()
+            db = get_db_session()
+            try:
+                db.merge(DataMigration(name=name, completed_at=time.time()))
+                db.commit()
+            finally:
+                db.close()
+            ran.append(name)
+        return ran
+
+
+# Progress of the legacy JSON import, reported on /health. Written by the migration thread only.
+LEGACY_MIGRATION: Dict[str, Any] = {
+    "state": "pending",  # pending -> running -> done | failed
+    "files": 0,
+    "imported": 0,
+    "unchanged": 0,
+    "failed": 0,
+}
+
+
+def _legacy_fingerprint(path: Path) -> tuple[int, float, Optional[float]]:
+    stat = path.stat()
+    report_path = REPORTS_DIR / path.stem / "report.json"
+    report_mtime = report_path.stat().st_mtime if report_path.exists() else None
+    return stat.st_size, stat.st_mtime, report_mtime
+
+
+def _import_legacy_file(db: Session, path: Path, data: bytes, digest: str, fingerprint: tuple) -> None:
+    payload = json.loads(data.decode("utf-8"))
+    session_id = payload.get("session_id")
+    if session_id:
+        _write_session(db, session_id, payload)
+        report_path = REPORTS_DIR / session_id / "report.json"
+        if report_path.exists():
+            report_payload = json.loads(report_path.read_text(encoding="utf-8"))
+            if "overall_score" in report_payload:
+                db.execute(
+                    update(InterviewSession)
+                    .where(InterviewSession.session_id == session_id)
+                    .values(overall_score=report_payload["overall_score"])
+                )
+    size, mtime, report_mtime = fingerprint
+    db.merge(LegacyImport(
+        path=path.name, size=size, mtime=mtime, sha256=digest, report_mtime=report_mtime, imported_at=time.time()
+    ))
+
+
+def _begin_batch(db: Session) -> None:
+    # pysqlite doesn't open a transaction before a SAVEPOINT, so releasing the first savepoint
+    # would commit on its own; open one explicitly so a batch really commits as one.
+    if db.get_bind().dialect.name == "sqlite" and not db.connection().connection.dbapi_connection.in_transaction:
+        db.execute(text("BEGIN"))
+
+
+def migrate_json_to_db(batch_size: int = 100) -> int:
+    """Import legacy data/sessions/*.json files. Returns the number of files imported.
+
+    Files already in the legacy_imports manifest with the same size/mtime are skipped without
+    being read; a touched file whose content hash is unchanged is only re-stamped. Imports are
+    committed ``batch_size`` files per transaction, each file in its own savepoint so a corrupt
+    one is reported and skipped (and retried next start) without losing the rest of the batch.
+    Safe to run in a background thread; progress is published in LEGACY_MIGRATION.
+    """
+    LEGACY_MIGRATION.update(state="running", files=0, imported=0, unchanged=0, failed=0)
+    if not SESSIONS_DIR.exists():
+        LEGACY_MIGRATION["state"] = "done"
+        return 0
+
+    paths = sorted(SESSIONS_DIR.glob("*.json"))
+    LEGACY_MIGRATION["files"] = len(paths)
+    db = get_db_session()
+    try:
+        manifest = {row.path: row for row in db.query(LegacyImport)}
+        pending = 0
+        for path in paths:
+            try:
+                fingerprint = _legacy_fingerprint(path)
+                entry = manifest.get(path.name)
+                if entry is not None and (entry.size, entry.mtime, entry.report_mtime) == fingerprint:
+                    LEGACY_MIGRATION["unchanged"] += 1
+                    continue
+                data = path.read_bytes()
+                digest = hashlib.sha256(data).hexdigest()
+                if entry is not None and entry.sha256 == digest and entry.report_mtime == fingerprint[2]:
+                    # Touched but not changed (e.g. copied or restored from backup).
+                    entry.size, entry.mtime = fingerprint[0], fingerprint[1]
+                    LEGACY_MIGRATION["unchanged"] += 1
+                    continue
+                _begin_batch(db)
+                with db.begin_nested():
+                    _import_legacy_file(db, path, data, digest, fingerprint)
+                LEGACY_MIGRATION["imported"] += 1
+            except Exception as e:
+                LEGACY_MIGRATION["failed"] += 1
+                print(f"Failed to migrate {path}: {e}")
+                continue
+            pending += 1
+            if pending >= batch_size:
+                db.commit()
+                pending = 0
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        LEGACY_MIGRATION["state"] = "failed"
+        print(f"Legacy session migration failed: {e}")
+        raise
+    finally:
+        db.close()
+
+    LEGACY_MIGRATION["state"] = "done"
+    if LEGACY_MIGRATION["imported"]:
+        print(f"Migrated {LEGACY_MIGRATION['imported']} legacy sessions to the database.")
+    return LEGACY_MIGRATION["imported"]
@@ -0,0 +1,124 @@
+"""Write-behind persistence for session saves (opt-in, STORAGE_WRITE_BEHIND=1).
+
+By default every ``SessionState.asave()`` commits its delta before the route returns. With
+write-behind on, ``asave()`` only queues the delta and returns; a single background task
+coalesces the queued deltas per session and commits them together in one transaction, either
+every STORAGE_WRITE_BEHIND_INTERVAL_MS or as soon as STORAGE_WRITE_BEHIND_MAX_PENDING sessions
+are waiting — one fsync for many saves instead of one per save.
+
+Durability window: a crash (not a clean shutdown) loses whatever is still queued, i.e. up to
+one interval of saves. Queued deltas are flushed explicitly when a session ends, before it is
+evicted from memory, before its audit trail is read, and on shutdown. The in-memory session is
+the source of truth while its writes are queued, so this mode assumes one server process per
+set of sessions.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Dict, Iterable, Optional
+
+from server.core import async_storage
+from server.core.storage import SessionDelta
+
+WRITE_BEHIND = os.getenv("STORAGE_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+WRITE_BEHIND_INTERVAL_MS = int(os.getenv("STORAGE_WRITE_BEHIND_INTERVAL_MS", "250"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("STORAGE_WRITE_BEHIND_MAX_PENDING", "64"))
+# A session whose delta keeps failing on its own is dropped (and reported) after this many tries,
+# so one bad session can't wedge the queue.
+WRITE_BEHIND_MAX_RETRIES = 5
+
+
+class WriteBehindQueue:
+    def __init__(self, interval_ms: int = WRITE_BEHIND_INTERVAL_MS, max_pending: int = WRITE_BEHIND_MAX_PENDING) -> None:
+        self.interval = interval_ms / 1000
+        self.max_pending = max_pending
+        self._pending: Dict[str, SessionDelta] = {}
+        self._failures: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def pending_sessions(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, session_id: str, delta: SessionDelta) -> None:
+        """Queue a delta (taken after any delta already queued for the session). Loop thread only."""
+        if delta.is_empty():
+            return
+        if self._task is None or self._task.done():
+            self._start()
+        earlier = self._pending.get(session_id)
+        self._pending[session_id] = earlier.merge(delta) if earlier else delta
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    async def flush(self, session_id: Optional[str] = None) -> None:
+        """Commit everything queued (or only ``session_id``'s deltas) before returning."""
+        if self._lock is None:
+            return
+        await self._commit(None if session_id is None else [session_id])
+
+    async def stop(self) -> None:
+        """Stop the background task and commit whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def _start(self) -> None:
+        # Created here rather than in __init__ so they belong to the running loop.
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._commit()
+
+    async def _commit(self, session_ids: Optional[Iterable[str]] = None) -> None:
+        # The lock makes a flush wait for a batch that's already being written.
+        async with self._lock:
+            if session_ids is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {sid: self._pending.pop(sid) for sid in session_ids if sid in self._pending}
+            if not batch:
+                return
+            try:
+                await async_storage.save_session_deltas(batch)
+                for session_id in batch:
+                    self._failures.pop(session_id, None)
+            except Exception as e:
+                # One bad delta rolls back the whole batch; retry each session on its own so the
+                # others still land.
+                print(f"WARNING: write-behind batch of {len(batch)} sessions failed ({e}); retrying one by one")
+                await self._commit_each(batch)
+
+    async def _commit_each(self, batch: Dict[str, SessionDelta]) -> None:
+        for session_id, delta in batch.items():
+            try:
+                await async_storage.save_session_delta(session_id, delta)
+                self._failures.pop(session_id, None)
+            except Exception as e:
+                failures = self._failures.get(session_id, 0) + 1
+                if failures >= WRITE_BEHIND_MAX_RETRIES:
+                    print(f"ERROR: dropping queued writes for session {session_id} after {failures} failures: {e}")
+                    self._failures.pop(session_id, None)
+                    continue
+                self._failures[session_id] = failures
+                # Requeue ahead of anything queued for the session since.
+                later = self._pending.get(session_id)
+                self._pending[session_id] = delta.merge(later) if later else delta
+
+
+queue = WriteBehindQueue()
@@ -1,24 +1,162 @@
-from sqlalchemy import Column, String, Float, Integer, Text, JSON
+from sqlalchemy import Column, String, Float, Integer, Text, JSON, ForeignKey, Index, LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from .database import Base
 
+# JSON documents: plain JSON text on SQLite, binary JSONB on PostgreSQL.
+JSONDoc = JSON().with_variant(JSONB(), "postgresql")
+# For the legacy list columns: Python None is stored as SQL NULL, not the JSON text 'null'.
+NullableJSONDoc = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
 class InterviewSession(Base):
     __tablename__ = "sessions"
 
     session_id = Column(String, primary_key=True, index=True)
     created_at = Column(Float)
     status = Column(String)
-    job_spec = Column(Text)
-    cv_text = Column(Text)
+    # The big texts and JSON documents are deferred: loading a session object reads only the
+    # small columns, and each of these is fetched on first access.
+    job_spec = deferred(Column(Text))
+    cv_text = deferred(Column(Text))
     provider = Column(String)
     start_round = Column(Integer, default=1)
     overall_score = Column(Float, nullable=True)
-    
+    # Short display title (first line of the job spec), so listings never read job_spec itself.
+    job_title = Column(String, nullable=True)
+    # Set once the session is moved to a compressed archive file (see server/core/archive.py):
+    # when, and where its record is ("<file>:<offset>:<length>"). Only the summary columns
+    # above stay filled while it's archived.
+    archived_at = Column(Float, nullable=True)
+    archive_ref = Column(String, nullable=True)
+
     # JSON columns for complex data
-    rubric = Column(JSON, nullable=True)
-    persona = Column(JSON, nullable=True)
-    cv_analysis = Column(JSON, nullable=True)
-    questions = Column(JSON, default=list)
-    answers = Column(JSON, default=list)
-    scores = Column(JSON, default=list)
-    logs = Column(JSON, default=list)
+    rubric = deferred(Column(JSONDoc, nullable=True))
+    persona = Column(JSONDoc, nullable=True)
+    cv_analysis = deferred(Column(JSONDoc, nullable=True))
+
+    # Legacy whole-array columns. Questions/answers/scores/logs now live one row per item in
+    # the session_* child tables below; these are only read to migrate old rows and are
+    # cleared (NULL) once a session has been moved over.
+    questions = deferred(Column(NullableJSONDoc, nullable=True), group="legacy")
+    answers = deferred(Column(NullableJSONDoc, nullable=True), group="legacy")
+    scores = deferred(Column(NullableJSONDoc, nullable=True), group="legacy")
+    logs = deferred(Column(NullableJSONDoc, nullable=True), group="legacy")
+
+    __table_args__ = (
+        # Newest-first listing, paged by (created_at, session_id) keyset.
+        Index("ix_sessions_created_at_desc", created_at.desc(), session_id.desc()),
+    )
+
+
+# Append-only child tables, keyed by (session_id, ordinal) where ordinal is the item's index
+# in the session's list. The full item is kept in `payload`; the few fields worth querying on
+# are copied into their own columns.
+
+class SessionQuestion(Base):
+    __tablename__ = "session_questions"
+
+    session_id = Column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), primary_key=True)
+    ordinal = Column(Integer, primary_key=True)
+    question_id = Column(String)
+    payload = Column(JSONDoc)
+
+
+class SessionAnswer(Base):
+    __tablename__ = "session_answers"
+
+    session_id = Column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), primary_key=True)
+    ordinal = Column(Integer, primary_key=True)
+    question_id = Column(String)
+    payload = Column(JSONDoc)
+
+
+class SessionScore(Base):
+    __tablename__ = "session_scores"
+
+    session_id = Column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), primary_key=True)
+    ordinal = Column(Integer, primary_key=True)
+    question_id = Column(String)
+    persona = Column(String)
+    overall_score = Column(Float, nullable=True)
+    payload = Column(JSONDoc)
+
+
+class SessionLog(Base):
+    __tablename__ = "session_logs"
+
+    session_id = Column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), primary_key=True)
+    ordinal = Column(Integer, primary_key=True)
+    type = Column(String)
+    payload = Column(JSONDoc)
+
+
+class SessionAuditLog(Base):
+    """Raw LLM prompt/response audit trail, kept out of the session's hot path.
+
+    One row per rubric/question/scoring call, the entry stored as zlib-compressed JSON. Nothing
+    that serves an interview reads this table; it's only loaded on demand for debugging.
+    """
+    __tablename__ = "session_audit_logs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String, ForeignKey("sessions.session_id", ondelete="CASCADE"), index=True)
+    type = Column(String)
+    timestamp = Column(Float, nullable=True)
+    data = Column(LargeBinary)
+
+
+class PromptBlob(Base):
+    """Content-addressed prompt segment, shared by every audit entry that contains it.
+
+    Keyed by the SHA-256 of the segment text, so the job spec, CV and rubric repeated in every
+    prompt of a session (and across retries) are stored once.
+    """
+    __tablename__ = "prompt_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    size = Column(Integer)
+    data = Column(LargeBinary)
+
+
+class SessionStoreEntry(Base):
+    """Shared per-session state for multi-worker deployments (SESSION_STORE=database).
+
+    ``key:<session_id>`` rows hold an encrypted API key until ``expires_at``;
+    ``version:<session_id>`` rows count saves, so workers can tell their cached copy is stale.
+    ``response:<session_id>:<key>`` rows hold a completed /answer or /end response, replayed
+    to retries until ``expires_at``.
+    """
+    __tablename__ = "session_store"
+
+    key = Column(String, primary_key=True)
+    value = Column(LargeBinary, nullable=True)
+    counter = Column(Integer, nullable=False, default=0)
+    expires_at = Column(Float, nullable=True, index=True)
+
+
+class LegacyImport(Base):
+    """Manifest of legacy data/sessions/*.json files already imported into the database.
+
+    A file is re-read only when its size/mtime (or its report's mtime) change, and re-imported
+    only when its content hash does too.
+    """
+    __tablename__ = "legacy_imports"
+
+    path = Column(String, primary_key=True)
+    size = Column(Integer)
+    mtime = Column(Float)
+    sha256 = Column(String(64))
+    report_mtime = Column(Float, nullable=True)
+    imported_at = Column(Float)
+
+
+class DataMigration(Base):
+    """Backfills that have finished on this database (see storage.run_data_migrations).
+
+    Each one scans a whole table for rows written by an older version; once it has run, new
+    writes never produce such rows, so later starts skip it without scanning.
+    """
+    __tablename__ = "data_migrations"
 
+    name = Column(String, primary_key=True)
+    completed_at = Column(Float)
@@ -0,0 +1,115 @@
+"""Cancelling and time-boxing a request's outstanding LLM calls.
+
+Provider calls are curl subprocesses, so cancelling one means killing its process. A route
+creates a ``CancelToken`` and makes it ``current`` for the work it starts; every provider call
+made under it runs through ``run``, which registers the process with the token.
+
+    cancel()   the client went away: kills whatever is running and makes any later call raise
+               ``Cancelled`` straight away, without spawning anything.
+    deadline   the request's end-to-end budget. Each call (and each retry) gets only what is
+               left of it, however long the provider's own timeout is, and once it's spent
+               calls raise ``DeadlineExceeded``. Retry loops stop at the first of either.
+
+Both are ordinary exceptions on purpose: code that already falls back to heuristics when a
+provider fails (coaching, the report's qualitative sections, the interviewer panel) does the
+same when the call is cancelled or out of time, so the results that did finish are still saved.
+"""
+from __future__ import annotations
+
+import contextvars
+import subprocess
+import threading
+import time
+from typing import List, Optional, Set
+
+
+class Cancelled(RuntimeError):
+    """The request this LLM call was made for has been abandoned."""
+
+
+class DeadlineExceeded(Cancelled):
+    """The request this LLM call was made for has used up its time budget."""
+
+
+class CancelToken:
+    def __init__(self, budget: Optional[float] = None) -> None:
+        """``budget``: seconds from now the request's LLM calls may run for (None: no limit)."""
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._procs: Set[subprocess.Popen] = set()
+        self.deadline = time.monotonic() + budget if budget is not None else None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self) -> None:
+        """Kill the calls in flight and refuse new ones. Safe from any thread."""
+        with self._lock:
+            self._cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            proc.kill()
+
+    def check(self) -> None:
+        if self._cancelled:
+            raise Cancelled("LLM call cancelled: the client went away")
+        if self.remaining() == 0:
+            raise DeadlineExceeded("LLM call skipped: the request ran out of time")
+
+    def _register(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            if self._cancelled:
+                proc.kill()
+            self._procs.add(proc)
+
+    def _release(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+
+# The token for the work running in this context. asyncio.to_thread copies the context, so
+# a token set by a route follows its work onto worker threads.
+current: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("llm_cancel_token", default=None)
+
+
+def check() -> None:
+    """Raise Cancelled if the current request has been abandoned or is out of time."""
+    token = current.get()
+    if token is not None:
+        token.check()
+
+
+def run(cmd: List[str], timeout: float) -> subprocess.CompletedProcess:
+    """``subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)``, killable
+    through the current token and cut short at its deadline."""
+    token = current.get()
+    if token is None:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=False)
+    token.check()
+    remaining = token.remaining()
+    if remaining is not None:
+        timeout = min(timeout, remaining)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    token._register(proc)
+    try:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            token.check()  # DeadlineExceeded if it was the request's budget that ran out
+            raise
+    finally:
+        token._release(proc)
+    # A killed call's (partial) output is meaningless; report the cancellation instead. (A
+    # call that finished just as the deadline passed keeps its result.)
+    if token.cancelled:
+        token.check()
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
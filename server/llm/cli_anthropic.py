@@ -5,6 +5,8 @@ import os
 import subprocess
 from typing import Any, Dict
 
+from server.llm import cancel
+
 ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
 ANTHROPIC_VERSION = "2023-06-01"
 # Default to the latest, most capable Claude model. Users can override per session.
@@ -37,7 +39,7 @@ def _run_curl(payload: Dict[str, Any], api_key: str | None = None) -> str:
         "-d",
         json.dumps(payload),
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=REQUEST_TIMEOUT, check=False)
+    result = cancel.run(cmd, timeout=REQUEST_TIMEOUT)
     if result.returncode != 0:
         raise RuntimeError(f"Anthropic curl error: {result.stderr.strip()}")
     return result.stdout
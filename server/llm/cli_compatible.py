@@ -12,6 +12,8 @@ import os
 import subprocess
 from typing import Any, Dict
 
+from server.llm import cancel
+
 # Env-tunable generation timeout; local models can be slow. Listing models stays short.
 REQUEST_TIMEOUT = int(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
 
@@ -38,7 +40,7 @@ def _run_curl(url: str, payload: Dict[str, Any], api_key: str | None = None) ->
         "-d",
         json.dumps(payload),
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=REQUEST_TIMEOUT, check=False)
+    result = cancel.run(cmd, timeout=REQUEST_TIMEOUT)
     if result.returncode != 0:
         raise RuntimeError(f"Local LLM curl error: {result.stderr.strip()}")
     return result.stdout
@@ -5,6 +5,8 @@ import os
 import subprocess
 from typing import Any, Dict
 
+from server.llm import cancel
+
 # Prompts are centralized in server/llm/prompts.py. Re-exported for legacy imports.
 from server.llm.prompts import (  # noqa: F401
     RUBRIC_PROMPT,
@@ -39,7 +41,7 @@ def _run_curl(payload: Dict[str, Any], model: str, api_key: str | None = None) -
         "-d",
         json.dumps(payload),
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=REQUEST_TIMEOUT, check=False)
+    result = cancel.run(cmd, timeout=REQUEST_TIMEOUT)
     if result.returncode != 0:
         raise RuntimeError(f"Gemini curl error: {result.stderr.strip()}")
     return result.stdout
@@ -5,6 +5,8 @@ import os
 import subprocess
 from typing import Any, Dict
 
+from server.llm import cancel
+
 # Prompts are centralized in server/llm/prompts.py. They are re-exported here for any
 # legacy imports, but new code should import them from prompts directly.
 from server.llm.prompts import (  # noqa: F401
@@ -45,7 +47,7 @@ def _run_curl(payload: Dict[str, Any], api_key: str | None = None) -> str:
         "-d",
         json.dumps(payload),
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=REQUEST_TIMEOUT, check=False)
+    result = cancel.run(cmd, timeout=REQUEST_TIMEOUT)
     if result.returncode != 0:
         raise RuntimeError(f"OpenAI curl error: {result.stderr.strip()}")
     return result.stdout
@@ -13,7 +13,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, Optional, TypedDict
 
-from server.llm import cli_anthropic, cli_compatible, cli_gemini, cli_openai
+from server.llm import cancel, cli_anthropic, cli_compatible, cli_gemini, cli_openai
 from server.llm.prompts import JSON_FIX_PROMPT  # noqa: F401  (re-exported for callers)
 
 
@@ -51,6 +51,10 @@ def config_from_session(session: Dict[str, Any], api_key: Optional[str] = None)
 
 
 def call_llm(cfg: LLMConfig, prompt: str, temperature: float = 0.2) -> str:
+    """One completion. Runs under the current request's CancelToken (server.llm.cancel), if
+    any: it gets only the time left before the request's deadline, and raises Cancelled /
+    DeadlineExceeded instead of calling once the request is abandoned or out of time."""
+    cancel.check()
     provider = normalize_provider(cfg.get("provider", ""))
     api_key = cfg.get("api_key")
     model = cfg.get("model") or DEFAULT_MODELS.get(provider) or None
@@ -3,12 +3,15 @@ from __future__ import annotations
 import os
 import time
 import json
+import asyncio
 import hashlib
-from typing import Dict, Optional, List, Any
+import threading
+import contextlib
+from typing import AsyncIterator, Dict, Optional, List, Any
 
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
@@ -18,10 +21,19 @@ from server.core import rubric as rubric_core
 from server.core import scoring as scoring_core
 from server.core import analysis as analysis_core
 from server.core import storage as storage_core
+from server.core import admission
+from server.core import archive
+from server.core import chart_jobs
+from server.core import report_cache
+from server.core import async_storage
+from server.core import bulk
+from server.core import write_behind
+from server.core import session_store
+from server.core import single_flight
 from server.core import coaching as coaching_core
 from server.core import delivery as delivery_core
-from server.core.state import SessionState, load_session_state
-from server.llm import dispatch
+from server.core.state import RESUME_FIELDS, SessionState
+from server.llm import cancel, dispatch
 from server.tts import dispatch as tts_dispatch
 
 from pathlib import Path
@@ -47,7 +59,16 @@ else:
 # If WEB_DIR doesn't exist (e.g. local dev without build), we might crash on mount.
 # But let's assume for this step we are focusing on Docker support.
 
-app = FastAPI()
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Nothing touches the database or the disk at import; workers initialize here.
+    await _startup()
+    yield
+    await _shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # The SPA is served same-origin in production, so cross-origin requests are only needed for
 # local dev (Vite on :5173 hitting the API on :8000). Restrict to an allow-list instead of "*"
@@ -66,45 +87,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    # Run migration
+async def _startup() -> None:
+    # Tables, columns and data directories; Docker also runs this once before starting the
+    # workers, so they don't race to create them.
+    storage_core.init_db()
+    if not (WEB_DIR / "assets").exists():
+        print(f"WARNING: Web app not built; {WEB_DIR / 'assets'} not found (run npm run build)")
+    if write_behind.WRITE_BEHIND and session_store.store.shared:
+        print("WARNING: STORAGE_WRITE_BEHIND keeps unsaved changes in one worker's memory; "
+              "other workers sharing SESSION_STORE will not see them until they are flushed.")
+    # Backfills for older rows (legacy JSON arrays into the per-item tables, raw LLM logs into
+    # the audit store, job titles, search documents) and legacy session files run in the
+    # background so startup doesn't wait on history; import progress shows on /health.
+    threading.Thread(target=_run_migrations, name="legacy-migration", daemon=True).start()
+    if archive.ARCHIVE_AFTER_DAYS > 0:
+        threading.Thread(target=archive.run_retention, name="session-retention", daemon=True).start()
+    chart_jobs.renderer.start()
+
+
+def _run_migrations() -> None:
+    try:
+        storage_core.run_data_migrations()
+    except Exception as e:
+        print(f"Migration failed: {e}")
     try:
         storage_core.migrate_json_to_db()
     except Exception as e:
         print(f"Migration failed: {e}")
 
-# Debug: Log paths
-print(f"DEBUG: BASE_DIR={BASE_DIR}")
-print(f"DEBUG: WEB_DIR={WEB_DIR} (Exists: {WEB_DIR.exists()})")
-
-# Ensure directories exist before mounting
-try:
-    storage_core.ensure_dirs()
-    print(f"DEBUG: Created/Ensured data directories at {storage_core.DATA_DIR}")
-except Exception as e:
-    print(f"ERROR: Failed to ensure directories: {e}")
+async def _shutdown() -> None:
+    # Let queued session writes reach the database before the process exits.
+    await write_behind.queue.stop()
+    async_storage.shutdown(wait=True)
+    # Let charts for reports already returned finish drawing.
+    chart_jobs.renderer.shutdown(wait=True)
 
 # Serves /assets from the build
 if (WEB_DIR / "assets").exists():
     app.mount("/assets", StaticFiles(directory=WEB_DIR / "assets"), name="assets")
-    print("DEBUG: Mounted /assets")
-else:
-    print(f"WARNING: Assets directory not found at {WEB_DIR / 'assets'}")
 
-# Serve reports (charts)
-try:
-    if storage_core.REPORTS_DIR.exists():
-        app.mount("/reports", StaticFiles(directory=storage_core.REPORTS_DIR), name="reports")
-        print(f"DEBUG: Mounted /reports from {storage_core.REPORTS_DIR}")
-    else:
-        print(f"WARNING: Reports directory not found at {storage_core.REPORTS_DIR}")
-except Exception as e:
-    print(f"ERROR: Failed to mount /reports: {e}")
+# Serve reports (charts). The directory is created at startup (and with the first report), so
+# it isn't checked here.
+app.mount("/reports", StaticFiles(directory=storage_core.REPORTS_DIR, check_dir=False), name="reports")
 
 @app.get("/health")
-async def health() -> Dict[str, str]:
-    return {"status": "ok"}
+async def health() -> Dict[str, Any]:
+    return {"status": "ok", "legacy_migration": dict(storage_core.LEGACY_MIGRATION)}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Admission queue depth, slot use and waits, in the Prometheus text format."""
+    return PlainTextResponse(admission.prometheus_text(admission.controller.metrics()))
 
 # API routes are defined below... specific routes take precedence.
 
@@ -118,8 +152,8 @@ async def health() -> Dict[str, str]:
 # EASIER: Just define the specific routes first (which they are), then add the catch-all at the bottom.
 
 
-SESSIONS: Dict[str, SessionState] = {}
-SESSION_API_KEYS: Dict[str, str] = {}
+# Live sessions and their API keys are kept in server.core.session_store, shared between
+# workers when SESSION_STORE is set.
 
 
 class StartRequest(BaseModel):
@@ -151,47 +185,110 @@ class StartResponse(BaseModel):
     total_questions: int
 
 
-@app.get("/health")
-async def health() -> Dict[str, str]:
-    return {"status": "ok"}
-
 
 @app.get("/", response_class=HTMLResponse)
 async def index() -> HTMLResponse:
     return HTMLResponse((WEB_DIR / "index.html").read_text(encoding="utf-8"))
 
 
-def _get_session(session_id: str) -> SessionState:
-    if session_id in SESSIONS:
-        return SESSIONS[session_id]
-    payload = load_session_state(session_id)
-    # Older DB rows stored start_round as FLOAT (the column predates the Integer model and
-    # create_all() won't alter it), which later breaks list slicing ("slice indices must be
-    # integers"). Coerce on load so resume works regardless of the stored column type.
-    start_round = int(payload.get("start_round") or 1)
-    state = SessionState(
-        payload["job_spec"],
-        payload["cv_text"],
-        payload["provider"],
-        start_round,
-        model=payload.get("model"),
-        base_url=payload.get("base_url"),
-    )
-    state.session_id = payload["session_id"]
-    state.created_at = payload["created_at"]
-    state.rubric = payload.get("rubric")
-    state.persona = payload.get("persona")
-    state.cv_analysis = payload.get("cv_analysis")
-    state.start_round = start_round
-    state.questions = payload.get("questions", [])
-    state.answers = payload.get("answers", [])
-    state.scores = payload.get("scores", [])
-    state.logs = payload.get("logs", [])
-    state.status = payload.get("status", "active")
-    SESSIONS[state.session_id] = state
+async def _get_session(session_id: str) -> SessionState:
+    state = await session_store.cache.get(session_id)
+    if state is not None:
+        return state
+    version = await session_store.cache.version(session_id)
+    # Only what every route needs; the heavy fields load on demand (SessionState.aload).
+    state = SessionState.resume(await async_storage.load_session(session_id, RESUME_FIELDS))
+    session_store.cache.put(state, version)
     return state
 
 
+async def _save_session(session: SessionState) -> None:
+    await session.asave()
+    # Lets other workers know their cached copy of this session is now stale.
+    await session_store.cache.saved(session)
+
+
+async def _idempotent(session_id: str, key: str, fingerprint: str, http_request: Request, fn: Any) -> Any:
+    """Run ``await fn()`` once per idempotency key. A duplicate arriving while it runs shares
+    the running call (single-flight); one arriving later, within IDEMPOTENCY_TTL, gets the
+    stored response back. Reusing a key for a different request (``fingerprint``) is a 422."""
+    store_key = f"{session_id}:{key}"
+
+    async def once() -> Any:
+        stored = await session_store.get_response(store_key)
+        if stored is not None:
+            record = json.loads(stored)
+            if record["request"] != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            return record["response"]
+        response = await fn()
+        await session_store.put_response(
+            store_key, json.dumps({"request": fingerprint, "response": response}).encode("utf-8")
+        )
+        return response
+
+    return await single_flight.gate.run(session_id, (key, fingerprint), once, http_request.is_disconnected)
+
+
+async def _admitted(fn: Any) -> Any:
+    """Run ``await fn()`` once admission control gives it a slot; 503 if the server is too
+    busy to take it on soon."""
+    try:
+        async with admission.controller.admit():
+            return await fn()
+    except admission.Overloaded as exc:
+        raise HTTPException(
+            status_code=503, detail=exc.reason, headers={"Retry-After": str(exc.retry_after)}
+        ) from exc
+
+
+# How often a route waiting on LLM work checks whether its client is still there.
+DISCONNECT_POLL_SECONDS = 0.25
+# End-to-end budget for one request's LLM calls, retries included. Each call gets only what
+# is left of it; once it's spent, coaching and the report fall back to their heuristics.
+LLM_REQUEST_DEADLINE = float(os.getenv("LLM_REQUEST_DEADLINE", "180"))
+# The three scoring personas, in the order their scores are recorded.
+SCORING_PERSONAS = ["positive", "neutral", "hostile"]
+
+
+def _cancellable() -> cancel.CancelToken:
+    """Give the calling route a token its LLM calls can be cancelled through, which also
+    starts their LLM_REQUEST_DEADLINE budget."""
+    token = cancel.CancelToken(budget=LLM_REQUEST_DEADLINE)
+    cancel.current.set(token)
+    return token
+
+
+def _abandoned(exc: cancel.Cancelled) -> HTTPException:
+    """The response for LLM work that was cut short and had nothing to fall back on."""
+    if isinstance(exc, cancel.DeadlineExceeded):
+        return HTTPException(status_code=504, detail="The model took too long to respond; please try again")
+    return HTTPException(status_code=499, detail="Client closed request")
+
+
+async def _run_llm(http_request: Request, fn: Any, *args: Any, **kwargs: Any) -> Any:
+    """Run blocking LLM work on a worker thread, cancelling its provider calls if the client
+    disconnects meanwhile (the route must have called ``_cancellable`` first). Under the
+    session gate, that's once every request sharing the call has disconnected."""
+    token = cancel.current.get()
+    flight = single_flight.current.get()
+    gone = flight.abandoned if flight is not None else http_request.is_disconnected
+    work = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return work.result()
+        if token is not None and not token.cancelled and await gone():
+            print("Client disconnected; cancelling its outstanding LLM calls")
+            token.cancel()
+
+
+async def _evict_session(session_id: str) -> None:
+    # Queued writes must land before the in-memory copy (the only other copy) goes away.
+    await write_behind.queue.flush(session_id)
+    session_store.cache.evict(session_id)
+
+
 def _normalize_provider(provider: str) -> str:
     return dispatch.normalize_provider(provider)
 
@@ -226,7 +323,11 @@ async def list_provider_models(request: ModelsRequest) -> Dict[str, Any]:
 
 
 @app.post("/sessions/start", response_model=StartResponse)
-async def start_session(request: StartRequest) -> StartResponse:
+async def start_session(request: StartRequest, http_request: Request) -> StartResponse:
+    return await _admitted(lambda: _start_session(request, http_request))
+
+
+async def _start_session(request: StartRequest, http_request: Request) -> StartResponse:
     provider = _normalize_provider(request.provider)
     try:
         _verify_provider(provider, request.api_key, request.model, request.base_url)
@@ -247,11 +348,23 @@ async def start_session(request: StartRequest) -> StartResponse:
         base_url=request.base_url,
     )
 
-    rubric_result = rubric_core.generate_rubric(
-        request.job_spec, request.cv_text, provider, api_key=request.api_key, model=request.model, base_url=request.base_url
-    )
+    # One budget for the rubric, the panel and the CV analysis; only the rubric is essential.
+    _cancellable()
+    try:
+        rubric_result = await _run_llm(
+            http_request,
+            rubric_core.generate_rubric,
+            request.job_spec,
+            request.cv_text,
+            provider,
+            api_key=request.api_key,
+            model=request.model,
+            base_url=request.base_url,
+        )
+    except cancel.Cancelled as exc:
+        raise _abandoned(exc) from exc
     session.rubric = rubric_result.parsed
-    session.logs.append(
+    session.audit_logs.append(
         {
             "type": "rubric",
             "prompt": rubric_result.prompt,
@@ -266,7 +379,15 @@ async def start_session(request: StartRequest) -> StartResponse:
     # primary identity for back-compat consumers (CV analysis, grading); the full panel is
     # nested under "panel" so it persists in the existing persona JSON column (no migration).
     try:
-        panel = analysis_core.generate_persona_panel(request.job_spec, provider, api_key=request.api_key, model=request.model, base_url=request.base_url)
+        panel = await _run_llm(
+            http_request,
+            analysis_core.generate_persona_panel,
+            request.job_spec,
+            provider,
+            api_key=request.api_key,
+            model=request.model,
+            base_url=request.base_url,
+        )
         primary = dict(panel["neutral"])
         primary["panel"] = panel
         session.persona = primary
@@ -284,7 +405,17 @@ async def start_session(request: StartRequest) -> StartResponse:
     # 2. Analyze CV (requires persona)
     if session.persona:
         try:
-            cv_analysis = analysis_core.analyze_cv(request.cv_text, request.job_spec, session.persona, provider, api_key=request.api_key, model=request.model, base_url=request.base_url)
+            cv_analysis = await _run_llm(
+                http_request,
+                analysis_core.analyze_cv,
+                request.cv_text,
+                request.job_spec,
+                session.persona,
+                provider,
+                api_key=request.api_key,
+                model=request.model,
+                base_url=request.base_url,
+            )
             session.cv_analysis = cv_analysis
             session.logs.append(
                 {
@@ -296,10 +427,9 @@ async def start_session(request: StartRequest) -> StartResponse:
         except Exception as e:
             print(f"Error analyzing CV: {e}")
 
-    session.save()
-    SESSIONS[session.session_id] = session
+    await _save_session(session)
     if request.api_key:
-        SESSION_API_KEYS[session.session_id] = request.api_key
+        await session_store.put_api_key(session.session_id, request.api_key)
     return StartResponse(
         session_id=session.session_id,
         total_questions=question_core.total_questions(request.start_round),
@@ -307,20 +437,29 @@ async def start_session(request: StartRequest) -> StartResponse:
 
 
 @app.post("/sessions/{session_id}/next_question")
-async def next_question(session_id: str) -> Dict[str, Any]:
-    session = _get_session(session_id)
+async def next_question(session_id: str, http_request: Request) -> Dict[str, Any]:
+    # A repeated click or retry while a question is being generated gets that same question.
+    return await single_flight.gate.run(
+        session_id,
+        "next_question",
+        lambda: _admitted(lambda: _next_question(session_id, http_request)),
+        http_request.is_disconnected,
+    )
+
+
+async def _next_question(session_id: str, http_request: Request) -> Dict[str, Any]:
+    session = await _get_session(session_id)
     if session.status != "active":
         raise HTTPException(status_code=400, detail="Session is not active")
 
     total = question_core.total_questions(session.start_round)
-    main_count = question_core.main_question_count(session.to_dict())
-    api_key = SESSION_API_KEYS.get(session_id)
+    main_count = question_core.main_question_count(session)
+    api_key = await session_store.get_api_key(session_id)
 
     # Resume: if the most recent question hasn't been answered yet (e.g. the page was
     # refreshed or the session was reopened), return that question instead of generating a
     # new one — otherwise we'd skip the question the candidate was on.
-    answered_ids = {a.get("question_id") for a in session.answers}
-    if session.questions and session.questions[-1].get("question_id") not in answered_ids:
+    if session.questions and not session.index.answers(session.questions[-1].get("question_id")):
         pending = session.questions[-1]
         return {
             "question_id": pending.get("question_id", ""),
@@ -335,16 +474,23 @@ async def next_question(session_id: str) -> Dict[str, Any]:
             "is_follow_up": pending.get("kind") == "follow_up",
         }
 
-    # If the last answer was weak, probe it with a follow-up before advancing.
-    parent = question_core.needs_follow_up(session.to_dict())
-    if parent is not None:
-        question = question_core.generate_followup(session.to_dict(), parent, api_key=api_key)
-        is_follow_up = True
-    else:
-        if main_count >= total:
-            raise HTTPException(status_code=400, detail="Interview already complete")
-        question = question_core.generate_question(session.to_dict(), main_count, api_key=api_key)
-        is_follow_up = False
+    # Generating needs the whole session (job spec, CV, rubric, score history).
+    await session.aload()
+    _cancellable()
+    try:
+        # If the last answer was weak, probe it with a follow-up before advancing.
+        parent = question_core.needs_follow_up(session)
+        if parent is not None:
+            question = await _run_llm(http_request, question_core.generate_followup, session, parent, api_key=api_key)
+            is_follow_up = True
+        else:
+            if main_count >= total:
+                raise HTTPException(status_code=400, detail="Interview already complete")
+            question = await _run_llm(http_request, question_core.generate_question, session, main_count, api_key=api_key)
+            is_follow_up = False
+    except cancel.Cancelled as exc:
+        # Nothing is saved; the next call generates the question afresh.
+        raise _abandoned(exc) from exc
 
     question_fields = ["question_id", "text", "round", "persona", "anchor", "competency"]
     parsed_question = {k: question.get(k, "") for k in question_fields}
@@ -352,7 +498,7 @@ async def next_question(session_id: str) -> Dict[str, Any]:
     if is_follow_up:
         parsed_question["parent_id"] = parent["question_id"]
     session.questions.append(parsed_question)
-    session.logs.append(
+    session.audit_logs.append(
         {
             "type": "question",
             "prompt": question.get("prompt"),
@@ -361,7 +507,7 @@ async def next_question(session_id: str) -> Dict[str, Any]:
             "timestamp": time.time(),
         }
     )
-    session.save()
+    await _save_session(session)
 
     return {
         "question_id": question["question_id"],
@@ -379,30 +525,43 @@ async def next_question(session_id: str) -> Dict[str, Any]:
 
 
 @app.post("/sessions/{session_id}/answer")
-async def answer_question(session_id: str, request: AnswerRequest) -> Dict[str, Any]:
-    session = _get_session(session_id)
-    question = next((q for q in session.questions if q["question_id"] == request.question_id), None)
-    if not question:
-        raise HTTPException(status_code=404, detail="Question not found")
-
-    personas = ["positive", "neutral", "hostile"]
-    api_key = SESSION_API_KEYS.get(session_id)
-    score_payloads = [
-        scoring_core.score_answer(session.to_dict(), question, request.answer_text, persona, api_key=api_key)
-        for persona in personas
-    ]
-    delivery = delivery_core.analyze_delivery(
-        request.answer_text, duration_seconds=request.duration_seconds, used_voice=request.used_voice
+async def answer_question(
+    session_id: str,
+    request: AnswerRequest,
+    http_request: Request,
+    idempotency_key: Optional[str] = Header(default=None),
+) -> Dict[str, Any]:
+    # Without an Idempotency-Key, the question and answer text identify a retry: the same
+    # answer resubmitted is scored once, and later copies get that scoring back.
+    answer_hash = hashlib.sha256(request.answer_text.encode("utf-8")).hexdigest()
+    fingerprint = f"{request.question_id}:{answer_hash}"
+    return await _idempotent(
+        session_id, f"answer:{idempotency_key or fingerprint}", fingerprint, http_request,
+        lambda: _admitted(lambda: _answer_question(session_id, request, http_request)),
     )
-    session.answers.append(
-        {
-            "question_id": request.question_id,
-            "answer_text": request.answer_text,
-            "delivery": delivery,
-            "timestamp": time.time(),
-        }
-    )
-    for persona, score_payload in zip(personas, score_payloads):
+
+
+def _unfinished_scoring(session: SessionState, request: AnswerRequest) -> Optional[tuple]:
+    """The stored answer and its persona scores, if this same answer was saved part-way
+    through scoring (its client disconnected); a retry picks up where that left off."""
+    answers = session.index.answers(request.question_id)
+    if not answers or answers[-1].get("answer_text") != request.answer_text:
+        return None
+    answer = answers[-1]
+    scored = {
+        s["persona"]: s
+        for s in session.index.scores(request.question_id)
+        if s.get("timestamp", 0) >= answer.get("timestamp", 0)
+    }
+    if len(scored) >= len(SCORING_PERSONAS):
+        return None  # fully scored: this is a fresh answer with the same text
+    return answer, scored
+
+
+def _record_scores(session: SessionState, request: AnswerRequest, answer: Dict[str, Any], new_answer: bool, payloads: Dict[str, Dict[str, Any]]) -> None:
+    if new_answer:
+        session.answers.append(answer)
+    for persona, score_payload in payloads.items():
         session.scores.append(
             {
                 "question_id": request.question_id,
@@ -412,7 +571,7 @@ async def answer_question(session_id: str, request: AnswerRequest) -> Dict[str,
                 "timestamp": time.time(),
             }
         )
-        session.logs.append(
+        session.audit_logs.append(
             {
                 "type": "scoring",
                 "persona": persona,
@@ -423,14 +582,61 @@ async def answer_question(session_id: str, request: AnswerRequest) -> Dict[str,
             }
         )
 
+
+async def _answer_question(session_id: str, request: AnswerRequest, http_request: Request) -> Dict[str, Any]:
+    session = await _get_session(session_id)
+    question = session.index.question(request.question_id)
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    await session.aload()
+    api_key = await session_store.get_api_key(session_id)
+    _cancellable()
+    unfinished = _unfinished_scoring(session, request)
+    if unfinished is not None:
+        answer, scored = unfinished
+        new_answer = False
+    else:
+        delivery = delivery_core.analyze_delivery(
+            request.answer_text, duration_seconds=request.duration_seconds, used_voice=request.used_voice
+        )
+        answer = {
+            "question_id": request.question_id,
+            "answer_text": request.answer_text,
+            "delivery": delivery,
+            "timestamp": time.time(),
+        }
+        scored, new_answer = {}, True
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    try:
+        for persona in SCORING_PERSONAS:
+            if persona not in scored:
+                fresh[persona] = await _run_llm(
+                    http_request, scoring_core.score_answer, session, question, request.answer_text, persona, api_key=api_key
+                )
+    except cancel.Cancelled as exc:
+        # Keep the scores that did finish; retrying this answer only scores the rest.
+        if fresh:
+            _record_scores(session, request, answer, new_answer, fresh)
+            await _save_session(session)
+        raise _abandoned(exc) from exc
+    _record_scores(session, request, answer, new_answer, fresh)
+    score_payloads = [scored.get(persona) or fresh[persona] for persona in SCORING_PERSONAS]
+    delivery = answer["delivery"]
+
     competency_scores = coaching_core.aggregate_competencies(score_payloads)
     star_feedback = coaching_core.aggregate_star(score_payloads)
-    coaching = coaching_core.build_coaching(
+    # If the client goes away or the budget runs out now, the coaching call is cut short and
+    # falls back to the heuristic coaching, so the finished scores are saved with coaching.
+    coaching = await _run_llm(
+        http_request,
+        coaching_core.build_coaching,
         question_text=question.get("text", ""),
         answer_text=request.answer_text,
         competency_scores=competency_scores,
         star_feedback=star_feedback,
-        session=session.to_dict(),
+        session=session,
         api_key=api_key,
         score_payloads=score_payloads,
     )
@@ -450,7 +656,7 @@ async def answer_question(session_id: str, request: AnswerRequest) -> Dict[str,
         }
     )
 
-    session.save()
+    await _save_session(session)
     return {
         "ok": True,
         "average_overall_score": avg_overall,
@@ -461,16 +667,31 @@ async def answer_question(session_id: str, request: AnswerRequest) -> Dict[str,
     }
 
 @app.post("/sessions/{session_id}/end")
-async def end_session(session_id: str) -> Dict[str, object]:
-    session = _get_session(session_id)
-    api_key = SESSION_API_KEYS.get(session_id)
-    report_payload, report_paths = report_core.build_report(session.to_dict(), api_key=api_key)
+async def end_session(
+    session_id: str, http_request: Request, idempotency_key: Optional[str] = Header(default=None)
+) -> Dict[str, object]:
+    # A session ends once; a retried /end gets the first one's summary.
+    key = f"end:{idempotency_key}" if idempotency_key else "end"
+    return await _idempotent(session_id, key, "end", http_request, lambda: _admitted(lambda: _end_session(session_id, http_request)))
+
+
+async def _end_session(session_id: str, http_request: Request) -> Dict[str, object]:
+    session = await _get_session(session_id)
+    await session.aload()
+    # build_report records the score on the session row, so the row must be written first.
+    await write_behind.queue.flush(session_id)
+    api_key = await session_store.get_api_key(session_id)
+    # The report is still written if the client goes away or the budget runs out: its LLM
+    # grading is cut short and the qualitative sections fall back to the heuristic ones.
+    _cancellable()
+    report_payload, report_paths = await _run_llm(http_request, report_core.build_report, session, api_key=api_key)
     session.status = "completed"
-    session.save()
+    await _save_session(session)
 
-    # The interview is over; drop the in-memory API key so it doesn't linger for the
-    # process lifetime.
-    SESSION_API_KEYS.pop(session_id, None)
+    # The interview is over; drop the API key so it doesn't linger until it expires, and the
+    # cached session itself (it reloads from the database if asked for).
+    await session_store.drop_api_key(session_id)
+    await _evict_session(session_id)
 
     summary = {
         "overall_score": report_payload["overall_score"],
@@ -532,15 +753,42 @@ async def text_to_speech(request: TTSRequest) -> Response:
 
 
 @app.get("/sessions/{session_id}/report")
-async def get_report(session_id: str) -> Dict[str, Any]:
+async def get_report(
+    session_id: str,
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+) -> Response:
+    """The report JSON, from report_cache: 304 if the client's ETag is current, gzipped if it
+    accepts that."""
     try:
         report_path = report_core.REPORTS_DIR / session_id / "report.json"
-        if not report_path.exists():
-            raise HTTPException(status_code=404, detail="Report not found")
-        return json.loads(report_path.read_text(encoding="utf-8"))
+        cached = report_cache.cache.get(session_id, report_path)
+        if cached is None:
+            # An archived session's report is in its archive record; restore it on demand.
+            if not report_path.exists():
+                await async_storage.restore_session(session_id)
+            if not report_path.exists():
+                raise HTTPException(status_code=404, detail="Report not found")
+            cached = await asyncio.to_thread(report_cache.cache.load, session_id, report_path)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    gzipped = report_cache.accepts_gzip(accept_encoding)
+    # no-cache: browsers may keep the report but must revalidate it, since a new /end rewrites it.
+    headers = {
+        "ETag": cached.gzip_etag if gzipped else cached.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if cached.not_modified(if_none_match):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.gzipped, media_type="application/json", headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
 
 # --- New Endpoints ---
 
@@ -569,19 +817,71 @@ async def upload_file(file: UploadFile = File(...)) -> FileUploadResponse:
     )
 
 @app.get("/sessions")
-async def list_sessions() -> List[Dict[str, Any]]:
-    return storage_core.list_sessions()
+async def list_sessions(
+    limit: int = Query(storage_core.LIST_PAGE_SIZE, ge=1, le=storage_core.LIST_PAGE_MAX),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+) -> Dict[str, Any]:
+    """A page of sessions, newest first; pass ``next_cursor`` back as ``cursor`` for the next."""
+    try:
+        return await async_storage.list_sessions(
+            limit=limit, cursor=cursor, status=status, min_score=min_score, max_score=max_score
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+@app.get("/sessions/search")
+async def search_sessions(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(storage_core.LIST_PAGE_SIZE, ge=1, le=storage_core.LIST_PAGE_MAX),
+) -> Dict[str, Any]:
+    """Full-text search over job specs, CVs, questions and answers; snippets mark matches."""
+    return await async_storage.search_sessions(q, limit)
+
+@app.get("/sessions/export")
+async def export_sessions(
+    format: str = Query("ndjson", pattern="^(ndjson|parquet)$"),
+    compress: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields; all by default"),
+) -> StreamingResponse:
+    """Every session as NDJSON (optionally gzipped) or Parquet, streamed batch by batch."""
+    await write_behind.queue.flush()
+    try:
+        chunks = bulk.export_chunks(format, fields.split(",") if fields else None, compress=compress)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    if format == "parquet":
+        media_type, filename = "application/vnd.apache.parquet", "sessions.parquet"
+    elif compress:
+        media_type, filename = "application/gzip", "sessions.ndjson.gz"
+    else:
+        media_type, filename = "application/x-ndjson", "sessions.ndjson"
+    # A sync iterator: Starlette pulls each chunk on a worker thread, off the event loop.
+    return StreamingResponse(
+        chunks, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/sessions/{session_id}/audit")
+async def get_session_audit(session_id: str) -> List[Dict[str, Any]]:
+    """Raw LLM prompt/response entries for a session — debugging only, never used by the UI."""
+    await write_behind.queue.flush(session_id)
+    return await async_storage.load_audit_logs(session_id)
 
 @app.get("/sessions/{session_id}")
 async def get_session(session_id: str) -> Dict[str, Any]:
     try:
-        session = _get_session(session_id)
+        session = await _get_session(session_id)
+        await session.aload()
         # We return the raw dict, but we could filter or separate rubric
         return session.to_dict()
     except Exception:
          # Fallback if _get_session expects it to be in memory or loaded
          try:
-            return storage_core.load_session(session_id)
+            return await async_storage.load_session(session_id)
          except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Session not found")
 
@@ -589,18 +889,6 @@ async def get_session(session_id: str) -> Dict[str, Any]:
 # SPA Catch-all
 from fastapi.responses import FileResponse
 
-# Debug: Print WEB_DIR and check assets
-print(f"DEBUG: WEB_DIR is {WEB_DIR}")
-if (WEB_DIR / "assets").exists():
-    print(f"DEBUG: Assets directory found at {WEB_DIR / 'assets'}")
-    # List a few files to verify
-    try:
-        print(f"DEBUG: Assets content: {[f.name for f in (WEB_DIR / 'assets').iterdir()]}")
-    except Exception as e:
-        print(f"DEBUG: Failed to list assets: {e}")
-else:
-    print(f"DEBUG: Assets directory NOT found at {WEB_DIR / 'assets'}")
-
 @app.get("/{full_path:path}")
 async def catch_all(full_path: str):
     # If the path is a file in WEB_DIR, serve it correctly
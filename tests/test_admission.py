@@ -0,0 +1,99 @@
+"""Tests for admission control — bounded concurrency and a bounded wait queue."""
+import asyncio
+
+import pytest
+
+from server.core import admission
+
+
+def test_requests_beyond_the_slots_wait_in_order_and_the_rest_are_refused():
+    controller = admission.AdmissionController(max_active=1, max_queue=1, max_wait=60)
+    order = []
+
+    async def request(name, hold):
+        async with controller.admit():
+            order.append(name)
+            await hold.wait()
+
+    async def run():
+        first, second = asyncio.Event(), asyncio.Event()
+        a = asyncio.create_task(request("a", first))
+        b = asyncio.create_task(request("b", second))
+        await asyncio.sleep(0)
+        assert (controller.active, controller.metrics()["queued"]) == (1, 1)
+
+        with pytest.raises(admission.Overloaded) as refused:
+            async with controller.admit():
+                pass
+        assert refused.value.retry_after >= 1
+
+        first.set()
+        await a
+        await asyncio.sleep(0)
+        assert order == ["a", "b"]
+        second.set()
+        await b
+
+    asyncio.run(run())
+    metrics = controller.metrics()
+    assert (metrics["active"], metrics["queued"], metrics["admitted_total"], metrics["rejected_queue_full_total"]) == (0, 0, 2, 1)
+
+
+def test_a_request_is_refused_when_the_estimated_wait_is_too_long():
+    controller = admission.AdmissionController(max_active=1, max_queue=10, max_wait=5)
+    controller.service_seconds = 20.0
+
+    async def run():
+        hold = asyncio.Event()
+
+        async def busy():
+            async with controller.admit():
+                await hold.wait()
+
+        task = asyncio.create_task(busy())
+        await asyncio.sleep(0)
+        with pytest.raises(admission.Overloaded) as refused:
+            async with controller.admit():
+                pass
+        hold.set()
+        await task
+        return refused.value
+
+    refused = asyncio.run(run())
+    assert refused.retry_after == 20
+    assert controller.counts["rejected_wait_total"] == 1
+
+
+def test_a_waiter_that_gives_up_leaves_the_queue():
+    controller = admission.AdmissionController(max_active=1, max_queue=5, max_wait=60)
+
+    async def run():
+        hold = asyncio.Event()
+
+        async def busy():
+            async with controller.admit():
+                await hold.wait()
+
+        async def waiter():
+            async with controller.admit():
+                pass
+
+        task = asyncio.create_task(busy())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller.metrics()["queued"] == 0
+        hold.set()
+        await task
+
+    asyncio.run(run())
+    assert controller.active == 0
+
+
+def test_metrics_render_as_prometheus_text():
+    text = admission.prometheus_text(admission.AdmissionController(max_active=2).metrics())
+    assert "# TYPE intervue_admission_queued gauge\nintervue_admission_queued 0\n" in text
+    assert "intervue_admission_max_active 2" in text
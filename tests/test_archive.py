@@ -0,0 +1,140 @@
+"""Tests for session retention — archiving old completed sessions and restoring them on load."""
+import gzip
+import json
+import time
+
+import pytest
+
+from server.core import archive, storage
+from server.core.state import SessionState
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    return tmp_path
+
+
+def _completed_session(age_days, status="completed"):
+    session = SessionState("Senior Backend Engineer\nScaling Postgres.", "Built payments API at Acme.", "mock")
+    session.created_at = time.time() - age_days * DAY
+    session.status = status
+    session.rubric = {"competencies": [{"name": "Depth", "weight": 1.0}]}
+    session.questions.append({"question_id": "q1", "text": "How did you shard the ledger?"})
+    session.answers.append({"question_id": "q1", "answer_text": "By merchant id, with a router."})
+    session.logs.append({"type": "coaching", "question_id": "q1"})
+    session.audit_logs.append({"type": "scoring", "prompt": "Score this answer " * 40, "raw_response": "{}"})
+    session.save()
+    return session
+
+
+def test_archived_session_keeps_its_summary_and_restores_on_load(temp_db, dirs):
+    session = _completed_session(age_days=120)
+    before = storage.load_session(session.session_id)
+    audit = storage.load_audit_logs(session.session_id)
+    storage.save_report(session.session_id, {"overall_score": 72.5})
+    (storage.REPORTS_DIR / session.session_id / "chart.png").write_bytes(b"\x89PNG...")
+
+    assert archive.archive_sessions(older_than_days=90) == 1
+
+    assert not (storage.REPORTS_DIR / session.session_id).exists()
+    listed = storage.list_sessions()["sessions"][0]
+    assert (listed["job_title"], listed["overall_score"]) == ("Senior Backend Engineer", 72.5)
+    assert storage.search_sessions("ledger")["results"] == []
+    assert storage.load_audit_logs(session.session_id) == []
+
+    assert storage.load_session(session.session_id) == before
+    assert storage.load_audit_logs(session.session_id) == audit
+    assert (storage.REPORTS_DIR / session.session_id / "chart.png").read_bytes() == b"\x89PNG..."
+    assert storage.search_sessions("ledger")["results"][0]["session_id"] == session.session_id
+    assert storage.list_sessions()["sessions"][0]["overall_score"] == 72.5
+
+
+def test_only_old_completed_sessions_are_archived_into_monthly_ndjson(temp_db, dirs):
+    old = _completed_session(age_days=120)
+    _completed_session(age_days=10)
+    _completed_session(age_days=120, status="in_progress")
+
+    assert archive.archive_sessions(older_than_days=90) == 1
+    assert archive.archive_sessions(older_than_days=90) == 0
+
+    (path,) = archive.ARCHIVE_DIR.iterdir()
+    assert path.name == archive._archive_path(old.created_at).name
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["session"]["session_id"] for record in records] == [old.session_id]
+
+
+def test_restore_then_archive_again_appends_a_new_member(temp_db, dirs):
+    session = _completed_session(age_days=120)
+    archive.archive_session(session.session_id)
+    storage.load_session(session.session_id)
+    assert archive.archive_session(session.session_id)
+    assert not archive.archive_session(session.session_id)
+
+    assert storage.load_session(session.session_id)["questions"][0]["question_id"] == "q1"
+
+
+def test_compact_never_rewrites_the_database_to_switch_vacuum_mode(tmp_path, dirs, capsys):
+    from sqlalchemy import text
+
+    from server.db import database
+
+    # A database from before incremental vacuum (SQLite's default mode).
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'compact.db'}", profile="legacy")
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal.configure(bind=engine)
+    try:
+        archive.compact()
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA auto_vacuum")).scalar() == 0
+        assert "enable-incremental-vacuum" in capsys.readouterr().out
+
+        # The maintenance command does the switch; compaction then reclaims pages itself.
+        assert archive.enable_incremental_vacuum()
+        assert not archive.enable_incremental_vacuum()
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2
+        archive.compact()
+    finally:
+        database.SessionLocal.configure(bind=database.engine)
+        engine.dispose()
+
+
+def test_new_databases_start_in_incremental_vacuum_mode(tmp_path):
+    from sqlalchemy import text
+
+    from server.db import database
+
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    try:
+        database.Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+    finally:
+        engine.dispose()
+
+
+def test_retention_pass_is_skipped_while_another_process_runs_it(temp_db, dirs, monkeypatch):
+    import contextlib
+
+    from server.core import locks
+
+    class Stop(BaseException):
+        pass
+
+    def stop(seconds):
+        raise Stop
+
+    session = _completed_session(age_days=120)
+    monkeypatch.setattr(locks, "exclusive", lambda name: contextlib.nullcontext(False))
+    monkeypatch.setattr(archive.time, "sleep", stop)  # one pass, then out of the loop
+    monkeypatch.setattr(archive, "ARCHIVE_AFTER_DAYS", 90)
+    with pytest.raises(Stop):
+        archive.run_retention()
+    assert storage.list_sessions()["sessions"][0]["session_id"] == session.session_id
+    assert not archive.ARCHIVE_DIR.exists()
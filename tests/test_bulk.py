@@ -0,0 +1,91 @@
+"""Tests for bulk export/import — sessions streamed out as NDJSON or Parquet and loaded back."""
+import gzip
+import json
+
+import pytest
+
+from server.core import bulk, storage
+from server.core.state import SessionState
+
+
+def _session(n):
+    session = SessionState(f"Backend Engineer {n}\nScaling Postgres.", "Built payments API at Acme.", "mock")
+    session.created_at = 1_700_000_000.0 + n
+    session.rubric = {"competencies": [{"name": "Depth", "weight": 1.0}]}
+    session.questions.append({"question_id": "q1", "text": f"How did you shard ledger {n}?"})
+    session.answers.append({"question_id": "q1", "answer_text": "By merchant id."})
+    session.scores.append({"question_id": "q1", "persona": "neutral", "overall_score": 70.0 + n})
+    session.logs.append({"type": "coaching", "question_id": "q1"})
+    session.audit_logs.append({"type": "scoring", "prompt": f"Score this answer {n}. " * 20, "raw_response": "{}"})
+    session.save()
+    return session
+
+
+def _reset(engine):
+    from server.db import database
+
+    database.Base.metadata.drop_all(bind=engine)
+    database.Base.metadata.create_all(bind=engine)
+
+
+def test_ndjson_export_round_trips_through_import(temp_db, tmp_path):
+    sessions = [_session(n) for n in range(5)]
+    before = [storage.load_session(s.session_id) for s in sessions]
+    audit = [storage.load_audit_logs(s.session_id) for s in sessions]
+
+    path = tmp_path / "sessions.ndjson.gz"
+    with path.open("wb") as f:
+        for chunk in bulk.ndjson_chunks(bulk.iter_sessions(batch_size=2), compress=True):
+            f.write(chunk)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["session_id"] for line in f] == [s.session_id for s in sessions]
+
+    _reset(temp_db)
+    assert bulk.import_sessions(bulk.read_ndjson(path), batch_size=2) == {"imported": 5, "skipped": 0}
+    assert [storage.load_session(s.session_id) for s in sessions] == before
+    assert [storage.load_audit_logs(s.session_id) for s in sessions] == audit
+    assert audit[0][0]["prompt"].startswith("Score this answer 0.")
+    assert storage.search_sessions("ledger")["results"]
+
+    # Importing again leaves what's there alone.
+    assert bulk.import_sessions(bulk.read_ndjson(path)) == {"imported": 0, "skipped": 5}
+
+
+def test_export_projects_only_the_requested_fields(temp_db):
+    _session(1)
+    (batch,) = list(bulk.iter_sessions(["status", "scores"]))
+
+    assert set(batch[0]) == {"session_id", "status", "scores"}
+    assert batch[0]["scores"][0]["overall_score"] == 71.0
+    with pytest.raises(ValueError, match="password"):
+        bulk.export_fields(["status", "password"])
+
+
+def test_parquet_export_round_trips_through_import(temp_db, tmp_path):
+    pytest.importorskip("pyarrow")
+    sessions = [_session(n) for n in range(3)]
+    before = [storage.load_session(s.session_id) for s in sessions]
+    audit = [storage.load_audit_logs(s.session_id) for s in sessions]
+
+    path = tmp_path / "sessions.parquet"
+    path.write_bytes(b"".join(bulk.export_chunks("parquet")))
+
+    _reset(temp_db)
+    assert bulk.import_sessions(bulk.read_parquet(path))["imported"] == 3
+    assert [storage.load_session(s.session_id) for s in sessions] == before
+    assert [storage.load_audit_logs(s.session_id) for s in sessions] == audit
+
+
+def test_archived_sessions_are_exported_in_full(temp_db, tmp_path, monkeypatch):
+    from server.core import archive
+
+    monkeypatch.setattr(storage, "REPORTS_DIR", tmp_path / "reports")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    session = _session(1)
+    before = storage.load_session(session.session_id)
+    audit = storage.load_audit_logs(session.session_id)
+    archive.archive_session(session.session_id)
+
+    (batch,) = list(bulk.iter_sessions())
+    assert {k: v for k, v in batch[0].items() if k not in ("overall_score", "audit")} == before
+    assert batch[0]["audit"] == audit
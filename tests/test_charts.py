@@ -0,0 +1,44 @@
+"""Tests for the report charts — the SVG engine, and matplotlib PNGs when it is installed."""
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from server.core import charts
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_radar_plots_each_competency_clockwise_from_the_top():
+    svg = ET.fromstring(charts.radar_svg({"Depth": 100.0, "Clarity": 50.0, "Ownership & <Scope>": 0.0}))
+    points = [tuple(map(float, p.split(","))) for p in svg.find(f"{SVG}polygon").get("points").split()]
+    cx, cy = charts.RADAR_WIDTH / 2, charts.RADAR_HEIGHT / 2
+    # Depth at full radius straight up; Clarity half way out, down and to the right; Ownership
+    # at the centre.
+    assert points[0] == (cx, cy - charts.RADAR_RADIUS)
+    assert points[1][0] > cx and points[1][1] > cy
+    assert points[2] == (cx, cy)
+    labels = ["".join(t.itertext()) for t in svg.iter(f"{SVG}text") if t.find(f"{SVG}tspan") is not None]
+    assert labels == ["Depth", "Clarity", "Ownership &<Scope>"]
+
+
+def test_radar_without_scores_says_so():
+    svg = ET.fromstring(charts.radar_svg({}))
+    assert [t.text for t in svg.iter(f"{SVG}text")] == ["No competency scores yet"]
+
+
+def test_score_line_has_one_marker_per_question_and_stays_small():
+    data = charts.render({"Depth": 75.0}, [80.0, 40.0, 120.0])["score_over_time"]
+    svg = ET.fromstring(data)
+    markers = [(float(c.get("cx")), float(c.get("cy"))) for c in svg.iter(f"{SVG}circle")]
+    left, top, right, bottom = charts._LINE_PLOT
+    assert len(markers) == 3
+    assert markers[0][0] < markers[1][0] < markers[2][0]
+    assert markers[2][1] == top  # clamped to 100
+    assert len(data) < 8 * 1024
+
+
+def test_png_format_draws_with_matplotlib():
+    pytest.importorskip("matplotlib")
+    drawn = charts.render({"Depth": 75.0, "Clarity": 50.0, "Ownership": 62.5}, [70.0, 55.0], "png")
+    assert all(data[:4] == b"\x89PNG" for data in drawn.values())
+    assert charts.render({}, [], "png")["competency_radar"] is None
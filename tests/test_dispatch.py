@@ -48,3 +48,68 @@ def test_test_connection_local_requires_base_url():
     # `match` checks the error message contains this substring (regex).
     with pytest.raises(ValueError, match="base URL"):
         dispatch.test_connection(cfg)
+
+
+def test_cancel_kills_the_running_provider_call():
+    import threading
+    import time
+
+    from server.llm import cancel
+
+    token = cancel.CancelToken()
+    cancel.current.set(token)
+    try:
+        threading.Timer(0.2, token.cancel).start()
+        started = time.perf_counter()
+        with pytest.raises(cancel.Cancelled):
+            cancel.run(["sleep", "30"], timeout=60)
+        assert time.perf_counter() - started < 5
+
+        # Once cancelled, later calls fail without starting a process.
+        with pytest.raises(cancel.Cancelled):
+            cancel.run(["false-command-that-does-not-exist"], timeout=1)
+    finally:
+        cancel.current.set(None)
+
+
+def test_run_without_a_token_is_plain_subprocess_run():
+    from server.llm import cancel
+
+    result = cancel.run(["echo", "ok"], timeout=5)
+    assert (result.returncode, result.stdout.strip()) == (0, "ok")
+
+
+def test_calls_get_only_what_is_left_of_the_request_deadline():
+    import time
+
+    from server.llm import cancel
+
+    token = cancel.CancelToken(budget=0.3)
+    cancel.current.set(token)
+    try:
+        started = time.perf_counter()
+        with pytest.raises(cancel.DeadlineExceeded):
+            cancel.run(["sleep", "30"], timeout=120)
+        assert time.perf_counter() - started < 5
+        # Spent: retries and later calls stop before reaching a provider.
+        with pytest.raises(cancel.DeadlineExceeded):
+            dispatch.call_llm(dispatch.LLMConfig(provider="openai", api_key="sk-test"), "hello")
+    finally:
+        cancel.current.set(None)
+
+
+def test_out_of_time_coaching_and_report_grading_fall_back_to_heuristics(sample_session, monkeypatch):
+    from server.core import coaching, grading
+    from server.llm import cancel
+
+    session = dict(sample_session, provider="openai")
+    monkeypatch.setattr(cancel, "run", lambda *a, **k: pytest.fail("no provider call once the budget is spent"))
+    token = cancel.CancelToken(budget=0)
+    cancel.current.set(token)
+    try:
+        feedback = coaching.build_coaching("Q?", "A.", {"Technical Depth": 50.0}, {}, session=session, api_key="sk")
+        assert feedback == coaching._heuristic_coaching("Q?", "A.", {"Technical Depth": 50.0}, {})
+        with pytest.raises(cancel.DeadlineExceeded):
+            grading._generate_report_with_retries("prompt", dispatch.LLMConfig(provider="openai", api_key="sk"))
+    finally:
+        cancel.current.set(None)
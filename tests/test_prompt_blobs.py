@@ -0,0 +1,55 @@
+"""Tests for the content-addressed prompt blob store."""
+from server.core import prompt_blobs, storage
+from server.core.state import SessionState
+from server.db.models import PromptBlob
+
+JOB_SPEC = "Senior Backend Engineer. " + "Own the payments platform end to end. " * 20
+CV_TEXT = "Built a payments API at Acme. " + "Cut p95 latency 40% by profiling queries. " * 20
+
+
+def _prompt(tail: str) -> str:
+    return f"Job Spec:\n{JOB_SPEC}\n\nCV:\n{CV_TEXT}\n\nQuestion ID: {tail}\n\nGenerate one question."
+
+
+def test_split_prompt_is_lossless():
+    prompt = _prompt("q1") + "\n\n\nTrailing\nlines\n"
+    assert "".join(prompt_blobs.split_prompt(prompt)) == prompt
+
+
+def test_growing_block_keeps_its_leading_segments():
+    history = "".join(f"Q (q{i}): question number {i}\n  A: answer number {i}\n" for i in range(40))
+    longer = history + "Q (q40): one more\n  A: and its answer\n"
+    before = prompt_blobs.split_prompt(history)
+    after = prompt_blobs.split_prompt(longer)
+    # Content-defined cut points: everything but the tail segment is unchanged.
+    assert after[: len(before) - 1] == before[:-1]
+
+
+def test_dedupe_prompt_references_shared_segments_by_hash():
+    pending = {}
+    ref_one = prompt_blobs.dedupe_prompt(_prompt("q1"), pending)
+    ref_two = prompt_blobs.dedupe_prompt(_prompt("q2"), pending)
+
+    blobs_one = [part["blob"] for part in ref_one if isinstance(part, dict)]
+    assert blobs_one and blobs_one == [part["blob"] for part in ref_two if isinstance(part, dict)]
+    assert len(pending) == len(blobs_one)  # the job spec and CV are collected once
+    assert any("q2" in part for part in ref_two if isinstance(part, str))
+
+
+def test_audit_prompts_are_stored_once_and_rebuilt_on_load(temp_db):
+    session = SessionState(JOB_SPEC, CV_TEXT, "mock")
+    for qid in ("q1", "q2", "q3"):
+        session.audit_logs.append({"type": "question", "prompt": _prompt(qid), "raw_response": "{}"})
+        session.save()
+
+    db = storage.get_db_session()
+    try:
+        blob_count = db.query(PromptBlob).count()
+    finally:
+        db.close()
+    assert blob_count == 2  # job spec + CV, shared by all three prompts
+
+    entries = storage.load_audit_logs(session.session_id)
+    assert [e["prompt"] for e in entries] == [_prompt("q1"), _prompt("q2"), _prompt("q3")]
+    compact = storage.load_audit_logs(session.session_id, expand_prompts=False)
+    assert "prompt" not in compact[0] and compact[0]["prompt_ref"]
@@ -135,3 +135,39 @@ def test_main_question_count_excludes_follow_ups():
         {"question_id": "q2", "kind": "main"},
     ]}
     assert questions.main_question_count(session) == 2
+
+
+def test_session_index_follows_appends_and_reassignment():
+    from server.core.state import SessionState
+
+    state = SessionState("Backend Engineer", "Built things.", "mock")
+    state.questions.append({"question_id": "q1", "text": "How did you scale it?", "kind": "main"})
+    state.answers.append({"question_id": "q1", "answer_text": "we did stuff"})
+    state.scores.append({"question_id": "q1", "persona": "neutral", "overall_score": 40.0,
+                         "scorecard": {"issues": {}}})
+    assert questions.main_question_count(state) == 1
+    assert questions.needs_follow_up(state)["question_id"] == "q1"
+
+    # Appends are picked up without rebuilding the index.
+    state.questions.append({"question_id": "q1-f", "text": "deeper?", "kind": "follow_up", "parent_id": "q1"})
+    assert questions.needs_follow_up(state) is None
+    assert state.index.question("q1-f")["parent_id"] == "q1"
+
+    # A reassigned list is re-indexed from scratch.
+    state.questions = [{"question_id": "q2", "kind": "main"}]
+    assert state.index.question("q1") is None
+    assert state.index.question_counts() == (1, 0)
+
+
+def test_state_and_dict_give_the_same_answers():
+    from server.core.state import SessionState
+
+    data = _session_with_answer(overall=40.0, missing_example=True)
+    state = SessionState("Backend Engineer", "Built things.", "mock")
+    for name in ("questions", "answers", "scores"):
+        getattr(state, name).extend(data[name])
+
+    assert questions.needs_follow_up(state) == questions.needs_follow_up(data)
+    assert questions.main_question_count(state) == questions.main_question_count(data)
+    assert questions._previous_qa_block(state) == questions._previous_qa_block(data)
+    assert state["questions"] == data["questions"] and state.get("nope", 1) == 1
@@ -0,0 +1,92 @@
+"""Tests for the in-memory report cache and conditional GET of a report."""
+import asyncio
+import gzip
+import json
+import os
+
+import httpx
+
+from server.core import report_cache, reports
+
+
+def _write(path, payload, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_a_cached_report_is_served_until_the_file_changes(tmp_path):
+    cache = report_cache.ReportCache(max_entries=4)
+    path = tmp_path / "s1" / "report.json"
+    _write(path, {"overall_score": 70.0}, mtime_ns=1_000_000_000)
+
+    assert cache.get("s1", path) is None
+    first = cache.load("s1", path)
+    assert first.body == b'{"overall_score":70.0}'
+    assert json.loads(gzip.decompress(first.gzipped)) == {"overall_score": 70.0}
+    assert cache.get("s1", path) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A new /end rewrites the report: the next lookup misses and the ETag changes.
+    _write(path, {"overall_score": 80.0}, mtime_ns=2_000_000_000)
+    assert cache.get("s1", path) is None
+    assert cache.load("s1", path).etag != first.etag
+
+    path.unlink()
+    assert cache.get("s1", path) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_reports_are_dropped(tmp_path):
+    cache = report_cache.ReportCache(max_entries=2)
+    paths = {}
+    for sid in ("a", "b", "c"):
+        paths[sid] = tmp_path / sid / "report.json"
+        _write(paths[sid], {"session_id": sid})
+    cache.load("a", paths["a"])
+    cache.load("b", paths["b"])
+    cache.get("a", paths["a"])
+    cache.load("c", paths["c"])
+    assert cache.get("b", paths["b"]) is None
+    assert cache.get("a", paths["a"]) is not None
+
+
+def test_if_none_match_and_accept_encoding_parsing():
+    entry = report_cache.CachedReport((1, 2), b"{}")
+    assert entry.not_modified(entry.etag)
+    assert entry.not_modified(f'"other", W/{entry.gzip_etag}')
+    assert entry.not_modified("*")
+    assert not entry.not_modified('"other"')
+    assert not entry.not_modified(None)
+
+    assert report_cache.accepts_gzip("gzip, deflate, br")
+    assert report_cache.accepts_gzip("*")
+    assert not report_cache.accepts_gzip("br;q=1, gzip;q=0")
+    assert not report_cache.accepts_gzip(None)
+
+
+def test_get_report_sends_gzip_with_an_etag_and_answers_revalidation_with_304(temp_db, tmp_path, monkeypatch):
+    from server import main
+
+    monkeypatch.setattr(reports, "REPORTS_DIR", tmp_path)
+    monkeypatch.setattr(report_cache, "cache", report_cache.ReportCache())
+    _write(tmp_path / "s1" / "report.json", {"session_id": "s1", "overall_score": 75.0})
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            first = await client.get("/sessions/s1/report", headers={"Accept-Encoding": "gzip"})
+            again = await client.get("/sessions/s1/report", headers={"If-None-Match": first.headers["etag"]})
+            plain = await client.get("/sessions/s1/report", headers={"Accept-Encoding": "identity"})
+            missing = await client.get("/sessions/nope/report")
+        return first, again, plain, missing
+
+    first, again, plain, missing = asyncio.run(run())
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.json() == {"session_id": "s1", "overall_score": 75.0}
+    assert again.status_code == 304 and again.content == b""
+    assert plain.json() == first.json() and "content-encoding" not in plain.headers
+    assert missing.status_code == 404
+    assert (report_cache.cache.hits, report_cache.cache.misses) == (2, 1)
@@ -68,6 +68,7 @@ def test_persona_panel_names_empty_without_panel():
 
 def test_build_report_headline_score_is_the_numeric_average(sample_session, monkeypatch):
     # Avoid rendering real charts / writing files in a unit test.
+    monkeypatch.setattr(reports.chart_jobs, "renderer", reports.chart_jobs.ChartRenderer(workers=0))
     monkeypatch.setattr(reports, "generate_charts", lambda *a, **k: {})
     monkeypatch.setattr(reports, "save_report", lambda *a, **k: None)
 
@@ -77,3 +78,19 @@ def test_build_report_headline_score_is_the_numeric_average(sample_session, monk
     assert payload["overall_score"] == 75.0
     # Qualitative fields still come from grading (mock provider here).
     assert "Clear communication" in payload["strengths"]
+
+
+def test_charts_render_in_a_worker_process_after_build_report_returns(tmp_path, monkeypatch):
+    from server.core import chart_jobs
+
+    monkeypatch.setattr(reports, "REPORTS_DIR", tmp_path)
+    renderer = chart_jobs.ChartRenderer(workers=1)
+    try:
+        paths = renderer.submit("s1", {"Depth": 75.0, "Clarity": 50.0, "Ownership": 62.5}, [70.0, 55.0])
+        assert paths == reports.chart_paths("s1", tmp_path)
+        assert renderer.wait("s1", timeout=60)
+    finally:
+        renderer.shutdown()
+    for path in paths.values():
+        assert open(path, "rb").read(5) == b"<svg "
+    assert sorted(p.name for p in (tmp_path / "s1").iterdir()) == ["competency_radar.svg", "score_over_time.svg"]
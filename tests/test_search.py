@@ -0,0 +1,79 @@
+"""Tests for full-text session search (FTS5 on SQLite, tsvector on PostgreSQL)."""
+from server.core import search, storage
+from server.core.state import SessionState
+
+
+def _interview(job_spec, cv_text, qa):
+    session = SessionState(job_spec, cv_text, "mock")
+    session.save()
+    for i, (question, answer) in enumerate(qa):
+        session.questions.append({"question_id": f"q{i}", "text": question})
+        session.answers.append({"question_id": f"q{i}", "answer_text": answer})
+        session.save()
+    return session
+
+
+def test_search_finds_sessions_by_spec_cv_and_answers_with_snippets(temp_db):
+    kafka = _interview("Data Engineer\nStreaming pipelines.", "Ran Kafka clusters at Acme.",
+                       [("How do you handle backpressure?", "We throttled the consumers and partitioned topics.")])
+    react = _interview("Frontend Engineer\nReact and TypeScript.", "Built design systems.",
+                       [("Describe a hard bug.", "A stale closure in a React hook.")])
+
+    hits = storage.search_sessions("kafka")["results"]
+    assert [h["session_id"] for h in hits] == [kafka.session_id]
+    assert hits[0]["job_title"] == "Data Engineer"
+    assert "<mark>" in hits[0]["matches"][0]["snippet"]
+
+    # Answers added after the session started are indexed on save; stemming matches "partition".
+    assert [h["session_id"] for h in storage.search_sessions("partition")["results"]] == [kafka.session_id]
+    assert [h["session_id"] for h in storage.search_sessions("closure react")["results"]] == [react.session_id]
+
+
+def test_snippets_escape_the_document_text(temp_db):
+    _interview("Web Engineer\nFrontend.", "Wrote <script>alert('xss')</script> payload filters & sanitizers.", [])
+
+    snippet = storage.search_sessions("payload")["results"][0]["matches"][0]["snippet"]
+    # SQLite keeps the tag as escaped text; PostgreSQL's headline drops tag-like tokens.
+    assert "<script>" not in snippet and "&amp;" in snippet
+    assert "<mark>payload</mark>" in snippet
+
+
+def test_search_treats_input_as_plain_words(temp_db):
+    session = _interview("Backend Engineer\nPython and Postgres.", "Python services.", [])
+
+    # Quotes, operators and column filters are not FTS syntax errors; the last word is a prefix.
+    assert storage.search_sessions('"postg')["results"][0]["session_id"] == session.session_id
+    assert storage.search_sessions("body: OR NOT (")["results"] == []
+    assert storage.search_sessions("!!!")["results"] == []
+
+
+def test_reassigned_lists_replace_their_search_documents(temp_db):
+    session = _interview("Backend Engineer\nGo.", "Go services.", [("Tell me about Erlang?", "Never used it.")])
+    session.questions = [{"question_id": "q0", "text": "Tell me about Elixir?"}]
+    session.save()
+
+    assert storage.search_sessions("erlang")["results"] == []
+    assert len(storage.search_sessions("elixir")["results"]) == 1
+
+
+def test_sessions_saved_before_search_are_backfilled(temp_db):
+    from sqlalchemy import text
+
+    session = _interview("SRE\nKubernetes on call.", "Paged for etcd outages.", [])
+    with temp_db.begin() as conn:
+        if temp_db.dialect.name == "sqlite":
+            conn.execute(text("DELETE FROM session_search"))
+            conn.execute(text("DELETE FROM session_search_docs"))
+        else:
+            conn.execute(text("DELETE FROM session_search"))
+    assert storage.search_sessions("etcd")["results"] == []
+
+    assert storage.migrate_search_index() == 1
+    assert storage.migrate_search_index() == 0
+    assert storage.search_sessions("etcd")["results"][0]["session_id"] == session.session_id
+
+
+def test_queries_keep_only_words():
+    assert search._fts_query('sql "injection" OR x') == '"sql" "injection" "OR" "x"*'
+    assert search._tsquery("sql' | !x") == "sql & x:*"
+    assert search._fts_query("  ") is None and search._tsquery("&") is None
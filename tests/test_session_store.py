@@ -0,0 +1,122 @@
+"""Tests for the shared session store — what lets several API workers serve one interview."""
+import asyncio
+
+import pytest
+
+from server.core import session_store
+from server.core.state import SessionState
+
+
+def _new_session():
+    return SessionState("Senior Backend Engineer scaling Postgres.", "Built payments API at Acme.", "mock")
+
+
+def _redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return session_store.RedisStore(fakeredis.FakeRedis(), session_store.KeyCipher("test-secret"))
+
+
+def test_memory_store_expires_api_keys():
+    store = session_store.MemoryStore()
+    store.put_api_key("s1", "sk-live", ttl=60)
+    store.put_api_key("s2", "sk-old", ttl=-1)
+
+    assert store.get_api_key("s1") == "sk-live"
+    assert store.get_api_key("s2") is None
+
+
+def test_database_store_encrypts_keys_and_shares_them_between_workers(temp_db):
+    from sqlalchemy import text
+
+    worker_a = session_store.DatabaseStore(session_store.KeyCipher("test-secret"))
+    worker_b = session_store.DatabaseStore(session_store.KeyCipher("test-secret"))
+    worker_a.put_api_key("s1", "sk-secret-value", ttl=60)
+
+    assert worker_b.get_api_key("s1") == "sk-secret-value"
+    with temp_db.connect() as conn:
+        stored = conn.execute(text("SELECT value FROM session_store WHERE key = 'key:s1'")).scalar()
+    assert b"sk-secret-value" not in bytes(stored)
+
+    worker_b.drop_api_key("s1")
+    assert worker_a.get_api_key("s1") is None
+
+
+def test_database_store_ignores_expired_and_foreign_keys(temp_db):
+    store = session_store.DatabaseStore(session_store.KeyCipher("test-secret"))
+    store.put_api_key("expired", "sk-1", ttl=-1)
+    store.put_api_key("s1", "sk-2", ttl=60)
+
+    assert store.get_api_key("expired") is None
+    # A key written under another secret (e.g. a previous deployment) reads as missing.
+    assert session_store.DatabaseStore(session_store.KeyCipher("other-secret")).get_api_key("s1") is None
+
+
+def test_database_store_versions_count_saves(temp_db):
+    store = session_store.DatabaseStore(session_store.KeyCipher("s"))
+
+    assert store.get_version("s1") == 0
+    assert [store.bump_version("s1") for _ in range(3)] == [1, 2, 3]
+    assert store.get_version("s1") == 3
+
+
+def test_redis_store_encrypts_keys_and_counts_saves():
+    store = _redis_store()
+    store.put_api_key("s1", "sk-secret-value", ttl=60)
+
+    assert store.get_api_key("s1") == "sk-secret-value"
+    assert b"sk-secret-value" not in store.client.get("intervue:key:s1")
+    assert [store.bump_version("s1") for _ in range(2)] == [1, 2]
+
+
+def test_cached_session_is_dropped_once_another_worker_saves_it(temp_db):
+    store = session_store.DatabaseStore(session_store.KeyCipher("s"))
+    worker_a, worker_b = session_store.SessionCache(store), session_store.SessionCache(store)
+    session = _new_session()
+
+    async def run():
+        await worker_a.saved(session)
+        assert await worker_a.get(session.session_id) is session
+
+        other = _new_session()
+        other.session_id = session.session_id
+        await worker_b.saved(other)
+        assert await worker_a.get(session.session_id) is None
+        assert await worker_b.get(session.session_id) is other
+
+    asyncio.run(run())
+
+
+def test_shared_backends_require_a_secret():
+    with pytest.raises(ValueError, match="SESSION_STORE_SECRET"):
+        session_store.make_store("database", secret=None)
+    with pytest.raises(ValueError, match="SESSION_STORE"):
+        session_store.make_store("memcached", secret="s")
+
+
+def test_memory_store_keeps_responses_until_they_expire():
+    store = session_store.MemoryStore()
+    store.put_response("s1:old", b"{}", ttl=-1)
+    store.put_response("s1:answer", b'{"ok": true}', ttl=60)
+
+    assert store.get_response("s1:answer") == b'{"ok": true}'
+    assert store.get_response("s1:old") is None
+    assert list(store._responses) == ["s1:answer"]  # swept as the newer one came in
+
+
+def test_shared_stores_replay_responses_between_workers(temp_db):
+    worker_a = session_store.DatabaseStore(session_store.KeyCipher("s"))
+    worker_b = session_store.DatabaseStore(session_store.KeyCipher("s"))
+    worker_a.put_response("s1:end", b'{"summary": {}}', ttl=60)
+    worker_a.put_response("s1:gone", b"{}", ttl=-1)
+
+    assert worker_b.get_response("s1:end") == b'{"summary": {}}'
+    assert worker_b.get_response("s1:gone") is None
+    assert worker_b.get_api_key("s1") is None  # responses and keys don't collide
+
+
+def test_redis_store_replays_responses():
+    store = _redis_store()
+    store.put_response("s1:end", b"{}", ttl=60)
+
+    assert store.get_response("s1:end") == b"{}"
+    assert store.get_response("s1:other") is None
@@ -0,0 +1,128 @@
+"""Tests for per-session locking and single-flight coalescing of route calls."""
+import asyncio
+
+import pytest
+
+from server.core import single_flight
+from server.core.single_flight import SessionGate
+
+
+def test_identical_concurrent_calls_share_one_run():
+    gate = SessionGate()
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"question_id": f"q{len(calls)}"}
+
+    async def run():
+        return await asyncio.gather(*(gate.run("s1", "next_question", generate) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert results == [{"question_id": "q1"}] * 3
+    assert gate.inflight() == 0
+
+
+def test_different_calls_for_one_session_run_one_at_a_time():
+    gate = SessionGate()
+    events = []
+
+    def step(name):
+        async def fn():
+            events.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} end")
+            return name
+        return fn
+
+    async def run():
+        return await asyncio.gather(
+            gate.run("s1", ("answer", "q1", "a"), step("a")),
+            gate.run("s1", ("answer", "q1", "b"), step("b")),
+            gate.run("s2", "end", step("other")),
+        )
+
+    assert asyncio.run(run()) == ["a", "b", "other"]
+    # s2 isn't held up by s1; s1's two answers never overlap.
+    assert events.index("a end") < events.index("b start")
+    assert events.index("other start") < events.index("a end")
+    assert gate._locks == {}
+
+
+def test_followers_get_the_leaders_error_and_the_next_call_runs_again():
+    gate = SessionGate()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("provider down")
+
+    async def run():
+        results = await asyncio.gather(*(gate.run("s1", "end", failing) for _ in range(2)), return_exceptions=True)
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        with pytest.raises(ValueError):
+            await gate.run("s1", "end", failing)
+
+    asyncio.run(run())
+    assert calls == [1, 1]
+
+
+def _client(gone):
+    async def disconnected():
+        return gone[0]
+    return disconnected
+
+
+def test_call_is_only_abandoned_once_every_waiter_has_disconnected():
+    gate = SessionGate()
+    leader_gone, follower_gone = [False], [False]
+    checks = []
+
+    async def generate():
+        flight = single_flight.current.get()
+        await asyncio.sleep(0.01)
+        leader_gone[0] = True
+        checks.append(await flight.abandoned())
+        follower_gone[0] = True
+        checks.append(await flight.abandoned())
+        return "q1"
+
+    async def run():
+        leader = asyncio.ensure_future(gate.run("s1", "next_question", generate, _client(leader_gone)))
+        await asyncio.sleep(0)
+        follower = gate.run("s1", "next_question", generate, _client(follower_gone))
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(run()) == ["q1", "q1"]
+    assert checks == [False, True]
+
+
+def test_connected_follower_reruns_a_call_given_up_for_its_disconnected_leader():
+    gate = SessionGate()
+    leader_gone, follower_gone = [True], [False]
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        flight = single_flight.current.get()
+        if len(calls) == 1:
+            # The leader's client left, so the call is cut short; the follower joins just after.
+            assert await flight.abandoned()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("client closed request")
+        return "q1"
+
+    async def run():
+        leader = asyncio.ensure_future(gate.run("s1", "next_question", generate, _client(leader_gone)))
+        await asyncio.sleep(0.005)
+        follower = asyncio.ensure_future(gate.run("s1", "next_question", generate, _client(follower_gone)))
+        results = await asyncio.gather(leader, follower, return_exceptions=True)
+        assert isinstance(results[0], RuntimeError)
+        return results[1]
+
+    assert asyncio.run(run()) == "q1"
+    assert calls == [1, 1]
+    assert gate.inflight() == 0
@@ -0,0 +1,36 @@
+"""Tests that importing the server stays cheap: no heavy modules, no database, no output."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFERRED = ("pypdf", "docx", "matplotlib", "pyarrow", "multiprocessing")
+
+
+def test_importing_the_server_loads_nothing_heavy_and_touches_no_files(tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), DATABASE_URL=f"sqlite:///{tmp_path / 'app.db'}")
+    script = "import server.main, sys; print(' '.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True, check=True)
+
+    *printed, modules = proc.stdout.splitlines()
+    assert printed == []
+    assert [m for m in DEFERRED if m in modules.split()] == []
+    # The database and data directories are created by the startup hook, not on import.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_init_db_creates_the_tables(tmp_path, monkeypatch):
+    from sqlalchemy import inspect
+
+    from server.core import storage
+    from server.db import database
+
+    monkeypatch.chdir(tmp_path)
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    try:
+        storage.init_db(engine)
+        assert "sessions" in inspect(engine).get_table_names()
+    finally:
+        engine.dispose()
+    assert (tmp_path / "data" / "reports").is_dir()
@@ -0,0 +1,588 @@
+"""Tests for session persistence — delta saves against a throwaway SQLite database."""
+from server.core import storage
+from server.core.state import SessionState
+
+
+def _new_session():
+    return SessionState("Senior Backend Engineer scaling Postgres.", "Built payments API at Acme.", "mock")
+
+
+def test_new_session_round_trips(temp_db):
+    session = _new_session()
+    session.rubric = {"competencies": []}
+    session.save()
+
+    loaded = storage.load_session(session.session_id)
+    assert loaded["job_spec"] == session.job_spec
+    assert loaded["rubric"] == {"competencies": []}
+    assert loaded["questions"] == []
+
+
+def test_save_is_a_noop_when_nothing_changed(temp_db):
+    session = _new_session()
+    session.save()
+    assert session.pending_delta().is_empty()
+
+
+def test_delta_carries_only_appended_items_and_touched_fields(temp_db):
+    session = _new_session()
+    session.questions.append({"question_id": "q1", "text": "First?"})
+    session.save()
+
+    session.questions.append({"question_id": "q2", "text": "Second?"})
+    session.status = "completed"
+    delta = session.pending_delta()
+
+    assert delta.appends == {"questions": [{"question_id": "q2", "text": "Second?"}]}
+    assert delta.fields == {"status": "completed"}  # job_spec/cv_text etc. are not resent
+
+
+def test_appends_extend_the_stored_lists(temp_db):
+    session = _new_session()
+    session.save()
+    for i in range(3):
+        session.answers.append({"question_id": f"q{i + 1}", "answer_text": f"answer {i}"})
+        session.logs.append({"type": "coaching", "question_id": f"q{i + 1}"})
+        session.save()
+
+    loaded = storage.load_session(session.session_id)
+    assert [a["question_id"] for a in loaded["answers"]] == ["q1", "q2", "q3"]
+    assert len(loaded["logs"]) == 3
+
+
+def test_reassigned_list_is_written_whole(temp_db):
+    session = _new_session()
+    session.scores.append({"question_id": "q1", "overall_score": 10})
+    session.save()
+
+    session.scores = [{"question_id": "q1", "overall_score": 90}]
+    assert session.pending_delta().fields["scores"] == [{"question_id": "q1", "overall_score": 90}]
+    session.save()
+
+    assert storage.load_session(session.session_id)["scores"] == [{"question_id": "q1", "overall_score": 90}]
+
+
+def test_resumed_session_starts_clean_and_saves_deltas(temp_db):
+    session = _new_session()
+    session.questions.append({"question_id": "q1", "text": "First?"})
+    session.save()
+
+    resumed = SessionState.from_payload(storage.load_session(session.session_id))
+    assert resumed.pending_delta().is_empty()
+
+    resumed.questions.append({"question_id": "q2", "text": "Second?"})
+    resumed.save()
+    assert len(storage.load_session(session.session_id)["questions"]) == 2
+
+
+def test_appends_are_inserted_as_rows_at_the_next_ordinals(temp_db):
+    from server.db.models import SessionScore
+
+    session = _new_session()
+    session.scores.append({"question_id": "q1", "persona": "neutral", "overall_score": 60.0})
+    session.save()
+    session.scores.append({"question_id": "q2", "persona": "hostile", "overall_score": 40.0})
+    session.save()
+
+    db = storage.get_db_session()
+    try:
+        rows = db.query(SessionScore).order_by(SessionScore.ordinal).all()
+        assert [(r.ordinal, r.question_id, r.persona, r.overall_score) for r in rows] == [
+            (0, "q1", "neutral", 60.0),
+            (1, "q2", "hostile", 40.0),
+        ]
+    finally:
+        db.close()
+
+
+def _insert_legacy_row(session_id):
+    from server.db.models import InterviewSession
+
+    db = storage.get_db_session()
+    try:
+        db.add(InterviewSession(
+            session_id=session_id, created_at=1.0, status="active", job_spec="spec", cv_text="cv",
+            provider="mock", start_round=1,
+            questions=[{"question_id": "q1", "text": "Legacy?"}],
+            answers=[{"question_id": "q1", "answer_text": "Yes."}],
+            scores=[], logs=[{"type": "coaching", "question_id": "q1"}],
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_migrate_list_columns_moves_legacy_arrays(temp_db):
+    from server.db.models import InterviewSession
+
+    _insert_legacy_row("legacy-1")
+    assert storage.migrate_list_columns() == 1
+    assert storage.migrate_list_columns() == 0  # nothing left to do
+
+    loaded = storage.load_session("legacy-1")
+    assert loaded["questions"] == [{"question_id": "q1", "text": "Legacy?"}]
+    assert loaded["logs"] == [{"type": "coaching", "question_id": "q1"}]
+
+    db = storage.get_db_session()
+    try:
+        assert db.get(InterviewSession, "legacy-1").questions is None
+    finally:
+        db.close()
+
+
+def test_unmigrated_session_is_moved_on_load_and_appends_follow_history(temp_db):
+    _insert_legacy_row("legacy-2")
+    resumed = SessionState.from_payload(storage.load_session("legacy-2"))
+    resumed.questions.append({"question_id": "q2", "text": "New?"})
+    resumed.save()
+
+    assert [q["question_id"] for q in storage.load_session("legacy-2")["questions"]] == ["q1", "q2"]
+
+
+def test_migrate_list_columns_terminates_on_json_null_rows(temp_db):
+    # Rows written before the legacy columns stored SQL NULL hold the JSON text 'null'.
+    from sqlalchemy import text
+
+    _insert_legacy_row("legacy-3")
+    with temp_db.begin() as conn:
+        conn.execute(text(
+            "UPDATE sessions SET questions='null', answers='null', scores='null', logs='null' "
+            "WHERE session_id='legacy-3'"
+        ))
+    assert storage.migrate_list_columns() == 0
+    with temp_db.connect() as conn:
+        assert conn.execute(text("SELECT questions IS NULL FROM sessions")).scalar() == 1
+
+
+def test_child_rows_require_an_existing_session(temp_db):
+    import pytest
+    from sqlalchemy.exc import IntegrityError
+
+    from server.core.storage import SessionDelta
+
+    with pytest.raises(IntegrityError):
+        storage.save_session_delta("missing", SessionDelta(appends={"logs": [{"type": "x"}]}))
+
+
+def test_audit_logs_go_to_the_compressed_store_not_the_session(temp_db):
+    session = _new_session()
+    session.audit_logs.append({"type": "rubric", "prompt": "Job Spec: ...", "raw_response": "{}"})
+    session.logs.append({"type": "coaching", "question_id": "q1", "parsed": {}})
+    session.save()
+    assert session.audit_logs == []  # drained once written
+
+    session.audit_logs.append({"type": "question", "prompt": "Q prompt", "raw_response": "{}"})
+    session.save()
+
+    loaded = storage.load_session(session.session_id)
+    assert [log["type"] for log in loaded["logs"]] == ["coaching"]
+    assert [log["type"] for log in storage.load_audit_logs(session.session_id)] == ["rubric", "question"]
+
+
+def test_full_save_splits_audit_entries_without_duplicating_them(temp_db):
+    payload = _new_session().to_dict()
+    payload["logs"] = [
+        {"type": "scoring", "prompt": "p", "raw_response": "r"},
+        {"type": "coaching", "question_id": "q1"},
+    ]
+    storage.save_session(payload["session_id"], payload)
+    storage.save_session(payload["session_id"], payload)  # e.g. a legacy file migrated twice
+
+    assert storage.load_session(payload["session_id"])["logs"] == [{"type": "coaching", "question_id": "q1"}]
+    assert len(storage.load_audit_logs(payload["session_id"])) == 1
+
+
+def test_migrate_inline_audit_logs_moves_entries_and_renumbers(temp_db):
+    from server.core.storage import SessionDelta
+
+    session = _new_session()
+    session.save()
+    # Simulate a session saved before the audit store existed: prompts inline in session_logs.
+    storage.save_session_delta(session.session_id, SessionDelta(
+        fields={"logs": [
+            {"type": "rubric", "prompt": "p", "raw_response": "r"},
+            {"type": "persona", "parsed": {}},
+            {"type": "scoring", "prompt": "p", "raw_response": "r"},
+            {"type": "coaching", "question_id": "q1"},
+        ]},
+    ))
+
+    assert storage.migrate_inline_audit_logs() == 1
+    assert storage.migrate_inline_audit_logs() == 0
+
+    resumed = SessionState.from_payload(storage.load_session(session.session_id))
+    assert [log["type"] for log in resumed.logs] == ["persona", "coaching"]
+    resumed.logs.append({"type": "coaching", "question_id": "q2"})
+    resumed.save()  # appends at ordinal 2 — no collision with the renumbered rows
+    assert len(storage.load_session(session.session_id)["logs"]) == 3
+    assert len(storage.load_audit_logs(session.session_id)) == 2
+
+
+def test_production_profile_applies_sqlite_pragmas(tmp_path):
+    from sqlalchemy import text
+
+    from server.db import database
+
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'p.db'}", profile="production")
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    finally:
+        engine.dispose()
+
+
+def test_unknown_profile_is_rejected(tmp_path):
+    import pytest
+
+    from server.db import database
+
+    with pytest.raises(ValueError, match="INTERVUE_DB_PROFILE"):
+        database.make_engine(f"sqlite:///{tmp_path / 'p.db'}", profile="turbo")
+
+
+def test_asave_writes_off_the_event_loop_and_keeps_changes_made_meanwhile(temp_db, monkeypatch):
+    import asyncio
+
+    from server.core import async_storage
+
+    session = _new_session()
+    session.save()
+    real_save = storage.save_session_delta
+
+    def slow_save(session_id, delta):
+        # Another request appends while this write is in flight.
+        session.answers.append({"question_id": "q2", "answer_text": "late"})
+        real_save(session_id, delta)
+
+    monkeypatch.setattr(storage, "save_session_delta", slow_save)
+    session.answers.append({"question_id": "q1", "answer_text": "first"})
+    asyncio.run(session.asave())
+    monkeypatch.setattr(storage, "save_session_delta", real_save)
+
+    assert [a["question_id"] for a in storage.load_session(session.session_id)["answers"]] == ["q1"]
+    assert session.pending_delta().appends == {"answers": [{"question_id": "q2", "answer_text": "late"}]}
+    asyncio.run(session.asave())
+    assert len(asyncio.run(async_storage.load_session(session.session_id))["answers"]) == 2
+
+
+def test_failed_save_leaves_the_changes_pending(temp_db, monkeypatch):
+    import pytest
+
+    session = _new_session()
+    session.save()
+    session.status = "completed"
+    session.audit_logs.append({"type": "scoring", "prompt": "p"})
+
+    def broken(session_id, delta):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("server.core.state.save_session_delta", broken)
+    with pytest.raises(RuntimeError):
+        session.save()
+
+    delta = session.pending_delta()
+    assert delta.fields == {"status": "completed"} and len(delta.audit) == 1
+
+
+def test_merged_deltas_have_the_same_effect_as_applying_both(temp_db):
+    session = _new_session()
+    session.questions.append({"question_id": "q1"})
+    first, _ = session._take_delta()
+    session.questions.append({"question_id": "q2"})
+    session.status = "completed"
+    second, _ = session._take_delta()
+
+    storage.save_session_deltas({session.session_id: first.merge(second)})
+
+    loaded = storage.load_session(session.session_id)
+    assert [q["question_id"] for q in loaded["questions"]] == ["q1", "q2"]
+    assert loaded["status"] == "completed"
+
+
+def test_write_behind_coalesces_saves_into_one_batch(temp_db, monkeypatch):
+    import asyncio
+
+    from server.core import write_behind
+
+    monkeypatch.setattr(write_behind, "WRITE_BEHIND", True)
+    batches = []
+    real_batch = storage.save_session_deltas
+
+    def counting_batch(deltas):
+        batches.append(sorted(deltas))
+        real_batch(deltas)
+
+    monkeypatch.setattr(storage, "save_session_deltas", counting_batch)
+    queue = write_behind.WriteBehindQueue(interval_ms=60_000)
+    monkeypatch.setattr(write_behind, "queue", queue)
+    a, b = _new_session(), _new_session()
+
+    async def interview():
+        for session in (a, b):
+            await session.asave()
+        for i in range(3):
+            a.answers.append({"question_id": f"q{i}"})
+            await a.asave()
+        assert batches == []  # nothing written until the flush
+        await queue.stop()
+
+    asyncio.run(interview())
+    assert batches == [sorted([a.session_id, b.session_id])]
+    assert len(storage.load_session(a.session_id)["answers"]) == 3
+    assert storage.load_session(b.session_id)["session_id"] == b.session_id
+
+
+def test_write_behind_retries_a_failed_session_without_losing_the_others(temp_db, monkeypatch):
+    import asyncio
+
+    from server.core import write_behind
+
+    real_delta = storage.save_session_delta
+    calls = {"n": 0}
+
+    def flaky(session_id, delta):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("database is locked")
+        real_delta(session_id, delta)
+
+    monkeypatch.setattr(storage, "save_session_delta", flaky)
+    queue = write_behind.WriteBehindQueue(interval_ms=60_000)
+    good, bad = _new_session(), _new_session()
+    bad_id = bad.session_id
+    good.save()
+    good.status = "completed"
+
+    async def run():
+        queue.enqueue(good.session_id, good._take_delta()[0])
+        queue.enqueue(bad_id, bad._take_delta()[0])
+        # Make the batch fail so it falls back to per-session commits; the first of those fails.
+        monkeypatch.setattr(storage, "save_session_deltas", lambda deltas: (_ for _ in ()).throw(RuntimeError("batch")))
+        await queue.flush()
+        assert queue.pending_sessions() == 1
+        await queue.stop()
+
+    asyncio.run(run())
+    assert storage.load_session(good.session_id)["status"] == "completed"
+    assert storage.load_session(bad_id)["session_id"] == bad_id
+
+
+def _save_listed(session_id, created_at, status="active", score=None, job_spec="Staff Engineer\nPython, Postgres."):
+    payload = _new_session().to_dict()
+    payload.update(session_id=session_id, created_at=created_at, status=status, job_spec=job_spec)
+    storage.save_session(session_id, payload)
+    if score is not None:
+        storage.save_report(session_id, {"overall_score": score})
+
+
+def test_list_sessions_pages_by_cursor_without_gaps_or_repeats(temp_db):
+    for i in range(5):
+        _save_listed(f"s{i}", created_at=100.0 + i)
+    _save_listed("tie-a", created_at=102.0)  # same timestamp as s2: session_id breaks the tie
+
+    seen, cursor = [], None
+    while True:
+        page = storage.list_sessions(limit=2, cursor=cursor)
+        seen += [s["session_id"] for s in page["sessions"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["s4", "s3", "tie-a", "s2", "s1", "s0"]
+
+
+def test_list_sessions_filters_and_returns_short_titles(temp_db):
+    _save_listed("done-high", 1.0, status="completed", score=82.0, job_spec="  \nStaff Engineer\n" + "x" * 200)
+    _save_listed("done-low", 2.0, status="completed", score=40.0)
+    _save_listed("active", 3.0)
+
+    page = storage.list_sessions(status="completed", min_score=50)
+    assert [s["session_id"] for s in page["sessions"]] == ["done-high"]
+    listed = page["sessions"][0]
+    assert listed["job_title"] == "Staff Engineer"
+    assert len(listed["job_spec"]) == storage.JOB_SPEC_PREVIEW_CHARS + 3 and listed["job_spec"].endswith("...")
+    assert [s["session_id"] for s in storage.list_sessions(max_score=50)["sessions"]] == ["done-low"]
+
+
+def test_list_sessions_rejects_a_garbled_cursor(temp_db):
+    import pytest
+
+    with pytest.raises(ValueError, match="cursor"):
+        storage.list_sessions(cursor="not-a-cursor")
+
+
+def test_schema_upgrade_adds_job_title_to_old_tables(tmp_path):
+    from sqlalchemy import inspect, text
+
+    from server.db import database
+
+    engine = database.make_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sessions (session_id VARCHAR PRIMARY KEY, created_at FLOAT, job_spec TEXT)"))
+        conn.execute(text("INSERT INTO sessions VALUES ('old', 1.0, 'Data Engineer\nSpark')"))
+    storage._upgrade_schema(engine)
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal.configure(bind=engine)
+    try:
+        assert "job_title" in {c["name"] for c in inspect(engine).get_columns("sessions")}
+        assert "ix_sessions_created_at_desc" in {i["name"] for i in inspect(engine).get_indexes("sessions")}
+        assert storage.migrate_job_titles() == 1
+        assert storage.list_sessions()["sessions"][0]["job_title"] == "Data Engineer"
+    finally:
+        database.SessionLocal.configure(bind=database.engine)
+        engine.dispose()
+
+
+def test_data_migrations_run_once_per_database_in_one_process(temp_db, monkeypatch):
+    import contextlib
+
+    from server.core import locks
+
+    calls = []
+    monkeypatch.setattr(storage, "DATA_MIGRATIONS", (("a", lambda: calls.append("a")), ("b", lambda: calls.append("b"))))
+    assert storage.run_data_migrations() == ["a", "b"]
+    assert storage.run_data_migrations() == []  # recorded: no scans on later starts
+    assert calls == ["a", "b"]
+
+    # Another worker holding the lock: this one leaves the work to it.
+    monkeypatch.setattr(storage, "DATA_MIGRATIONS", (("c", lambda: calls.append("c")),))
+    monkeypatch.setattr(locks, "exclusive", lambda name: contextlib.nullcontext(False))
+    assert storage.run_data_migrations() == []
+    assert calls == ["a", "b"]
+
+
+def test_exclusive_lock_is_held_against_other_holders(temp_db):
+    from server.core import locks
+
+    with locks.exclusive("test-lock") as first:
+        assert first
+        # Advisory locks are per connection and flock()s per open file, so a second holder
+        # is refused even in this process.
+        with locks.exclusive("test-lock") as second:
+            assert not second
+    with locks.exclusive("test-lock") as again:
+        assert again
+
+
+def test_resume_reads_only_the_light_fields(temp_db):
+    from sqlalchemy import event
+
+    from server.core.state import RESUME_FIELDS
+
+    session = _new_session()
+    session.cv_text = "A very long CV. " * 500
+    session.questions.append({"question_id": "q1", "text": "First?"})
+    session.logs.append({"type": "coaching", "question_id": "q1"})
+    session.save()
+
+    statements = []
+    event.listen(temp_db, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    payload = storage.load_session(session.session_id, RESUME_FIELDS)
+
+    sql = " ".join(statements)
+    assert "cv_text" not in sql and "job_spec" not in sql and "session_logs" not in sql
+    assert payload["questions"] == [{"question_id": "q1", "text": "First?"}]
+    assert "cv_text" not in payload and "logs" not in payload
+
+
+def test_resumed_session_loads_lazy_fields_explicitly_and_saves_appends(temp_db):
+    import pytest
+
+    from server.core.state import RESUME_FIELDS, NotLoaded
+
+    session = _new_session()
+    session.scores.append({"question_id": "q1", "persona": "neutral", "overall_score": 60.0})
+    session.save()
+
+    resumed = SessionState.resume(storage.load_session(session.session_id, RESUME_FIELDS))
+    assert "cv_text" in resumed._unloaded
+    resumed.answers.append({"question_id": "q1", "answer_text": "Yes."})
+    resumed.save()
+    assert "scores" in resumed._unloaded  # saving never needed the unloaded history
+
+    # Reading a lazy field before loading it is a bug (it would block on a query), not I/O.
+    with pytest.raises(NotLoaded):
+        resumed.cv_text
+    with pytest.raises(NotLoaded):
+        resumed.get("scores", [])
+    resumed.load()
+    assert resumed.cv_text == session.cv_text
+    resumed.scores.append({"question_id": "q2", "persona": "neutral", "overall_score": 70.0})
+    assert resumed.pending_delta().appends == {"scores": [resumed.scores[-1]]}
+    resumed.save()
+
+    loaded = storage.load_session(session.session_id)
+    assert [s["question_id"] for s in loaded["scores"]] == ["q1", "q2"]
+    assert len(loaded["answers"]) == 1
+
+
+def test_aload_fills_every_lazy_field(temp_db):
+    import asyncio
+
+    from server.core.state import RESUME_FIELDS
+
+    session = _new_session()
+    session.rubric = {"competencies": []}
+    session.save()
+
+    resumed = SessionState.resume(storage.load_session(session.session_id, RESUME_FIELDS))
+    asyncio.run(resumed.aload())
+    assert resumed.to_dict() == session.to_dict()
+    assert resumed.pending_delta().is_empty()
+
+
+def _legacy_dirs(tmp_path, monkeypatch):
+    sessions_dir, reports_dir = tmp_path / "sessions", tmp_path / "reports"
+    sessions_dir.mkdir()
+    reports_dir.mkdir()
+    monkeypatch.setattr(storage, "SESSIONS_DIR", sessions_dir)
+    monkeypatch.setattr(storage, "REPORTS_DIR", reports_dir)
+    return sessions_dir, reports_dir
+
+
+def _write_legacy(sessions_dir, session_id):
+    import json
+
+    payload = _new_session().to_dict()
+    payload["session_id"] = session_id
+    path = sessions_dir / f"{session_id}.json"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    return path
+
+
+def test_migrate_json_to_db_imports_once_and_skips_unchanged_files(temp_db, tmp_path, monkeypatch):
+    import json
+    import os
+
+    sessions_dir, reports_dir = _legacy_dirs(tmp_path, monkeypatch)
+    for session_id in ("a", "b", "c"):
+        _write_legacy(sessions_dir, session_id)
+    (reports_dir / "b").mkdir()
+    (reports_dir / "b" / "report.json").write_text(json.dumps({"overall_score": 81.5}), encoding="utf-8")
+
+    assert storage.migrate_json_to_db(batch_size=2) == 3
+    assert storage.load_session("a")["job_spec"] == _new_session().job_spec
+    assert storage.list_sessions(min_score=80)["sessions"][0]["session_id"] == "b"
+
+    # Touched but identical: re-stamped without a re-import.
+    stat = (sessions_dir / "a.json").stat()
+    os.utime(sessions_dir / "a.json", (stat.st_atime, stat.st_mtime + 10))
+    assert storage.migrate_json_to_db() == 0
+    assert storage.LEGACY_MIGRATION == {"state": "done", "files": 3, "imported": 0, "unchanged": 3, "failed": 0}
+
+
+def test_migrate_json_to_db_skips_a_corrupt_file_and_retries_it_next_time(temp_db, tmp_path, monkeypatch):
+    sessions_dir, _ = _legacy_dirs(tmp_path, monkeypatch)
+    _write_legacy(sessions_dir, "a")
+    (sessions_dir / "broken.json").write_text("{not json", encoding="utf-8")
+    _write_legacy(sessions_dir, "c")
+
+    assert storage.migrate_json_to_db(batch_size=1) == 2
+    assert storage.LEGACY_MIGRATION["failed"] == 1
+    assert storage.load_session("c") is not None
+
+    _write_legacy(sessions_dir, "broken")
+    assert storage.migrate_json_to_db() == 1
+    assert storage.load_session("broken") is not None
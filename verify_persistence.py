@@ -13,8 +13,8 @@ def test_list_sessions():
             print(res.text)
             return False
         
-        sessions = res.json()
-        print(f"Success! Found {len(sessions)} sessions.")
+        sessions = res.json()["sessions"]
+        print(f"Success! Found {len(sessions)} sessions on the first page.")
         for s in sessions[:3]:
             print(f" - {s['session_id']} ({s['status']}) Score: {s.get('overall_score')}")
         return True
@@ -43,7 +43,7 @@ def test_create_and_retrieve():
         
         # Verify it appears in list
         res_list = requests.get(f"{BASE_URL}/sessions")
-        sessions = res_list.json()
+        sessions = res_list.json()["sessions"]  # newest first, so it's on the first page
         if not any(s['session_id'] == session_id for s in sessions):
             print("FAILED: New session not found in list!")
             return False
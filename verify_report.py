@@ -1,5 +1,5 @@
 import json
-from server.core import reports
+from server.core import reports, storage
 
 def test_report_generation():
     # Dummy session data
@@ -42,6 +42,7 @@ def test_report_generation():
     }
 
     print("Generating report...")
+    storage.init_db()
     try:
         report, paths = reports.build_report(session_data)
         print("Report Generated Successfully!")